@@ -0,0 +1,154 @@
+"""
+Latencia de la busqueda de texto (busqueda.buscador) sobre muchas tareas,
+comparada con lo que haria una busqueda sin indice (LIKE '%...%' en titulo y
+descripcion).
+
+Por defecto crea una base SQLite temporal y mide el indice invertido en
+memoria (tiempo de construccion y latencia de las busquedas). Con
+--base-configurada usa la base de settings, que en MySQL mide los indices
+FULLTEXT; las tareas creadas se borran al terminar.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/busqueda.py [tareas] [--base-configurada]
+"""
+import datetime
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = None
+if '--base-configurada' not in sys.argv:
+    BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'busqueda.sqlite3')
+    settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Q
+
+from busqueda.buscador import FUENTES, buscar, usa_fulltext
+from busqueda.indice import INDICES
+from cursos.models import Curso
+from errorPages.identificadores import uuid7
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+TAMANO_LOTE = 5000
+REPETICIONES = 20
+RESULTADOS = 21
+FECHA = datetime.date(2025, 1, 1)
+
+#Palabras reales seguidas de pseudopalabras; se eligen con una distribucion
+#de Zipf, como en un texto real: unas pocas aparecen en casi todas las tareas
+#y la mayoria en muy pocas
+PALABRAS = (
+    'programación ejercicio práctica entrega datos análisis proyecto lectura informe revisión '
+    'python álgebra matrices vectores funciones límites derivadas integrales estadística '
+    'probabilidad física química biología historia geografía literatura redacción ensayo examen '
+    'parcial final grupal individual investigación presentación diseño consultas índices redes '
+    'seguridad sistemas operativos algoritmos grafos árboles ordenamiento recursión memoria '
+    'procesos hilos concurrencia pruebas integración despliegue compiladores'
+).split()
+SILABAS = 'ca co cu da de di fa fe fi ga go la le li ma me mi na ne no pa pe po ra re ri sa se so ta te to'.split()
+VOCABULARIO = PALABRAS + sorted({
+    ''.join(combinacion) for combinacion in itertools.product(SILABAS, repeat=3)
+}, key=lambda palabra: random.Random(palabra).random())[:20_000]
+ACUMULADOS = list(itertools.accumulate(1 / rango for rango in range(1, len(VOCABULARIO) + 1)))
+
+CONSULTAS = [
+    ('1 palabra comun', 'ejercicio'),
+    ('1 palabra media', 'algebra'),
+    ('1 palabra rara', 'compiladores'),
+    ('2 palabras', 'analisis datos'),
+    ('3 palabras', 'practica funciones vectores'),
+    ('prefijo', 'program'),
+    ('sin resultados', 'astronomia'),
+]
+
+
+def texto(aleatorio, minimo, maximo):
+    return ' '.join(aleatorio.choices(VOCABULARIO, cum_weights=ACUMULADOS, k=aleatorio.randint(minimo, maximo)))
+
+
+def poblar(cantidad):
+    profesor = Usuario.objects.create_user(username='benchmark_busqueda', email='benchmark_busqueda@correo.com',
+                                           password='!', nombre_completo='Benchmark', rol='teacher')
+    curso = Curso.objects.create(nombre='Benchmark', descripcion='', profesor=profesor,
+                                 fecha_inicio=FECHA, fecha_fin=FECHA)
+    unidad = Unidad.objects.create(nombre='Benchmark', curso=curso, orden=1)
+    tema = Tema.objects.create(nombre='Benchmark', unidad=unidad, orden=1)
+    aleatorio = random.Random(42)
+    for desde in range(0, cantidad, TAMANO_LOTE):
+        with transaction.atomic():
+            Tarea.objects.bulk_create([
+                Tarea(id=uuid7(), titulo=texto(aleatorio, 2, 5), descripcion=texto(aleatorio, 8, 25),
+                      tema=tema, fecha_entrega=FECHA)
+                for _ in range(min(TAMANO_LOTE, cantidad - desde))
+            ])
+    return profesor
+
+
+def medir(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1], resultado
+
+
+def sin_indice(consulta):
+    #Lo que costaria filtrar en la base sin indice de texto (sin orden por relevancia)
+    filtro = Q()
+    for palabra in consulta.split():
+        filtro &= Q(titulo__icontains=palabra) | Q(descripcion__icontains=palabra)
+    return lambda: list(Tarea.objects.filter(filtro).values_list('id', flat=True)[:RESULTADOS])
+
+
+def main():
+    numeros = [argumento for argumento in sys.argv[1:] if argumento.isdigit()]
+    cantidad = int(numeros[0]) if numeros else 1_000_000
+    if BASE_TEMPORAL:
+        call_command('migrate', verbosity=0)
+
+    inicio = time.perf_counter()
+    profesor = poblar(cantidad)
+    print(f'{connection.vendor}: {cantidad} tareas insertadas en {time.perf_counter() - inicio:.1f} s')
+    try:
+        if not usa_fulltext():
+            inicio = time.perf_counter()
+            buscar('ejercicio', ['tareas'], 1)
+            indice = INDICES.indices['tareas'][1]
+            postings = sum(len(documentos) for documentos, _ in indice.documentos.values())
+            print(f'indice en memoria: {time.perf_counter() - inicio:.1f} s, {len(indice.vocabulario)} terminos, '
+                  f'{postings} entradas (~{postings * 6 / 2 ** 20:.0f} MB en arreglos)')
+        print(f'\n{"consulta":<18}{"resultados":>12}{"p50 (ms)":>11}{"p95 (ms)":>11}{"LIKE p50 (ms)":>15}')
+        for nombre, consulta in CONSULTAS:
+            p50, p95, resultado = medir(lambda: buscar(consulta, ['tareas'], RESULTADOS))
+            like, _, _ = medir(sin_indice(consulta))
+            print(f'{nombre:<18}{len(resultado):>12}{p50:>11.2f}{p95:>11.2f}{like:>15.2f}')
+    finally:
+        if not BASE_TEMPORAL:
+            #Borra en cascada el curso, su unidad, su tema y las tareas
+            profesor.delete()
+    if BASE_TEMPORAL:
+        os.remove(BASE_TEMPORAL)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Compara la codificacion JSON de un listado grande con JsonResponse
+(DjangoJSONEncoder) frente a errorPages.renderizado.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/codificacion_json.py [filas]
+"""
+import datetime
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+import django
+
+django.setup()
+
+from django.http import JsonResponse
+
+from errorPages import renderizado
+
+
+def filas_de_prueba(cantidad):
+    inicio = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            'id': uuid.uuid4(),
+            'id_curso': uuid.uuid4(),
+            'id_usuario': uuid.uuid4(),
+            'fecha_inscripcion': inicio + datetime.timedelta(seconds=i, microseconds=i),
+            'fecha_entrega': datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+            'titulo': f'Tarea número {i}',
+        }
+        for i in range(cantidad)
+    ]
+
+
+def medir(nombre, funcion, data, repeticiones=3):
+    mejor = min(_tiempo(funcion, data) for _ in range(repeticiones))
+    print(f'{nombre:<28} {mejor * 1000:9.1f} ms')
+    return mejor
+
+
+def _tiempo(funcion, data):
+    inicio = time.perf_counter()
+    funcion(data)
+    return time.perf_counter() - inicio
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    data = filas_de_prueba(cantidad)
+    print(f'Codificando {cantidad} filas')
+    base = medir('JsonResponse', lambda d: JsonResponse(d, safe=False), data)
+    estandar = medir('renderizado (stdlib)', renderizado.codificar_estandar, data)
+    print(f'{"":<28} {base / estandar:9.1f}x')
+    if renderizado.orjson is not None:
+        rapido = medir('renderizado (orjson)', renderizado.codificar, data)
+        print(f'{"":<28} {base / rapido:9.1f}x')
+    else:
+        print('orjson no esta instalado: solo se mide la ruta estandar')
+
+
+if __name__ == '__main__':
+    main()
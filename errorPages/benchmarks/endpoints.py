@@ -0,0 +1,399 @@
+"""
+Latencia, consultas y tamano de respuesta de cada ruta de la API.
+
+Crea una base SQLite temporal, la llena con errorPages.datos_sinteticos
+(misma semilla y fecha en cada corrida, asi que los datos son identicos) y
+recorre las rutas listar_*, obtener_*, registrar_* y /api/token/ dentro del
+mismo proceso con el cliente de pruebas de Django: middleware, autenticacion
+JWT, vista y serializacion, sin red ni servidor. Por ruta registra:
+
+    p50_ms, p95_ms, p99_ms -- latencia (rango mas cercano, sin el calentamiento)
+    consultas              -- consultas SQL por peticion (la mayor observada)
+    bytes                  -- tamano del cuerpo de la respuesta
+
+Las rutas listar_* guardan sus respuestas en la cache (cache_listados): desde
+la segunda repeticion no consultan la base ni serializan. Por eso cada una se
+mide dos veces: `listar_cursos` cambia las versiones de los recursos antes de
+cada peticion (fuera de la medicion), como despues de una escritura, y mide
+la vista completa; `listar_cursos (cache)` mide los aciertos.
+
+Los resultados se escriben en un JSON que se puede guardar por commit. Con
+--comparar, cada ruta se compara con un JSON anterior y el proceso termina
+con codigo 1 si alguna empeora mas que el umbral: p50 o p95 por encima de
+--umbral (fraccion; p99 es demasiado ruidoso con pocas repeticiones) y con
+al menos --minimo-ms de diferencia, cualquier consulta de mas, o bytes por
+encima de --umbral-bytes. Las comparaciones solo tienen sentido en la misma
+maquina y con el mismo --escala.
+
+No toca la base de datos configurada en settings. Las rutas actualizar_* y
+eliminar_* no se miden: cambian los datos entre repeticiones.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/endpoints.py [--escala 0.01] [--repeticiones 200] [--rutas listar_cursos,obtener_curso]
+                                   [--salida archivo.json] [--comparar base.json] [--umbral 0.5]
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'endpoints.sqlite3')
+settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+#Como en produccion: sin el registro de consultas de DEBUG y con una cache
+#en memoria (Redis o Memcached) en lugar de archivos
+settings.DEBUG = False
+#El detector de consultas repetidas solo corre en desarrollo y tests
+settings.CONSULTAS_REPETIDAS = None
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from cursos.models import Curso
+from errorPages.datos_sinteticos import CLAVE, VOLUMEN, Generador
+from errorPages.versiones import cambiar_version
+from inscripciones.models import Inscripcion
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+#Carpeta ignorada por git para guardar las corridas
+RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+HASTA = datetime.date(2025, 6, 1)
+CALENTAMIENTO = 5
+TAMANO_LOTE = 50
+#Rutas que calculan un hash de contrasena (PBKDF2): cada peticion tarda
+#cientos de milisegundos, se miden menos veces
+REPETICIONES_HASH = 10
+#Recursos de errorPages.versiones (registrar_modelo en cada apps.py)
+RECURSOS = ('cursos', 'unidades', 'temas', 'tareas', 'inscripciones', 'usuarios')
+
+
+class Ruta:
+    """
+    nombre       -- nombre de la URL (reverse)
+    args         -- funcion (contexto) -> argumentos de la URL
+    params       -- funcion (contexto) -> parametros GET
+    cuerpo       -- funcion (contexto, repeticion) -> cuerpo JSON
+    cliente      -- 'admin', 'alumno' o None (sin token)
+    repeticiones -- maximo de repeticiones de esta ruta
+    invalidar    -- cambiar las versiones antes de cada peticion, para que
+                    ninguna se responda desde la cache de listados
+    cache        -- variante que mide los aciertos de la cache de listados
+    """
+
+    def __init__(self, nombre, metodo='GET', args=None, params=None, cuerpo=None, cliente='admin',
+                 repeticiones=None, invalidar=False, cache=False):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.args = args
+        self.params = params
+        self.cuerpo = cuerpo
+        self.cliente = cliente
+        self.repeticiones = repeticiones
+        self.invalidar = invalidar
+        self.cache = cache
+
+    def url(self, contexto):
+        url = reverse(self.nombre, args=self.args(contexto) if self.args else ())
+        if self.params:
+            url = f'{url}?{urlencode(self.params(contexto))}'
+        return url
+
+
+def lote(cantidad, elemento):
+    def cuerpo(contexto, repeticion):
+        return [elemento(contexto, repeticion * cantidad + indice) for indice in range(cantidad)]
+    return cuerpo
+
+
+def listado(nombre, **kwargs):
+    """Una ruta listar_* sin cache (la que se compara) y su variante con cache."""
+    return [Ruta(nombre, invalidar=True, **kwargs), Ruta(nombre, cache=True, **kwargs)]
+
+
+RUTAS = [
+    Ruta('token_obtain_pair', 'POST', cliente=None, repeticiones=REPETICIONES_HASH,
+         cuerpo=lambda c, i: {'username': c.alumno.username, 'password': CLAVE}),
+    Ruta('token_refresh', 'POST', cliente=None, cuerpo=lambda c, i: {'refresh': c.refresh}),
+
+    *listado('listar_usuarios'),
+    Ruta('obtener_usuario_uuid', args=lambda c: [c.alumno.id]),
+    Ruta('obtener_usuario_actual', cliente='alumno'),
+    Ruta('registrar_usuario', 'POST', repeticiones=REPETICIONES_HASH, cuerpo=lambda c, i: {
+        'username': f'benchmark_{i}', 'email': f'benchmark_{i}@ejemplo.com', 'password': CLAVE,
+        'nombre_completo': 'Benchmark', 'rol': 'student',
+    }),
+
+    *listado('listar_cursos'),
+    *listado('listar_cursos', params=lambda c: {'todos': 'true'}),
+    Ruta('mis_cursos', cliente='alumno'),
+    Ruta('arbol_cursos', cliente='alumno', params=lambda c: {'ids': ','.join(map(str, c.cursos_alumno))}),
+    Ruta('arbol_curso', args=lambda c: [c.curso.id]),
+    Ruta('obtener_curso', args=lambda c: [c.curso.id]),
+    Ruta('registrar_curso', 'POST', cuerpo=lambda c, i: {
+        'nombre': f'Curso benchmark {i}', 'descripcion': 'Benchmark', 'profesor': str(c.curso.profesor_id),
+        'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-07-01', 'estado': True,
+    }),
+
+    *listado('listar_unidades'),
+    Ruta('obtener_unidad', args=lambda c: [c.unidad.id]),
+    Ruta('registrar_unidad', 'POST', cuerpo=lambda c, i: {
+        'nombre': f'Unidad benchmark {i}', 'curso': str(c.curso.id), 'orden': 100 + i,
+    }),
+    Ruta('registrar_unidades_lote', 'POST', cuerpo=lote(TAMANO_LOTE, lambda c, i: {
+        'nombre': f'Unidad lote {i}', 'curso': str(c.curso.id), 'orden': 1000 + i,
+    })),
+
+    *listado('listar_temas'),
+    Ruta('obtener_tema', args=lambda c: [c.tema.id]),
+    Ruta('registrar_tema', 'POST', cuerpo=lambda c, i: {
+        'nombre': f'Tema benchmark {i}', 'unidad': str(c.unidad.id), 'descripcion': '', 'orden': 100 + i,
+    }),
+    Ruta('registrar_temas_lote', 'POST', cuerpo=lote(TAMANO_LOTE, lambda c, i: {
+        'nombre': f'Tema lote {i}', 'unidad': str(c.unidad.id), 'descripcion': '', 'orden': 1000 + i,
+    })),
+
+    *listado('listar_tareas'),
+    Ruta('proximas_tareas', cliente='alumno', params=lambda c: {'desde': '2025-03-01', 'hasta': '2025-06-01'}),
+    Ruta('obtener_tarea', args=lambda c: [c.tarea.id]),
+    Ruta('registrar_tarea', 'POST', cuerpo=lambda c, i: {
+        'titulo': f'Tarea benchmark {i}', 'descripcion': '', 'fecha_entrega': '2025-04-01', 'tema': str(c.tema.id),
+    }),
+    Ruta('registrar_tareas_lote', 'POST', cuerpo=lote(TAMANO_LOTE, lambda c, i: {
+        'titulo': f'Tarea lote {i}', 'descripcion': '', 'fecha_entrega': '2025-04-01', 'tema': str(c.tema.id),
+    })),
+
+    *listado('listar_inscripciones'),
+    Ruta('mis_inscripciones', cliente='alumno'),
+    Ruta('obtener_inscripcion', args=lambda c: [c.inscripcion.id]),
+    Ruta('exportar_inscripciones_curso', args=lambda c: [c.curso.id]),
+    #Cada alumno se inscribe una sola vez por curso: se usan cursos sin inscripciones
+    Ruta('registrar_inscripcion', 'POST', cuerpo=lambda c, i: {
+        'id_curso': str(c.curso_vacio('individual')), 'id_usuario': str(c.alumnos[i]),
+        'fecha_inscripcion': '2025-05-01T10:00:00Z',
+    }),
+    Ruta('registrar_inscripciones_lote', 'POST', cuerpo=lambda c, i: [
+        {'id_curso': str(c.curso_vacio(i)), 'id_usuario': str(alumno)} for alumno in c.alumnos[:TAMANO_LOTE]
+    ]),
+
+    Ruta('obtener_estadisticas'),
+    Ruta('buscar_contenido', params=lambda c: {'q': 'analisis', 'tipos': 'cursos,temas,tareas'}),
+]
+
+
+class ContadorConsultas:
+    """execute_wrapper que cuenta las consultas sin guardar el SQL."""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def percentil(ordenados, p):
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class Contexto:
+    """Filas de la base sintetica que usan las rutas y los clientes autenticados."""
+
+    def __init__(self, repeticiones):
+        self.admin = Usuario.objects.filter(rol='admin', is_active=True).order_by('id').first()
+        activos = Usuario.objects.filter(rol='student', is_active=True).order_by('id')
+        self.alumno = activos.filter(inscripciones__isnull=False).distinct().first()
+        self.cursos_alumno = list(Inscripcion.objects.filter(usuario=self.alumno).values_list('curso_id', flat=True))
+        self.alumnos = list(activos.values_list('id', flat=True)[:max(repeticiones + CALENTAMIENTO, TAMANO_LOTE)])
+        self.curso = Curso.objects.order_by('-total_inscripciones').first()
+        self.unidad = Unidad.objects.filter(curso=self.curso).order_by('orden').first()
+        self.tema = Tema.objects.filter(unidad=self.unidad).order_by('orden').first()
+        self.tarea = Tarea.objects.filter(tema=self.tema).first()
+        self.inscripcion = Inscripcion.objects.filter(curso=self.curso).first()
+        self.cursos_vacios = {}
+
+        respuesta = Client(SERVER_NAME='localhost').post(
+            reverse('token_obtain_pair'), {'username': self.alumno.username, 'password': CLAVE},
+        )
+        self.refresh = respuesta.json()['refresh']
+        self.clientes = {
+            None: Client(SERVER_NAME='localhost'),
+            'alumno': self.cliente_de(self.alumno, respuesta.json()['access']),
+            'admin': self.cliente_de(self.admin),
+        }
+
+    def curso_vacio(self, clave):
+        """
+        Curso sin inscripciones; se crea al armar el cuerpo de la peticion
+        (fuera de la medicion) para que los listados no dependan de
+        --repeticiones.
+        """
+        if clave not in self.cursos_vacios:
+            self.cursos_vacios[clave] = Curso.objects.create(
+                nombre=f'Vacio {clave}', descripcion='', profesor=self.admin,
+                fecha_inicio=HASTA, fecha_fin=HASTA + datetime.timedelta(days=120),
+            ).id
+        return self.cursos_vacios[clave]
+
+    def cliente_de(self, usuario, access=None):
+        if access is None:
+            access = Client(SERVER_NAME='localhost').post(
+                reverse('token_obtain_pair'), {'username': usuario.username, 'password': CLAVE},
+            ).json()['access']
+        return Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+
+def medir(ruta, contexto, repeticiones):
+    cliente = contexto.clientes[ruta.cliente]
+    url = ruta.url(contexto)
+    repeticiones = min(repeticiones, ruta.repeticiones or repeticiones)
+    tiempos, consultas, tamanos, estados = [], [], [], Counter()
+    contador = ContadorConsultas()
+    with connection.execute_wrapper(contador):
+        for repeticion in range(repeticiones + CALENTAMIENTO):
+            cuerpo = json.dumps(ruta.cuerpo(contexto, repeticion)) if ruta.cuerpo else ''
+            if ruta.invalidar:
+                for recurso in RECURSOS:
+                    cambiar_version(recurso)
+            contador.total = 0
+            inicio = time.perf_counter()
+            respuesta = cliente.generic(ruta.metodo, url, cuerpo, content_type='application/json')
+            contenido = b''.join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+            ms = (time.perf_counter() - inicio) * 1000
+            if repeticion < CALENTAMIENTO:
+                continue
+            tiempos.append(ms)
+            consultas.append(contador.total)
+            tamanos.append(len(contenido))
+            estados[respuesta.status_code] += 1
+    tiempos.sort()
+    return {
+        'metodo': ruta.metodo,
+        'url': url,
+        'repeticiones': repeticiones,
+        'estados': {str(estado): cantidad for estado, cantidad in sorted(estados.items())},
+        'p50_ms': round(percentil(tiempos, 50), 3),
+        'p95_ms': round(percentil(tiempos, 95), 3),
+        'p99_ms': round(percentil(tiempos, 99), 3),
+        'media_ms': round(sum(tiempos) / len(tiempos), 3),
+        'consultas': max(consultas),
+        'bytes': max(tamanos),
+    }
+
+
+def version_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, base, umbral, umbral_bytes, minimo_ms):
+    """Lista de regresiones (texto) de `resultados` respecto de `base`."""
+    regresiones = []
+    for nombre, actual in resultados['rutas'].items():
+        anterior = base['rutas'].get(nombre)
+        if anterior is None:
+            continue
+        for metrica in ('p50_ms', 'p95_ms'):
+            diferencia = actual[metrica] - anterior[metrica]
+            if diferencia > minimo_ms and actual[metrica] > anterior[metrica] * (1 + umbral):
+                regresiones.append(f'{nombre}: {metrica} {anterior[metrica]} -> {actual[metrica]}')
+        if actual['consultas'] > anterior['consultas']:
+            regresiones.append(f'{nombre}: consultas {anterior["consultas"]} -> {actual["consultas"]}')
+        if actual['bytes'] > anterior['bytes'] * (1 + umbral_bytes):
+            regresiones.append(f'{nombre}: bytes {anterior["bytes"]} -> {actual["bytes"]}')
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de las rutas de la API')
+    parser.add_argument('--escala', type=float, default=0.01, help='Volumen de datos (1 = produccion)')
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--rutas', help='Nombres de URL separados por coma (por defecto, todas)')
+    parser.add_argument('--salida', help=f'Por defecto {RESULTADOS}/endpoints-<commit>.json')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior')
+    parser.add_argument('--umbral', type=float, default=0.5, help='Aumento tolerado de p50/p95 (fraccion)')
+    parser.add_argument('--umbral-bytes', type=float, default=0.05, help='Aumento tolerado del tamano (fraccion)')
+    parser.add_argument('--minimo-ms', type=float, default=1.0, help='Diferencia minima de latencia a considerar')
+    argumentos = parser.parse_args()
+    base = None
+    if argumentos.comparar:
+        with open(argumentos.comparar) as archivo:
+            base = json.load(archivo)
+
+    call_command('migrate', verbosity=0)
+    volumen = {tabla: round(cantidad * argumentos.escala) for tabla, cantidad in VOLUMEN.items()}
+    inicio = time.perf_counter()
+    Generador(semilla=0, hasta=HASTA).generar(volumen)
+    print(f'Datos: {volumen} ({time.perf_counter() - inicio:.0f} s)')
+    contexto = Contexto(argumentos.repeticiones)
+
+    elegidas = set(argumentos.rutas.split(',')) if argumentos.rutas else None
+    resultados = {
+        'fecha': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': version_actual(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'escala': argumentos.escala,
+        'volumen': volumen,
+        'rutas': {},
+    }
+    print(f'\n{"ruta":<40}{"n":>5}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"consultas":>11}{"bytes":>10}  estados')
+    nombres = set()
+    for ruta in RUTAS:
+        if elegidas and ruta.nombre not in elegidas:
+            continue
+        nombre = ruta.nombre
+        if ruta.params and nombre in nombres:
+            nombre = f'{nombre}?{urlencode(ruta.params(contexto))}'
+        nombres.add(ruta.nombre)
+        if ruta.cache:
+            nombre = f'{nombre} (cache)'
+        medida = medir(ruta, contexto, argumentos.repeticiones)
+        resultados['rutas'][nombre] = medida
+        print(f'{nombre:<40}{medida["repeticiones"]:>5}{medida["p50_ms"]:>10.2f}{medida["p95_ms"]:>10.2f}'
+              f'{medida["p99_ms"]:>10.2f}{medida["consultas"]:>11}{medida["bytes"]:>10}  {medida["estados"]}')
+
+    salida = argumentos.salida
+    if salida is None:
+        os.makedirs(RESULTADOS, exist_ok=True)
+        salida = os.path.join(RESULTADOS, f'endpoints-{resultados["commit"] or "sin-commit"}.json')
+    with open(salida, 'w') as archivo:
+        json.dump(resultados, archivo, indent=2)
+    print(f'\nResultados en {salida}')
+    os.remove(BASE_TEMPORAL)
+
+    if base is not None:
+        regresiones = comparar(resultados, base, argumentos.umbral, argumentos.umbral_bytes, argumentos.minimo_ms)
+        for regresion in regresiones:
+            print(f'REGRESION {regresion}')
+        if regresiones:
+            sys.exit(1)
+        print(f'Sin regresiones respecto de {argumentos.comparar} ({base.get("commit")})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Plan de ejecucion y latencia de las consultas principales antes y despues de
+los indices compuestos (migraciones *_idx y la restriccion unica de
+inscripciones).
+
+Crea una base SQLite temporal, la deja en el estado anterior a los indices,
+la llena con datos sinteticos, mide, aplica las migraciones de los indices y
+vuelve a medir. No toca la base de datos configurada en settings.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/indices.py [cursos]
+"""
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'indices.sqlite3')
+settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+
+from cursos.models import Curso
+from inscripciones.models import Inscripcion
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+#Ultima migracion de cada app antes de los indices
+ANTES_DE_INDICES = [
+    ('inscripciones', '0002_initial'),
+    ('cursos', '0002_initial'),
+    ('tareas', '0001_initial'),
+    ('temas', '0001_initial'),
+    ('unidades', '0001_initial'),
+    ('usuarios', '0001_initial'),
+]
+REPETICIONES = 300
+INICIO = datetime.date(2025, 1, 1)
+
+
+def poblar(cantidad_cursos):
+    aleatorio = random.Random(42)
+    usuarios = [
+        Usuario(username=f'u{i}', email=f'u{i}@correo.com', nombre_completo=f'Usuario {i}',
+                rol='teacher' if i % 20 == 0 else 'student', password='!')
+        for i in range(cantidad_cursos * 3)
+    ]
+    Usuario.objects.bulk_create(usuarios, batch_size=2000)
+    profesores = [usuario for usuario in usuarios if usuario.rol == 'teacher']
+    alumnos = [usuario for usuario in usuarios if usuario.rol == 'student']
+
+    cursos = [
+        Curso(nombre=f'Curso {i}', descripcion='', profesor=aleatorio.choice(profesores),
+              fecha_inicio=INICIO + datetime.timedelta(days=aleatorio.randrange(730)),
+              fecha_fin=INICIO + datetime.timedelta(days=900), estado=aleatorio.random() < 0.7)
+        for i in range(cantidad_cursos)
+    ]
+    Curso.objects.bulk_create(cursos, batch_size=2000)
+    unidades = [Unidad(nombre=f'U{orden}', curso=curso, orden=orden) for curso in cursos for orden in range(6)]
+    Unidad.objects.bulk_create(unidades, batch_size=2000)
+    temas = [Tema(nombre=f'T{orden}', unidad=unidad, orden=orden) for unidad in unidades for orden in range(4)]
+    Tema.objects.bulk_create(temas, batch_size=2000)
+    Tarea.objects.bulk_create([
+        Tarea(titulo=f'Tarea {i}', tema=tema, fecha_entrega=INICIO + datetime.timedelta(days=aleatorio.randrange(730)))
+        for tema in temas for i in range(3)
+    ], batch_size=2000)
+    Inscripcion.objects.bulk_create([
+        Inscripcion(usuario=alumno, curso=curso)
+        for alumno in alumnos for curso in aleatorio.sample(cursos, 8)
+    ], batch_size=2000)
+    return cursos, unidades, temas, alumnos
+
+
+def consultas(cursos, unidades, temas, alumnos):
+    """Consultas con los patrones de acceso de las vistas."""
+    aleatorio = random.Random(7)
+    desde = INICIO + datetime.timedelta(days=300)
+    return {
+        'unidades de un curso por orden': lambda: Unidad.objects.filter(
+            curso=aleatorio.choice(cursos)).order_by('orden', 'id'),
+        'temas de una unidad por orden': lambda: Tema.objects.filter(
+            unidad=aleatorio.choice(unidades)).order_by('orden', 'id'),
+        'tareas de un tema por entrega': lambda: Tarea.objects.filter(
+            tema=aleatorio.choice(temas), fecha_entrega__gte=desde).order_by('fecha_entrega', 'id'),
+        'inscripcion (usuario, curso)': lambda: Inscripcion.objects.filter(
+            usuario=aleatorio.choice(alumnos), curso=aleatorio.choice(cursos)),
+        'usuarios por rol': lambda: Usuario.objects.filter(rol='teacher').only('id'),
+        'cursos activos por inicio': lambda: Curso.objects.filter(
+            estado=True, fecha_inicio__gte=desde).order_by('fecha_inicio', 'id').only('id')[:50],
+    }
+
+
+def medir(titulo, datos):
+    """Mediana de la consulta SQL sola (sin construir objetos del ORM)."""
+    print(f'\n== {titulo} ==')
+    with connection.cursor() as cursor:
+        #Estadisticas para el planificador, como las que mantiene MySQL
+        cursor.execute('ANALYZE')
+    resultados = {}
+    for nombre, consulta in consultas(*datos).items():
+        print(f'\n{nombre}\n  {consulta().explain()}'.replace('\n', '\n  ').replace('\n  \n', '\n'))
+        tiempos = []
+        for _ in range(REPETICIONES):
+            sql, parametros = consulta().query.sql_with_params()
+            with connection.cursor() as cursor:
+                inicio = time.perf_counter()
+                cursor.execute(sql, parametros)
+                cursor.fetchall()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        resultados[nombre] = statistics.median(tiempos)
+    return resultados
+
+
+def main():
+    cantidad_cursos = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    call_command('migrate', verbosity=0)
+    for app, migracion in ANTES_DE_INDICES:
+        call_command('migrate', app, migracion, verbosity=0)
+
+    inicio = time.perf_counter()
+    datos = poblar(cantidad_cursos)
+    print(f'Datos: {cantidad_cursos} cursos, {Tarea.objects.count()} tareas, '
+          f'{Inscripcion.objects.count()} inscripciones ({time.perf_counter() - inicio:.1f} s)')
+
+    antes = medir('Sin indices', datos)
+    call_command('migrate', verbosity=0)
+    despues = medir('Con indices', datos)
+
+    print(f'\n{"consulta":<34}{"antes (ms)":>12}{"despues (ms)":>14}')
+    for nombre in antes:
+        print(f'{nombre:<34}{antes[nombre]:>12.3f}{despues[nombre]:>14.3f}')
+    os.remove(BASE_TEMPORAL)
+
+
+if __name__ == '__main__':
+    main()
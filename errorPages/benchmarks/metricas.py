@@ -0,0 +1,116 @@
+"""
+Costo de errorPages.metricas.MetricasMiddleware por peticion.
+
+Mide dos cosas dentro del mismo proceso, sin red:
+
+    - el middleware completo alrededor de una vista vacia, y
+      Registro.registrar() solo
+    - una ruta barata (obtener_usuario_actual, sin consultas) y una con
+      consultas (obtener_curso) con y sin el middleware, alternando bloques
+      para que el ruido de la maquina afecte por igual a ambos
+
+Crea una base SQLite temporal. No toca la base de datos configurada en
+settings.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/metricas.py [peticiones por bloque] [bloques]
+"""
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'metricas.sqlite3')
+settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+settings.DEBUG = False
+#El detector de consultas repetidas solo corre en desarrollo y tests
+settings.CONSULTAS_REPETIDAS = None
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.urls import resolve
+
+from errorPages.datos_sinteticos import CLAVE, Generador
+from errorPages.metricas import MetricasMiddleware, Registro
+from cursos.models import Curso
+from usuarios.models import Usuario
+
+MIDDLEWARE = 'errorPages.metricas.MetricasMiddleware'
+VECES = 200_000
+
+
+def cliente(con_metricas, access):
+    """Client arma su cadena de middleware en la primera peticion."""
+    settings.MIDDLEWARE = [m for m in settings.MIDDLEWARE if m != MIDDLEWARE]
+    if con_metricas:
+        settings.MIDDLEWARE = [MIDDLEWARE, *settings.MIDDLEWARE]
+    cliente = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {access}')
+    cliente.get('/usuarios/usuario-actual/')
+    return cliente
+
+
+def bloque(cliente, url, peticiones):
+    inicio = time.perf_counter()
+    for _ in range(peticiones):
+        cliente.get(url)
+    return (time.perf_counter() - inicio) / peticiones * 1e6
+
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    bloques = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    registro = Registro(publicar_segundos=None)
+    inicio = time.perf_counter()
+    for _ in range(VECES):
+        registro.registrar('listar_cursos', 'GET', 200, 0.004, 18_000, 2, 0.001)
+    print(f'Registro.registrar(): {(time.perf_counter() - inicio) / VECES * 1e6:.2f} us')
+
+    respuesta = HttpResponse(b'{}')
+    solicitud = RequestFactory().get('/cursos/listar_cursos/')
+    solicitud.resolver_match = resolve('/cursos/listar_cursos/')
+    sin_metricas = lambda request: respuesta
+    con_metricas = MetricasMiddleware(sin_metricas)
+    for nombre, funcion in (('vista vacia', sin_metricas), ('vista vacia + middleware', con_metricas)):
+        inicio = time.perf_counter()
+        for _ in range(VECES):
+            funcion(solicitud)
+        print(f'{nombre}: {(time.perf_counter() - inicio) / VECES * 1e6:.2f} us')
+
+    call_command('migrate', verbosity=0)
+    Generador(semilla=0, hasta=datetime.date(2025, 6, 1)).generar({
+        'usuarios': 200, 'cursos': 20, 'unidades': 100, 'temas': 200, 'tareas': 500, 'inscripciones': 1000,
+    })
+    alumno = Usuario.objects.filter(rol='student', is_active=True).order_by('id').first()
+    access = Client(SERVER_NAME='localhost').post(
+        '/api/token/', {'username': alumno.username, 'password': CLAVE},
+    ).json()['access']
+    clientes = {False: cliente(False, access), True: cliente(True, access)}
+    curso = Curso.objects.order_by('id').first()
+
+    print(f'\n{"ruta":<30}{"sin (us)":>10}{"con (us)":>10}{"costo (us)":>12}{"costo":>8}')
+    for url in ('/usuarios/usuario-actual/', f'/cursos/obtener_curso/{curso.id}/'):
+        tiempos = {False: [], True: []}
+        for _ in range(bloques):
+            for con_metricas in (False, True):
+                tiempos[con_metricas].append(bloque(clientes[con_metricas], url, peticiones))
+        sin, con = statistics.median(tiempos[False]), statistics.median(tiempos[True])
+        print(f'{url.split("/")[2]:<30}{sin:>10.0f}{con:>10.0f}{con - sin:>12.1f}{(con - sin) / sin:>8.1%}')
+    os.remove(BASE_TEMPORAL)
+
+
+if __name__ == '__main__':
+    main()
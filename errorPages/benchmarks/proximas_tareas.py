@@ -0,0 +1,113 @@
+"""
+Costo de /tareas/proximas/ (tareas.consultas.consulta_proximas_tareas) a
+medida que crece el catalogo, para un alumno con la misma cantidad de
+cursos, comparado con descargar todas las tareas y filtrarlas en el cliente
+(lo que hacia Student/Assignments.jsx).
+
+Crea una base SQLite temporal, agrega cursos por etapas y en cada etapa mide
+la consulta SQL sola. No toca la base de datos configurada en settings.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/proximas_tareas.py [cursos por etapa ...]
+"""
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'proximas_tareas.sqlite3')
+settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+
+from cursos.models import Curso
+from inscripciones.models import Inscripcion
+from tareas.consultas import consulta_proximas_tareas, consulta_tareas
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+INICIO = datetime.date(2025, 1, 1)
+CURSOS_DEL_ALUMNO = 6
+REPETICIONES = 50
+LIMITE = 50
+
+
+def agregar_cursos(profesor, cantidad, aleatorio, desde):
+    cursos = Curso.objects.bulk_create([
+        Curso(nombre=f'Curso {desde + i}', descripcion='', profesor=profesor,
+              fecha_inicio=INICIO, fecha_fin=INICIO + datetime.timedelta(days=365))
+        for i in range(cantidad)
+    ], batch_size=2000)
+    unidades = Unidad.objects.bulk_create(
+        [Unidad(nombre=f'U{orden}', curso=curso, orden=orden) for curso in cursos for orden in range(6)],
+        batch_size=2000)
+    temas = Tema.objects.bulk_create(
+        [Tema(nombre=f'T{orden}', unidad=unidad, orden=orden) for unidad in unidades for orden in range(4)],
+        batch_size=2000)
+    Tarea.objects.bulk_create([
+        Tarea(titulo=f'Tarea {i}', tema=tema, fecha_entrega=INICIO + datetime.timedelta(days=aleatorio.randrange(365)))
+        for tema in temas for i in range(3)
+    ], batch_size=2000)
+    return cursos
+
+
+def medir(consulta, repeticiones=REPETICIONES):
+    """Mediana de la consulta SQL sola (sin construir objetos del ORM)."""
+    sql, parametros = consulta.query.sql_with_params()
+    tiempos = []
+    with connection.cursor() as cursor:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            cursor.execute(sql, parametros)
+            filas = len(cursor.fetchall())
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), filas
+
+
+def main():
+    etapas = [int(argumento) for argumento in sys.argv[1:]] or [500, 1500, 6000]
+    call_command('migrate', verbosity=0)
+    aleatorio = random.Random(42)
+    profesor = Usuario.objects.create_user(username='benchmark_profesor', email='benchmark_profesor@correo.com',
+                                           password='!', nombre_completo='Profesor', rol='teacher')
+    alumno = Usuario.objects.create_user(username='benchmark_alumno', email='benchmark_alumno@correo.com',
+                                         password='!', nombre_completo='Alumno', rol='student')
+    propios = agregar_cursos(profesor, CURSOS_DEL_ALUMNO, aleatorio, 0)
+    Inscripcion.objects.bulk_create([Inscripcion(usuario=alumno, curso=curso) for curso in propios])
+
+    desde, hasta = INICIO + datetime.timedelta(days=100), INICIO + datetime.timedelta(days=130)
+    proximas = consulta_proximas_tareas(alumno, desde, hasta).order_by('fecha_entrega', 'id')
+    print('Plan:')
+    for linea in proximas[:LIMITE].explain().splitlines():
+        print(f'  {linea.strip()}')
+
+    print(f'\n{"cursos":>8}{"tareas":>10}{"proximas (ms)":>15}{"filas":>7}{"todas las tareas (ms)":>23}')
+    total = CURSOS_DEL_ALUMNO
+    for cantidad in etapas:
+        agregar_cursos(profesor, cantidad, aleatorio, total)
+        total += cantidad
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        ms, filas = medir(proximas[:LIMITE])
+        ms_todas, filas_todas = medir(consulta_tareas().order_by('fecha_entrega', 'id'), 3)
+        print(f'{total:>8}{filas_todas:>10}{ms:>15.3f}{filas:>7}{ms_todas:>23.1f}')
+    os.remove(BASE_TEMPORAL)
+
+
+if __name__ == '__main__':
+    main()
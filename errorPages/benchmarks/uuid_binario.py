@@ -0,0 +1,152 @@
+"""
+Tamano de tablas e indices y velocidad de JOIN con claves UUID guardadas como
+texto (char(32), lo que usa UUIDField en MySQL) frente a 16 bytes
+(UUIDBinarioField).
+
+Crea dos pares de tablas curso/inscripcion con el mismo contenido, uno por
+tipo de columna, y los borra al terminar. Por defecto usa una base SQLite
+temporal (texto frente a BLOB); con --base-configurada usa la base de
+settings, que es lo que hay que correr en MySQL.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/uuid_binario.py [inscripciones] [--base-configurada]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = None
+if '--base-configurada' not in sys.argv:
+    BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'uuid_binario.sqlite3')
+    settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+
+import django
+
+django.setup()
+
+from django.db import connection, transaction
+
+from errorPages.identificadores import uuid7
+
+CURSOS_POR_INSCRIPCION = 25
+TAMANO_LOTE = 5000
+
+
+def tipos():
+    binario = 'binary(16)' if connection.vendor == 'mysql' else 'blob'
+    return {
+        'texto': ('char(32)', lambda valor: valor.hex),
+        'binario': (binario, lambda valor: valor.bytes),
+    }
+
+
+def crear_tablas(cursor, sufijo, tipo):
+    cursor.execute(f'CREATE TABLE bench_curso_{sufijo} (id {tipo} NOT NULL PRIMARY KEY, '
+                   'nombre varchar(100) NOT NULL, estado smallint NOT NULL)')
+    cursor.execute(f'CREATE TABLE bench_inscripcion_{sufijo} (id {tipo} NOT NULL PRIMARY KEY, '
+                   f'curso_id {tipo} NOT NULL, usuario_id {tipo} NOT NULL)')
+    cursor.execute(f'CREATE INDEX bench_inscripcion_{sufijo}_curso ON bench_inscripcion_{sufijo} (curso_id)')
+    cursor.execute(f'CREATE INDEX bench_inscripcion_{sufijo}_usuario ON bench_inscripcion_{sufijo} (usuario_id)')
+
+
+def borrar_tablas(cursor):
+    for sufijo in tipos():
+        cursor.execute(f'DROP TABLE IF EXISTS bench_inscripcion_{sufijo}')
+        cursor.execute(f'DROP TABLE IF EXISTS bench_curso_{sufijo}')
+
+
+def poblar(cursor, sufijo, convertir, cursos, inscripciones):
+    cursor.executemany(
+        f'INSERT INTO bench_curso_{sufijo} (id, nombre, estado) VALUES (%s, %s, %s)',
+        [(convertir(id), f'Curso {i}', i % 3 != 0) for i, id in enumerate(cursos)],
+    )
+    for desde in range(0, len(inscripciones), TAMANO_LOTE):
+        cursor.executemany(
+            f'INSERT INTO bench_inscripcion_{sufijo} (id, curso_id, usuario_id) VALUES (%s, %s, %s)',
+            [tuple(map(convertir, fila)) for fila in inscripciones[desde:desde + TAMANO_LOTE]],
+        )
+
+
+def tamanos(cursor, sufijo):
+    """(datos, indices) en MB de las dos tablas."""
+    tablas = [f'bench_curso_{sufijo}', f'bench_inscripcion_{sufijo}']
+    if connection.vendor == 'mysql':
+        cursor.execute(f'ANALYZE TABLE {", ".join(tablas)}')
+        cursor.fetchall()
+        cursor.execute(
+            'SELECT SUM(DATA_LENGTH), SUM(INDEX_LENGTH) FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s, %s)', tablas,
+        )
+        datos, indices = cursor.fetchone()
+    else:
+        #Incluye los indices automaticos de las claves primarias (sqlite_autoindex_*)
+        cursor.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name')
+        datos = indices = 0
+        for nombre, tamano in cursor.fetchall():
+            if nombre in tablas:
+                datos += tamano
+            elif f'_{sufijo}' in nombre:
+                indices += tamano
+    return datos / 2 ** 20, indices / 2 ** 20
+
+
+def medir(cursor, sql, parametros, repeticiones):
+    tiempos = []
+    for valores in parametros[:repeticiones]:
+        inicio = time.perf_counter()
+        cursor.execute(sql, valores)
+        cursor.fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    numeros = [argumento for argumento in sys.argv[1:] if argumento.isdigit()]
+    cantidad = int(numeros[0]) if numeros else 500_000
+    aleatorio = random.Random(42)
+    cursos = [uuid7() for _ in range(max(1, cantidad // CURSOS_POR_INSCRIPCION))]
+    usuarios = [uuid7() for _ in range(max(1, cantidad // 8))]
+    inscripciones = [(uuid7(), aleatorio.choice(cursos), aleatorio.choice(usuarios)) for _ in range(cantidad)]
+    muestra = aleatorio.sample(cursos, min(500, len(cursos)))
+
+    resultados = {}
+    with connection.cursor() as cursor:
+        borrar_tablas(cursor)
+        try:
+            for sufijo, (tipo, convertir) in tipos().items():
+                crear_tablas(cursor, sufijo, tipo)
+                with transaction.atomic():
+                    poblar(cursor, sufijo, convertir, cursos, inscripciones)
+                datos, indices = tamanos(cursor, sufijo)
+                union = (f'FROM bench_inscripcion_{sufijo} i '
+                         f'JOIN bench_curso_{sufijo} c ON c.id = i.curso_id')
+                resultados[sufijo] = {
+                    'datos (MB)': datos,
+                    'indices (MB)': indices,
+                    'JOIN completo (ms)': medir(
+                        cursor, f'SELECT COUNT(*) {union} WHERE c.estado = 1', [()] * 5, 5),
+                    'JOIN por curso (ms)': medir(
+                        cursor, f'SELECT i.id, c.nombre {union} WHERE c.id = %s',
+                        [(convertir(id),) for id in muestra], len(muestra)),
+                }
+        finally:
+            borrar_tablas(cursor)
+
+    print(f'{connection.vendor}: {len(cursos)} cursos, {cantidad} inscripciones\n')
+    print(f'{"":<22}{"char(32)":>12}{"16 bytes":>12}')
+    for medida in resultados['texto']:
+        print(f'{medida:<22}{resultados["texto"][medida]:>12.3f}{resultados["binario"][medida]:>12.3f}')
+    if BASE_TEMPORAL:
+        os.remove(BASE_TEMPORAL)
+
+
+if __name__ == '__main__':
+    main()
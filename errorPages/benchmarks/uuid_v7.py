@@ -0,0 +1,107 @@
+"""
+Carga masiva de tareas con ids uuid4 frente a uuid7: filas por segundo al
+principio y al final de la carga y tamano del indice de la clave primaria.
+
+Usa una base SQLite temporal (como benchmarks/indices.py). En SQLite la
+clave primaria UUID es un indice aparte de la tabla, que se comporta como el
+indice agrupado de InnoDB: con uuid4 cada insercion cae en una hoja al azar.
+
+Uso (desde la carpeta errorPages/):
+    python benchmarks/uuid_v7.py [filas]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'errorPages.settings')
+
+from django.conf import settings
+
+BASE_TEMPORAL = os.path.join(tempfile.mkdtemp(), 'uuid_v7.sqlite3')
+settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_TEMPORAL}
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from cursos.models import Curso
+from errorPages.identificadores import uuid7
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+TAMANO_LOTE = 5000
+GENERADORES = {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+
+
+def crear_tema():
+    profesor = Usuario.objects.create(username='benchmark', email='benchmark@correo.com', rol='teacher')
+    curso = Curso.objects.create(nombre='Curso', descripcion='', profesor=profesor,
+                                 fecha_inicio=datetime.date(2025, 1, 1), fecha_fin=datetime.date(2025, 6, 1))
+    unidad = Unidad.objects.create(nombre='Unidad', curso=curso, orden=1)
+    return Tema.objects.create(nombre='Tema', unidad=unidad, orden=1)
+
+
+def tamano_indices():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, SUM(pgsize), SUM(unused) FROM dbstat "
+            "WHERE name LIKE 'sqlite_autoindex_tareas_tarea%' GROUP BY name"
+        )
+        _, usado, libre = cursor.fetchone()
+    return usado, libre
+
+
+def cargar(tema, generador, filas):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM tareas_tarea')
+        cursor.execute('VACUUM')
+    velocidades = []
+    inicio_total = time.perf_counter()
+    for desde in range(0, filas, TAMANO_LOTE):
+        lote = [
+            Tarea(id=generador(), titulo=f'Tarea {i}', tema=tema, fecha_entrega=datetime.date(2025, 3, 1))
+            for i in range(desde, min(desde + TAMANO_LOTE, filas))
+        ]
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            Tarea.objects.bulk_create(lote, batch_size=1000)
+        velocidades.append(len(lote) / (time.perf_counter() - inicio))
+    total = time.perf_counter() - inicio_total
+    decimo = max(1, len(velocidades) // 10)
+    return {
+        'filas/s': filas / total,
+        'filas/s primer 10%': sum(velocidades[:decimo]) / decimo,
+        'filas/s ultimo 10%': sum(velocidades[-decimo:]) / decimo,
+    }
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    call_command('migrate', verbosity=0)
+    tema = crear_tema()
+    resultados = {}
+    for nombre, generador in GENERADORES.items():
+        resultados[nombre] = cargar(tema, generador, filas)
+        usado, libre = tamano_indices()
+        resultados[nombre]['indice PK (MB)'] = usado / 2 ** 20
+        resultados[nombre]['espacio libre en hojas'] = libre / usado
+
+    print(f'{filas} tareas, lotes de {TAMANO_LOTE}\n')
+    print(f'{"":<26}' + ''.join(f'{nombre:>12}' for nombre in GENERADORES))
+    for medida in resultados['uuid4']:
+        formato = '{:>12.1%}' if medida.startswith('espacio') else '{:>12.1f}'
+        print(f'{medida:<26}' + ''.join(formato.format(resultados[nombre][medida]) for nombre in GENERADORES))
+    os.remove(BASE_TEMPORAL)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Busqueda de texto en cursos, temas y tareas.
+
+    - MySQL: MATCH ... AGAINST en modo booleano sobre los indices FULLTEXT
+      de la migracion 0001. Cada palabra se busca como '+palabra*' (todas
+      obligatorias, por prefijo). Las tildes se ignoran porque la
+      intercalacion por defecto de MySQL 8 (utf8mb4_0900_ai_ci) no las
+      distingue, y la consulta se normaliza igual.
+    - Otros motores (SQLite en tests y desarrollo): el indice invertido en
+      memoria de busqueda.indice, con la misma semantica.
+
+Cada tipo devuelve sus mejores resultados con su relevancia y se mezclan
+ordenados de mayor a menor.
+"""
+from django.db import connection
+from django.db.models import F, FloatField
+from django.db.models.expressions import RawSQL
+
+from cursos.models import Curso
+from errorPages.listados import recorrer_por_lotes
+from errorPages.versiones import obtener_versiones
+from tareas.models import Tarea
+from temas.models import Tema
+from .indice import INDICES, IndiceInvertido, terminos
+
+#Lectura de las tablas al construir el indice en memoria
+TAMANO_LOTE = 5000
+
+
+class Fuente:
+    """
+    modelo  -- modelo en el que se busca
+    titulo  -- campo con el nombre o titulo; junto con 'descripcion' forma
+               el indice FULLTEXT
+    curso   -- ruta hasta el id del curso, para enlazar el resultado
+    recurso -- recurso en errorPages.versiones
+    """
+
+    def __init__(self, modelo, titulo, curso, recurso):
+        self.modelo = modelo
+        self.titulo = titulo
+        self.curso = curso
+        self.recurso = recurso
+
+    @property
+    def campos(self):
+        return (self.titulo, 'descripcion')
+
+
+FUENTES = {
+    'cursos': Fuente(Curso, 'nombre', 'id', 'cursos'),
+    'temas': Fuente(Tema, 'nombre', 'unidad__curso_id', 'temas'),
+    'tareas': Fuente(Tarea, 'titulo', 'tema__unidad__curso_id', 'tareas'),
+}
+
+
+def usa_fulltext():
+    return connection.vendor == 'mysql'
+
+
+def buscar_fulltext(fuente, consulta, cantidad):
+    q = connection.ops.quote_name
+    tabla = fuente.modelo._meta.db_table
+    columnas = ', '.join(f'{q(tabla)}.{q(campo)}' for campo in fuente.campos)
+    relevancia = RawSQL(
+        f'MATCH ({columnas}) AGAINST (%s IN BOOLEAN MODE)',
+        [' '.join(f'+{termino}*' for termino in consulta)],
+        output_field=FloatField(),
+    )
+    return list(
+        fuente.modelo.objects
+        .annotate(relevancia=relevancia)
+        .filter(relevancia__gt=0)
+        .order_by('-relevancia', 'id')
+        .values_list('relevancia', 'id')[:cantidad]
+    )
+
+
+def construir_indice(fuente):
+    #Se recorre en orden de id: IndiceInvertido.buscar desempata por numero de documento
+    indice = IndiceInvertido()
+    filas = fuente.modelo.objects.only('id', *fuente.campos)
+    for lote in recorrer_por_lotes(filas, ('id',), TAMANO_LOTE):
+        for fila in lote:
+            indice.agregar(fila.id, getattr(fila, fuente.titulo), fila.descripcion)
+    return indice.terminar()
+
+
+def buscar_en_memoria(tipo, fuente, consulta, cantidad):
+    version, = obtener_versiones([fuente.recurso])
+    indice = INDICES.obtener(tipo, version, lambda: construir_indice(fuente))
+    return indice.buscar(consulta, cantidad)
+
+
+def buscar(texto, tipos, cantidad):
+    """
+    Los `cantidad` resultados mas relevantes como tuplas (relevancia, tipo,
+    id), o una lista vacia si el texto no tiene palabras que buscar.
+    """
+    consulta = sorted(set(terminos(texto)))
+    if not consulta:
+        return []
+    resultados = []
+    for tipo in tipos:
+        fuente = FUENTES[tipo]
+        if usa_fulltext():
+            encontrados = buscar_fulltext(fuente, consulta, cantidad)
+        else:
+            encontrados = buscar_en_memoria(tipo, fuente, consulta, cantidad)
+        resultados.extend((relevancia, tipo, id) for relevancia, id in encontrados)
+    resultados.sort(key=lambda resultado: (-resultado[0], resultado[1], resultado[2]))
+    return resultados[:cantidad]
+
+
+def cargar(resultados):
+    """Lee las filas de los resultados con una consulta por tipo."""
+    ids = {}
+    for _, tipo, id in resultados:
+        ids.setdefault(tipo, []).append(id)
+    filas = {}
+    for tipo, ids_tipo in ids.items():
+        fuente = FUENTES[tipo]
+        for fila in fuente.modelo.objects.filter(pk__in=ids_tipo).values('id', *fuente.campos, id_curso=F(fuente.curso)):
+            filas[tipo, fila['id']] = fila
+    return filas
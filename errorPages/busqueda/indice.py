@@ -0,0 +1,163 @@
+"""
+Indice invertido en memoria para buscar en SQLite (tests y desarrollo), que
+no tiene FULLTEXT. En MySQL se usan los indices FULLTEXT (ver
+busqueda.buscador) y este modulo solo aporta la normalizacion del texto.
+
+Cada tipo (cursos, temas, tareas) tiene su propio indice por proceso. Se
+construye en la primera busqueda y se vuelve a construir cuando cambia la
+version del recurso (errorPages.versiones), que es compartida por todos los
+procesos; asi un indice nunca responde con datos de antes de una escritura.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from operator import itemgetter
+
+#Igual que innodb_ft_min_token_size, para que ambos motores ignoren lo mismo
+MINIMO_TERMINO = 3
+
+#Las palabras del titulo cuentan mas que las de la descripcion
+PESO_TITULO = 2
+
+PALABRAS_VACIAS = frozenset((
+    'que', 'los', 'las', 'del', 'por', 'con', 'una', 'uno', 'unos', 'unas', 'para', 'como', 'mas',
+    'pero', 'sus', 'les', 'este', 'esta', 'estos', 'estas', 'ese', 'esa', 'son', 'sin', 'sobre',
+    'entre', 'hay', 'muy', 'cada', 'the', 'and',
+))
+
+PALABRA = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    """Minusculas y sin tildes ni dieresis: 'Programación' -> 'programacion'."""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+
+
+def terminos(texto):
+    if not texto:
+        return []
+    return [
+        palabra for palabra in PALABRA.findall(normalizar(texto))
+        if len(palabra) >= MINIMO_TERMINO and palabra not in PALABRAS_VACIAS
+    ]
+
+
+class IndiceInvertido:
+    """
+    Para cada termino guarda los documentos que lo contienen y su frecuencia
+    en dos arreglos compactos (array), no en diccionarios por documento: con
+    un millon de tareas el indice ocupa decenas de MB y no gigabytes.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.documentos = {}
+        self.vocabulario = []
+
+    def agregar(self, id, titulo, descripcion):
+        numero = len(self.ids)
+        self.ids.append(id)
+        frecuencias = Counter(terminos(descripcion))
+        for termino in terminos(titulo):
+            frecuencias[termino] += PESO_TITULO
+        for termino, frecuencia in frecuencias.items():
+            documentos = self.documentos.get(termino)
+            if documentos is None:
+                documentos = self.documentos[termino] = (array('I'), array('H'))
+            documentos[0].append(numero)
+            documentos[1].append(min(frecuencia, 0xFFFF))
+
+    def terminar(self):
+        self.vocabulario = sorted(self.documentos)
+        return self
+
+    def expandir(self, prefijo):
+        """Terminos del vocabulario que empiezan con `prefijo` (como 'palabra*' en MySQL)."""
+        inicio = bisect.bisect_left(self.vocabulario, prefijo)
+        fin = bisect.bisect_left(self.vocabulario, prefijo + '\uffff')
+        return self.vocabulario[inicio:fin]
+
+    def frecuencia_total(self, grupo):
+        return sum(len(self.documentos[termino][0]) for termino in grupo)
+
+    def buscar(self, consulta, cantidad):
+        """
+        Los `cantidad` documentos mas relevantes que contienen todos los
+        terminos de `consulta` (como prefijos), como pares (relevancia, id).
+        La relevancia suma frecuencia * idf; a igual relevancia va primero el
+        id menor.
+
+        Los terminos se recorren del menos al mas frecuente: despues del
+        primero solo quedan candidatos, y si son pocos se buscan en los
+        arreglos (ordenados por documento) con bisect en lugar de recorrerlos.
+        Los recorridos completos usan dict(zip(...)) y map(), que corren en C.
+        """
+        if not consulta:
+            return []
+        total = len(self.ids)
+        grupos = sorted((self.expandir(prefijo) for prefijo in consulta), key=self.frecuencia_total)
+        if len(grupos) == 1 and len(grupos[0]) == 1:
+            #Un solo termino: el orden es el de la frecuencia, sin armar diccionarios
+            documentos, frecuencias = self.documentos[grupos[0][0]]
+            idf = math.log(1 + total / len(documentos))
+            mejores = heapq.nlargest(cantidad, zip(documentos, frecuencias), key=itemgetter(1))
+            return [(frecuencia * idf, self.ids[numero]) for numero, frecuencia in mejores]
+        puntajes = None
+        for grupo in grupos:
+            nuevos = {}
+            for termino in grupo:
+                documentos, frecuencias = self.documentos[termino]
+                idf = math.log(1 + total / len(documentos))
+                if puntajes is None and not nuevos:
+                    nuevos = dict(zip(documentos, map(idf.__rmul__, frecuencias)))
+                elif puntajes is None:
+                    for numero, frecuencia in zip(documentos, frecuencias):
+                        nuevos[numero] = nuevos.get(numero, 0) + frecuencia * idf
+                elif len(puntajes) * 16 < len(documentos):
+                    for numero, puntaje in puntajes.items():
+                        posicion = bisect.bisect_left(documentos, numero)
+                        if posicion < len(documentos) and documentos[posicion] == numero:
+                            nuevos[numero] = nuevos.get(numero, puntaje) + frecuencias[posicion] * idf
+                else:
+                    for numero, frecuencia in zip(documentos, frecuencias):
+                        if numero in puntajes:
+                            nuevos[numero] = nuevos.get(numero, puntajes[numero]) + frecuencia * idf
+            puntajes = nuevos
+            if not puntajes:
+                return []
+        #Los documentos se numeran en orden de id y los diccionarios conservan
+        #ese orden, asi que nlargest deja los empates ordenados por id
+        mejores = heapq.nlargest(cantidad, puntajes.items(), key=itemgetter(1))
+        return [(puntaje, self.ids[numero]) for numero, puntaje in mejores]
+
+
+class IndicesPorVersion:
+    """Un IndiceInvertido por tipo, reconstruido cuando cambia su version."""
+
+    def __init__(self):
+        self.indices = {}
+        self.lock = threading.Lock()
+
+    def obtener(self, tipo, version, construir):
+        actual = self.indices.get(tipo)
+        if actual is not None and actual[0] == version:
+            return actual[1]
+        with self.lock:
+            actual = self.indices.get(tipo)
+            if actual is None or actual[0] != version:
+                #La version se leyo antes de construir: si hay una escritura
+                #mientras tanto, la proxima busqueda vuelve a construirlo
+                actual = self.indices[tipo] = (version, construir())
+            return actual[1]
+
+    def limpiar(self):
+        self.indices.clear()
+
+
+INDICES = IndicesPorVersion()
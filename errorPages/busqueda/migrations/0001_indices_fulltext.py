@@ -0,0 +1,50 @@
+"""
+Indices FULLTEXT de MySQL para busqueda.buscador. Las columnas deben ser las
+mismas, y en el mismo orden, que las de MATCH (...) en buscar_fulltext.
+
+InnoDB reconstruye la tabla al crear su primer indice FULLTEXT (agrega la
+columna oculta FTS_DOC_ID), asi que conviene hacerlo en una ventana de
+mantenimiento. En otros motores no hace nada: se usa el indice en memoria.
+"""
+from django.db import migrations
+
+INDICES = [
+    ('cursos', 'Curso', 'curso_busqueda_ft', ('nombre', 'descripcion')),
+    ('temas', 'Tema', 'tema_busqueda_ft', ('nombre', 'descripcion')),
+    ('tareas', 'Tarea', 'tarea_busqueda_ft', ('titulo', 'descripcion')),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    q = schema_editor.quote_name
+    for app, modelo, nombre, columnas in INDICES:
+        tabla = apps.get_model(app, modelo)._meta.db_table
+        schema_editor.execute(
+            f'ALTER TABLE {q(tabla)} ADD FULLTEXT INDEX {q(nombre)} ({", ".join(map(q, columnas))})'
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    q = schema_editor.quote_name
+    for app, modelo, nombre, _ in INDICES:
+        tabla = apps.get_model(app, modelo)._meta.db_table
+        schema_editor.execute(f'ALTER TABLE {q(tabla)} DROP INDEX {q(nombre)}')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cursos', '0006_curso_total_inscripciones_curso_total_unidades'),
+        ('temas', '0005_tema_total_tareas'),
+        ('tareas', '0004_alter_tarea_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
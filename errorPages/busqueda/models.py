@@ -0,0 +1,4 @@
+from django.db import models
+
+# Sin modelos propios: los indices FULLTEXT de MySQL se crean en la migracion
+# 0001 sobre las tablas de cursos, temas y tareas.
@@ -0,0 +1,89 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from errorPages.pruebas import crear_curso_completo, crear_usuario
+from tareas.models import Tarea
+from .indice import INDICES, IndiceInvertido, normalizar, terminos
+
+
+class IndiceInvertidoTests(TestCase):
+    def test_normaliza_tildes_y_mayusculas(self):
+        self.assertEqual(normalizar('Programación ÑANDÚ'), 'programacion nandu')
+        self.assertEqual(terminos('Introducción a la programación de los datos'),
+                         ['introduccion', 'programacion', 'datos'])
+
+    def test_todos_los_terminos_por_prefijo(self):
+        indice = IndiceInvertido()
+        indice.agregar(1, 'Algebra lineal', 'Matrices y vectores')
+        indice.agregar(2, 'Vectores', 'Fisica basica')
+        indice.agregar(3, 'Historia', 'Sin relacion')
+        indice.terminar()
+        self.assertEqual({id for _, id in indice.buscar(['vector'], 10)}, {1, 2})
+        self.assertEqual([id for _, id in indice.buscar(['vector', 'matri'], 10)], [1])
+        self.assertEqual(indice.buscar(['quimica'], 10), [])
+        #El titulo pesa mas que la descripcion
+        self.assertEqual([id for _, id in indice.buscar(['vectores'], 10)], [2, 1])
+        self.assertEqual(len(indice.buscar(['vectores'], 1)), 1)
+
+
+class BusquedaTests(TestCase):
+    def setUp(self):
+        INDICES.limpiar()
+        self.client = APIClient()
+        self.client.force_authenticate(crear_usuario('alumno_busqueda'))
+        self.curso, _, self.tema, self.tarea = crear_curso_completo('busqueda')
+        self.curso.nombre = 'Programación en Python'
+        self.curso.save()
+        self.tarea.descripcion = 'Ejercicios de programacion con listas'
+        self.tarea.save()
+
+    def buscar(self, **params):
+        return self.client.get('/busqueda/', params)
+
+    def test_ignora_tildes_y_ordena_por_relevancia(self):
+        respuesta = self.buscar(q='PROGRAMACION')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        resultados = respuesta.json()['resultados']
+        self.assertEqual([(r['tipo'], r['id']) for r in resultados],
+                         [('cursos', str(self.curso.id)), ('tareas', str(self.tarea.id))])
+        self.assertEqual(resultados[1]['curso'], str(self.curso.id))
+
+    def test_filtra_por_tipo(self):
+        resultados = self.buscar(q='program', tipos='tareas').json()['resultados']
+        self.assertEqual([r['tipo'] for r in resultados], ['tareas'])
+        self.assertEqual(self.buscar(q='program', tipos='usuarios').status_code, 400)
+
+    def test_el_indice_ve_las_escrituras(self):
+        self.assertEqual(self.buscar(q='programacion', tipos='tareas').json()['resultados'][0]['id'],
+                         str(self.tarea.id))
+        nueva = Tarea.objects.create(titulo='Más programación', descripcion='', tema=self.tema,
+                                     fecha_entrega=datetime.date(2025, 4, 1))
+        self.tarea.delete()
+        resultados = self.buscar(q='programacion', tipos='tareas').json()['resultados']
+        self.assertEqual([r['id'] for r in resultados], [str(nueva.id)])
+
+    def test_paginacion(self):
+        for i in range(5):
+            Tarea.objects.create(titulo=f'Programacion {i}', descripcion='', tema=self.tema,
+                                 fecha_entrega=datetime.date(2025, 4, 1))
+        vistos = []
+        params = {'q': 'programacion', 'tipos': 'tareas', 'limit': 2}
+        while True:
+            pagina = self.buscar(**params).json()
+            vistos += [r['id'] for r in pagina['resultados']]
+            if not pagina['siguiente']:
+                break
+            params['cursor'] = pagina['siguiente']
+        self.assertEqual(len(vistos), 6)
+        self.assertEqual(len(set(vistos)), 6)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.buscar().status_code, 400)
+        self.assertEqual(self.buscar(q='programacion', cursor='xyz').status_code, 400)
+        self.assertEqual(self.buscar(q='de la').json()['resultados'], [])
+
+    def test_requiere_autenticacion(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.buscar(q='programacion').status_code, 401)
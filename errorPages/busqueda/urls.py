@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.buscar_contenido, name='buscar_contenido'),
+]
@@ -0,0 +1,82 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from errorPages.campos import ParametroInvalido
+from errorPages.listados import codificar_cursor, decodificar_cursor, obtener_limite
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import condicional
+from .buscador import FUENTES, buscar, cargar
+
+#Profundidad maxima de la paginacion: los resultados se ordenan por
+#relevancia, asi que mas alla de esto conviene refinar la busqueda
+MAXIMO_RESULTADOS = 1000
+
+#Caracteres de la descripcion que se devuelven en cada resultado
+LARGO_FRAGMENTO = 200
+
+
+def obtener_tipos(request):
+    valor = request.GET.get('tipos')
+    if not valor:
+        return list(FUENTES)
+    tipos = [tipo.strip() for tipo in valor.split(',') if tipo.strip()]
+    desconocidos = [tipo for tipo in tipos if tipo not in FUENTES]
+    if desconocidos or not tipos:
+        raise ParametroInvalido(f'Tipos validos: {", ".join(FUENTES)}')
+    return tipos
+
+
+def obtener_posicion(request):
+    cursor = request.GET.get('cursor')
+    if not cursor:
+        return 0
+    posicion, = decodificar_cursor(cursor, ('posicion',))
+    if not posicion.isdigit() or int(posicion) >= MAXIMO_RESULTADOS:
+        raise ParametroInvalido('Cursor invalido')
+    return int(posicion)
+
+
+def fragmento(texto):
+    texto = texto or ''
+    return texto if len(texto) <= LARGO_FRAGMENTO else texto[:LARGO_FRAGMENTO].rstrip() + '...'
+
+
+#Busqueda de texto en cursos, temas y tareas ordenada por relevancia
+#Uso: /busqueda/?q=<texto>&tipos=cursos,temas,tareas&limit=<n>&cursor=<cursor>
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condicional('cursos', 'temas', 'tareas')
+def buscar_contenido(request):
+    texto = request.GET.get('q', '').strip()
+    try:
+        if not texto:
+            raise ParametroInvalido('Debe indicar el texto a buscar en q')
+        tipos = obtener_tipos(request)
+        limite = obtener_limite(request)
+        posicion = obtener_posicion(request)
+    except ParametroInvalido as e:
+        return RespuestaJson({'error': str(e)}, status=400)
+
+    hasta = min(posicion + limite, MAXIMO_RESULTADOS)
+    # Se pide un resultado de mas para saber si existe una pagina siguiente
+    resultados = buscar(texto, tipos, hasta + 1)
+    pagina = resultados[posicion:hasta]
+    filas = cargar(pagina)
+    data = []
+    for relevancia, tipo, id in pagina:
+        fila = filas.get((tipo, id))
+        if fila is None:
+            #Eliminada entre la busqueda y la lectura
+            continue
+        data.append({
+            'tipo': tipo,
+            'id': id,
+            'titulo': fila[FUENTES[tipo].titulo],
+            'descripcion': fragmento(fila['descripcion']),
+            'curso': fila['id_curso'],
+            'relevancia': round(relevancia, 4),
+        })
+    siguiente = None
+    if len(resultados) > hasta and hasta < MAXIMO_RESULTADOS:
+        siguiente = codificar_cursor([hasta])
+    return RespuestaJson({'resultados': data, 'siguiente': siguiente, 'limite': limite})
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
 
+from errorPages.versiones import registrar_modelo
+
 
 class CursosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cursos'
+
+    def ready(self):
+        registrar_modelo(self.get_model('Curso'), 'cursos')
@@ -0,0 +1,43 @@
+from django.db.models import F, Prefetch
+from unidades.models import Unidad
+from temas.models import Tema
+from tareas.models import Tarea
+from .models import Curso
+
+#Columnas que leen las vistas de cursos (listado y detalle)
+COLUMNAS_CURSO = (
+    'id', 'nombre', 'descripcion', 'fecha_inicio', 'fecha_fin', 'estado', 'imagen_url',
+    'total_inscripciones', 'total_unidades',
+    'profesor', 'profesor__id', 'profesor__username', 'profesor__email',
+)
+
+#Queryset compartido por las vistas de lectura: trae al profesor en el mismo JOIN
+def consulta_cursos():
+    return Curso.objects.select_related('profesor').only(*COLUMNAS_CURSO)
+
+#Cursos en los que esta inscrito un usuario, con los datos de su inscripcion.
+#Se resuelve en una sola consulta: el filtro usa el indice de Inscripcion.usuario
+#y el JOIN trae curso, profesor e inscripcion a la vez.
+def consulta_cursos_de_usuario(usuario):
+    return (
+        consulta_cursos()
+        .filter(inscripciones__usuario=usuario)
+        .annotate(
+            id_inscripcion=F('inscripciones__id'),
+            fecha_inscripcion=F('inscripciones__fecha_inscripcion'),
+        )
+        .order_by('inscripciones__fecha_inscripcion', 'id')
+    )
+
+#Arbol curso -> unidades -> temas -> tareas. Se resuelve siempre con cuatro
+#consultas (una por nivel) sin importar cuantas unidades, temas o tareas haya;
+#cada nivel se une con el anterior por id y ya viene ordenado.
+def consulta_arbol_cursos():
+    unidades = Unidad.objects.only('id', 'nombre', 'orden', 'curso').order_by('orden', 'id')
+    temas = Tema.objects.only('id', 'nombre', 'descripcion', 'orden', 'unidad').order_by('orden', 'id')
+    tareas = Tarea.objects.only('id', 'titulo', 'descripcion', 'fecha_entrega', 'tema').order_by('fecha_entrega', 'id')
+    return consulta_cursos().prefetch_related(
+        Prefetch('unidades', queryset=unidades),
+        Prefetch('unidades__temas', queryset=temas),
+        Prefetch('unidades__temas__tareas', queryset=tareas),
+    )
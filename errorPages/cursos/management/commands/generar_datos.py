@@ -0,0 +1,56 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from errorPages.datos_sinteticos import PREFIJO, TAMANO_LOTE, VOLUMEN, Generador
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera un conjunto de datos sintetico y reproducible con volumenes de produccion '
+        '(usuarios, cursos, unidades, temas, tareas e inscripciones) para pruebas de carga'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semilla', type=int, default=0)
+        parser.add_argument('--hasta', type=datetime.date.fromisoformat,
+                            help='Fecha de referencia AAAA-MM-DD (por defecto, hoy); con la misma semilla y '
+                                 'la misma fecha se generan los mismos datos')
+        parser.add_argument('--escala', type=float, default=1.0,
+                            help='Multiplica todos los volumenes por defecto (p. ej. 0.01 para una prueba rapida)')
+        for tabla, cantidad in VOLUMEN.items():
+            parser.add_argument(f'--{tabla}', type=int, help=f'Filas de {tabla} (por defecto {cantidad} x escala)')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por bulk_create')
+        parser.add_argument('--prefijo', default=PREFIJO, help='Prefijo de los username generados')
+
+    def handle(self, *args, **options):
+        volumen = {
+            tabla: options[tabla] if options[tabla] is not None else round(cantidad * options['escala'])
+            for tabla, cantidad in VOLUMEN.items()
+        }
+        inicio = time.perf_counter()
+        anterior = {'tabla': None, 'informadas': 0}
+
+        def progreso(tabla, creadas):
+            if tabla != anterior['tabla']:
+                anterior.update(tabla=tabla, informadas=0)
+            #Una linea cada 10 lotes y al terminar la tabla
+            if creadas == volumen[tabla] or creadas - anterior['informadas'] >= 10 * options['lote']:
+                anterior['informadas'] = creadas
+                self.stdout.write(f'{tabla}: {creadas} de {volumen[tabla]} ({time.perf_counter() - inicio:.0f} s)')
+
+        generador = Generador(
+            semilla=options['semilla'],
+            hasta=options['hasta'],
+            tamano_lote=options['lote'],
+            prefijo=options['prefijo'],
+            progreso=progreso,
+        )
+        try:
+            creadas = generador.generar(volumen)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(creadas.values())} filas generadas en {time.perf_counter() - inicio:.0f} s'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from errorPages.contadores import CONTADORES
+
+
+class Command(BaseCommand):
+    help = 'Compara los contadores desnormalizados con COUNT(*) y corrige los que se hayan desviado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solo-revisar', action='store_true', help='Informa las desviaciones sin corregirlas')
+
+    def handle(self, *args, **options):
+        corregir = not options['solo_revisar']
+        for contador in CONTADORES:
+            desviados = contador.reconciliar(corregir=corregir)
+            if not desviados:
+                self.stdout.write(f'{contador}: sin desviaciones')
+            elif corregir:
+                self.stdout.write(self.style.WARNING(f'{contador}: {desviados} filas corregidas'))
+            else:
+                self.stdout.write(self.style.WARNING(f'{contador}: {desviados} filas desviadas'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['estado', 'fecha_inicio'], name='curso_estado_inicio_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:34
+
+import errorPages.identificadores
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0003_curso_curso_estado_inicio_idx'),
+    ]
+
+    #Solo cambia el default, que se calcula en Python: no hay cambio de
+    #esquema y las filas existentes conservan sus ids
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='curso',
+                    name='id',
+                    field=models.UUIDField(default=errorPages.identificadores.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
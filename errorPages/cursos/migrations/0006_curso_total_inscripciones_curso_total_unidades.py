@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def contar(modelo, columna):
+    filas = (
+        modelo.objects.filter(**{columna: OuterRef('pk')})
+        .order_by().values(columna).annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(filas), Value(0))
+
+
+def calcular_contadores(apps, schema_editor):
+    Curso = apps.get_model('cursos', 'Curso')
+    Curso.objects.update(
+        total_inscripciones=contar(apps.get_model('inscripciones', 'Inscripcion'), 'curso_id'),
+        total_unidades=contar(apps.get_model('unidades', 'Unidad'), 'curso_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscripciones', '0006_uuid_binario_mysql'),
+        ('unidades', '0004_alter_unidad_id'),
+        ('cursos', '0005_alter_curso_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='total_inscripciones',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='total_unidades',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
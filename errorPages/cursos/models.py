@@ -1,9 +1,9 @@
-import uuid
 from django.db import models
+from errorPages.identificadores import UUIDBinarioField, uuid7
 from usuarios.models import Usuario
 
 class Curso(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = UUIDBinarioField(primary_key=True, default=uuid7, editable=False)
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField()
     profesor = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='cursos')
@@ -11,6 +11,13 @@ class Curso(models.Model):
     fecha_fin = models.DateField()
     estado = models.BooleanField(default=True)
     imagen_url = models.URLField(max_length=500, blank=True, null=True)
+    #Contadores desnormalizados (ver errorPages.contadores)
+    total_inscripciones = models.PositiveIntegerField(default=0, editable=False)
+    total_unidades = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        #Cursos activos por fecha de inicio
+        indexes = [models.Index(fields=['estado', 'fecha_inicio'], name='curso_estado_inicio_idx')]
     
     def __str__(self):
         return self.nombre
\ No newline at end of file
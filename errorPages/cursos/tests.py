@@ -1,3 +1,298 @@
+import io
+import json
+import uuid
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from errorPages.contadores import Contador
+from errorPages.pruebas import ConsultasConstantesMixin, crear_curso_completo, crear_usuario
+from estadisticas.models import Estadistica
+from inscripciones.models import Inscripcion
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+from .models import Curso
+from .views import MAXIMO_ARBOLES
+
+
+class ConsultasCursosTests(ConsultasConstantesMixin, TestCase):
+    def test_listar_cursos_sin_consultas_por_fila(self):
+        self.assertConsultasConstantes('/cursos/listar_cursos/')
+        self.assertConsultasConstantes('/cursos/listar_cursos/', {'todos': 'true'})
+
+    def test_obtener_curso_una_consulta(self):
+        curso, _, _, _ = crear_curso_completo('detalle')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/cursos/obtener_curso/{curso.id}/')
+        self.assertEqual(respuesta.json()['profesor']['email'], curso.profesor.email)
+
+
+class PaginacionCursosTests(ConsultasConstantesMixin, TestCase):
+    def test_recorre_todas_las_paginas_una_vez(self):
+        self.crear_cursos(7)
+        #Empates en nombre: el orden los desempata por id
+        Curso.objects.filter(nombre__in=['Curso 2', 'Curso 3', 'Curso 4', 'Curso 5']).update(nombre='Repetido')
+        filas, paginas = self.recorrer_paginas('/cursos/listar_cursos/', 2)
+        ids = [curso['id'] for curso in filas]
+        self.assertEqual(sorted(ids), sorted(str(id) for id in Curso.objects.values_list('id', flat=True)))
+        self.assertEqual(len(ids), len(set(ids)))
+        esperado = [str(id) for id in Curso.objects.order_by('nombre', 'id').values_list('id', flat=True)]
+        self.assertEqual(ids, esperado)
+        self.assertEqual(len(paginas), 4)
+        self.assertIsNone(paginas[-1]['siguiente'])
+
+    def test_parametros_invalidos(self):
+        self.crear_cursos(1)
+        for params in ({'cursor': 'no-es-un-cursor'}, {'cursor': 'WzFd'}, {'limit': '0'},
+                       {'limit': '-3'}, {'limit': 'diez'}):
+            respuesta = self.client.get('/cursos/listar_cursos/', params)
+            self.assertEqual(respuesta.status_code, 400, params)
+            self.assertIn('error', respuesta.json())
+
+
+class MisCursosTests(ConsultasConstantesMixin, TestCase):
+    def test_solo_devuelve_cursos_del_usuario(self):
+        propio, _, _, _ = crear_curso_completo('propio', alumno=self.alumno)
+        crear_curso_completo('ajeno')
+        respuesta = self.client.get('/cursos/mis_cursos/')
+        self.assertEqual([curso['id'] for curso in respuesta.json()], [str(propio.id)])
+        self.assertIn('fecha_inscripcion', respuesta.json()[0]['inscripcion'])
+
+    def test_mis_cursos_una_consulta(self):
+        self.crear_cursos(3)
+        self.assertEqual(self.contar_consultas('/cursos/mis_cursos/'), 1)
+
+
+class ArbolCursosTests(ConsultasConstantesMixin, TestCase):
+    def test_arbol_ordenado_y_unido_por_id(self):
+        curso, unidad, tema, tarea = crear_curso_completo('arbol')
+        segunda = Unidad.objects.create(nombre=unidad.nombre, curso=curso, orden=0)
+        Tema.objects.create(nombre=tema.nombre, unidad=segunda, orden=1)
+        arbol = self.client.get(f'/cursos/arbol/{curso.id}/').json()
+        self.assertEqual([u['id'] for u in arbol['unidades']], [str(segunda.id), str(unidad.id)])
+        self.assertEqual(arbol['unidades'][0]['temas'][0]['tareas'], [])
+        self.assertEqual(arbol['unidades'][1]['temas'][0]['tareas'][0]['id'], str(tarea.id))
+
+    def test_arbol_cuatro_consultas(self):
+        self.crear_cursos(1)
+        ids = ','.join(str(id) for id in Curso.objects.values_list('id', flat=True))
+        self.assertEqual(self.contar_consultas('/cursos/arbol/', {'ids': ids}), 4)
+        self.crear_cursos(5)
+        ids = ','.join(str(id) for id in Curso.objects.values_list('id', flat=True))
+        self.assertEqual(self.contar_consultas('/cursos/arbol/', {'ids': ids}), 4)
+
+
+    def test_arbol_limita_la_cantidad_de_cursos(self):
+        curso, _, _, _ = crear_curso_completo('limite')
+        ids = [str(curso.id)] + [str(uuid.uuid4()) for _ in range(MAXIMO_ARBOLES - 1)]
+        respuesta = self.client.get('/cursos/arbol/', {'ids': ','.join(ids + [str(curso.id)])})
+        self.assertEqual([arbol['id'] for arbol in respuesta.json()], [str(curso.id)])
+        respuesta = self.client.get('/cursos/arbol/', {'ids': ','.join(ids + [str(uuid.uuid4())])})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('error', respuesta.json())
+
+
+class CamposCursosTests(ConsultasConstantesMixin, TestCase):
+    def test_fields_no_lee_descripcion_ni_hace_join(self):
+        self.crear_cursos(2)
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get('/cursos/listar_cursos/', {'fields': 'id,nombre'})
+        self.assertEqual(set(respuesta.json()['resultados'][0]), {'id', 'nombre'})
+        self.assertNotIn('descripcion', consultas[0]['sql'])
+        self.assertNotIn('JOIN', consultas[0]['sql'])
+
+    def test_fields_en_detalle(self):
+        curso, _, _, _ = crear_curso_completo('detalle')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/cursos/obtener_curso/{curso.id}/', {'fields': 'profesor'})
+        self.assertEqual(respuesta.json(), {'profesor': {
+            'id': str(curso.profesor.id), 'nombre': curso.profesor.username, 'email': curso.profesor.email,
+        }})
+
+
+class EtagCursosTests(ConsultasConstantesMixin, TestCase):
+    def test_304_sin_consultar_filas(self):
+        self.crear_cursos(2)
+        etag = self.client.get('/cursos/listar_cursos/')['ETag']
+        with self.assertNumQueries(0):
+            respuesta = self.client.get('/cursos/listar_cursos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_etag_cambia_al_modificar_curso_o_profesor(self):
+        curso, _, _, _ = crear_curso_completo('etag')
+        url = f'/cursos/obtener_curso/{curso.id}/'
+        etag = self.client.get(url)['ETag']
+        curso.profesor.username = 'renombrado'
+        curso.profesor.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['profesor']['nombre'], 'renombrado')
+        curso.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 404)
+
+
+class CacheListadosTests(ConsultasConstantesMixin, TestCase):
+    def test_segunda_peticion_sale_de_cache(self):
+        self.crear_cursos(2)
+        primera = self.client.get('/cursos/listar_cursos/')
+        with self.assertNumQueries(0):
+            segunda = self.client.get('/cursos/listar_cursos/')
+        self.assertEqual(primera.content, segunda.content)
+
+    def test_renombrar_profesor_invalida_listado(self):
+        curso, _, _, _ = crear_curso_completo('cache')
+        self.client.get('/cursos/listar_cursos/')
+        curso.profesor.username = 'renombrado'
+        curso.profesor.save()
+        respuesta = self.client.get('/cursos/listar_cursos/')
+        self.assertEqual(respuesta.json()['resultados'][0]['profesor']['nombre'], 'renombrado')
+
+    def test_estadisticas(self):
+        self.alumno.is_staff = True
+        self.alumno.save()
+        self.client.get('/cursos/listar_cursos/')
+        self.client.get('/cursos/listar_cursos/')
+        data = self.client.get('/cache/estadisticas/').json()
+        self.assertEqual(data['listar_cursos'], {'aciertos': 1, 'fallos': 1, 'tasa_aciertos': 0.5})
+
+
+class ContadoresTests(ConsultasConstantesMixin, TestCase):
+    def contadores(self, curso, tema):
+        curso.refresh_from_db()
+        tema.refresh_from_db()
+        return curso.total_inscripciones, curso.total_unidades, tema.total_tareas
+
+    def test_crear_mover_y_eliminar(self):
+        curso, _, tema, tarea = crear_curso_completo('contador', alumno=self.alumno)
+        self.assertEqual(self.contadores(curso, tema), (1, 1, 1))
+
+        otro, _, otro_tema, _ = crear_curso_completo('otro')
+        tarea.tema = otro_tema
+        tarea.save()
+        self.assertEqual(self.contadores(curso, tema), (1, 1, 0))
+        self.assertEqual(self.contadores(otro, otro_tema), (0, 1, 2))
+
+        #Borrado en cascada: el alumno se lleva su inscripcion
+        self.alumno.delete()
+        self.assertEqual(self.contadores(curso, tema), (0, 1, 0))
+
+    def test_lote_actualiza_contadores(self):
+        _, _, tema, _ = crear_curso_completo('lote')
+        _, _, otro_tema, _ = crear_curso_completo('lote-otro')
+        elementos = [
+            {'titulo': f'T{i}', 'descripcion': '', 'fecha_entrega': '2025-04-01', 'tema': str(tema.id)}
+            for i in range(3)
+        ]
+        respuesta = self.client.post('/tareas/registrar_lote/', json.dumps(elementos), content_type='application/json')
+        self.assertEqual(respuesta.json()['correctos'], 3)
+        tema.refresh_from_db()
+        self.assertEqual(tema.total_tareas, 4)
+
+        movida = respuesta.json()['resultados'][0]['id']
+        self.client.put('/tareas/actualizar_lote/', json.dumps([{'id': movida, 'tema': str(otro_tema.id)}]),
+                        content_type='application/json')
+        self.client.delete('/tareas/eliminar_lote/', json.dumps([respuesta.json()['resultados'][1]['id']]),
+                           content_type='application/json')
+        tema.refresh_from_db()
+        otro_tema.refresh_from_db()
+        self.assertEqual((tema.total_tareas, otro_tema.total_tareas), (2, 2))
+
+    def test_reconciliar_corrige_desviaciones(self):
+        curso, _, tema, _ = crear_curso_completo('reconciliar', alumno=self.alumno)
+        Curso.objects.filter(id=curso.id).update(total_inscripciones=7)
+        Tema.objects.filter(id=tema.id).update(total_tareas=0)
+        salida = io.StringIO()
+        call_command('reconciliar_contadores', '--solo-revisar', stdout=salida)
+        self.assertIn('Curso.total_inscripciones: 1 filas desviadas', salida.getvalue())
+        self.assertEqual(self.contadores(curso, tema), (7, 1, 0))
+        call_command('reconciliar_contadores', stdout=io.StringIO())
+        self.assertEqual(self.contadores(curso, tema), (1, 1, 1))
+
+    def test_contador_desviado_no_baja_de_cero(self):
+        curso, _, _, _ = crear_curso_completo('desviado')
+        #Filas creadas sin ajustar el contador: queda en 0 con 3 inscripciones
+        Inscripcion.objects.bulk_create([
+            Inscripcion(usuario=crear_usuario(f'bulk{i}'), curso=curso) for i in range(3)
+        ])
+        Inscripcion.objects.filter(curso=curso).first().delete()
+        Inscripcion.objects.filter(curso=curso).delete()
+        curso.refresh_from_db()
+        self.assertEqual(curso.total_inscripciones, 0)
+
+    def test_cascada_sin_un_update_por_fila(self):
+        curso, _, _, _ = crear_curso_completo('cascada')
+        otro, _, _, _ = crear_curso_completo('cascada-otro')
+        alumnos = [crear_usuario(f'cascada{i}') for i in range(30)]
+        for alumno in alumnos:
+            Inscripcion.objects.create(usuario=alumno, curso=curso)
+        for alumno in alumnos[:2]:
+            Inscripcion.objects.create(usuario=alumno, curso=otro)
+
+        #El curso se borra con sus inscripciones: no hay contador que actualizar
+        with CaptureQueriesContext(connection) as consultas:
+            curso.delete()
+        actualizaciones = [c['sql'] for c in consultas if c['sql'].startswith('UPDATE "cursos_curso"')]
+        self.assertEqual(actualizaciones, [])
+
+        #Dos alumnos con una inscripcion cada uno en otro: un solo UPDATE
+        with CaptureQueriesContext(connection) as consultas:
+            Usuario.objects.filter(id__in=[alumno.id for alumno in alumnos[:2]]).delete()
+        actualizaciones = [c['sql'] for c in consultas if c['sql'].startswith('UPDATE "cursos_curso"')]
+        self.assertEqual(len(actualizaciones), 1)
+        otro.refresh_from_db()
+        self.assertEqual(otro.total_inscripciones, 0)
+
+    def test_fila_y_contador_en_una_transaccion(self):
+        curso, _, _, _ = crear_curso_completo('transaccion')
+        with patch.object(Contador, 'ajustar', side_effect=DatabaseError('sin contador')):
+            with self.assertRaises(DatabaseError):
+                Inscripcion.objects.create(usuario=self.alumno, curso=curso)
+        self.assertFalse(Inscripcion.objects.filter(curso=curso).exists())
+
+    def test_listar_cursos_expone_contadores(self):
+        curso, _, _, _ = crear_curso_completo('listado', alumno=self.alumno)
+        Inscripcion.objects.create(usuario=crear_usuario('segundo'), curso=curso)
+        respuesta = self.client.get('/cursos/listar_cursos/', {'fields': 'id,total_inscripciones,total_unidades'})
+        self.assertEqual(respuesta.json()['resultados'], [
+            {'id': str(curso.id), 'total_inscripciones': 2, 'total_unidades': 1},
+        ])
+
+
+class GenerarDatosTests(TestCase):
+    VOLUMEN = ['--usuarios', '300', '--cursos', '12', '--unidades', '40', '--temas', '60',
+               '--tareas', '150', '--inscripciones', '700', '--hasta', '2025-06-01', '--lote', '100']
+
+    def generar(self, *argumentos):
+        call_command('generar_datos', *self.VOLUMEN, *argumentos, stdout=io.StringIO())
+
+    def test_volumenes_contadores_y_estadisticas(self):
+        self.generar()
+        sinteticos = Curso.objects.filter(profesor__username__startswith='sintetico_')
+        self.assertEqual(sinteticos.count(), 12)
+        self.assertEqual(Unidad.objects.filter(curso__in=sinteticos).count(), 40)
+        self.assertEqual(Inscripcion.objects.filter(curso__in=sinteticos).count(), 700)
+        self.assertTrue(all(total >= 1 for total in sinteticos.values_list('total_unidades', flat=True)))
+        salida = io.StringIO()
+        call_command('reconciliar_contadores', '--solo-revisar', stdout=salida)
+        self.assertNotIn('desviadas', salida.getvalue())
+        #Estadisticas incrementales, sin recalcular
+        self.assertEqual(Estadistica.objects.get(clave='tareas').valor, 150)
+
+    def test_misma_semilla_mismos_datos(self):
+        def filas():
+            return list(Inscripcion.objects.order_by('id').values_list('id', 'usuario__username', 'fecha_inscripcion'))
+
+        self.generar('--semilla', '7')
+        primera = filas()
+        Usuario.objects.filter(username__startswith='sintetico_').delete()
+        self.generar('--semilla', '7')
+        self.assertEqual(filas(), primera)
 
-# Create your tests here.
+    def test_prefijo_en_uso(self):
+        self.generar()
+        with self.assertRaises(CommandError):
+            self.generar()
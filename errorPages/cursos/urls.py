@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import listar_cursos, registrar_curso, actualizar_curso, eliminar_curso, obtener_curso
+from .views import listar_cursos, registrar_curso, actualizar_curso, eliminar_curso, obtener_curso, mis_cursos, arbol_cursos
 
 urlpatterns = [
     path('listar_cursos/', listar_cursos, name='listar_cursos'),
+    path('mis_cursos/', mis_cursos, name='mis_cursos'),
+    path('arbol/', arbol_cursos, name='arbol_cursos'),
+    path('arbol/<str:id>/', arbol_cursos, name='arbol_curso'),
     path('registrar_curso/', registrar_curso, name='registrar_curso'),
     path('actualizar_curso/<str:id>/', actualizar_curso, name='actualizar_curso'),
     path('eliminar_curso/<str:id>/', eliminar_curso, name='eliminar_curso'),
@@ -1,6 +1,6 @@
 import json
+import uuid
 from django.shortcuts import render
-from django.http import JsonResponse
 from .models import Curso
 from .forms import CursoForm
 from django.shortcuts import render, redirect, get_object_or_404
@@ -8,55 +8,150 @@ from django.views.decorators.csrf import csrf_exempt
 from usuarios.models import Usuario  # Agrega este import al inicio
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from errorPages.campos import Campo, ParametroInvalido, campos_solicitados, proyectar, serializar
+from errorPages.cache_listados import cachear_listado
+from errorPages.listados import responder_listado
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import condicional
+from .consultas import consulta_cursos, consulta_cursos_de_usuario, consulta_arbol_cursos
+
+#Clave de orden estable para la paginacion por cursor
+ORDEN_CURSOS = ('nombre', 'id')
+
+#Cursos por peticion en /cursos/arbol/?ids=: cada uno trae todo su temario
+MAXIMO_ARBOLES = 50
+
+#Campos de cada curso en el listado: columnas que necesita y como se obtiene
+CAMPOS_CURSO = {
+    'id': Campo('id', lambda curso: curso.id),
+    'nombre': Campo('nombre', lambda curso: curso.nombre),
+    'descripcion': Campo('descripcion', lambda curso: curso.descripcion),
+    'profesor': Campo(('profesor__id', 'profesor__username'), lambda curso: {
+        'id': curso.profesor.id,
+        'nombre': curso.profesor.username
+    }),
+    'fecha_inicio': Campo('fecha_inicio', lambda curso: curso.fecha_inicio.isoformat() if curso.fecha_inicio else None),
+    'fecha_fin': Campo('fecha_fin', lambda curso: curso.fecha_fin.isoformat() if curso.fecha_fin else None),
+    'estado': Campo('estado', lambda curso: curso.estado),
+    'imagen_url': Campo('imagen_url', lambda curso: curso.imagen_url),
+    'total_inscripciones': Campo('total_inscripciones', lambda curso: curso.total_inscripciones),
+    'total_unidades': Campo('total_unidades', lambda curso: curso.total_unidades),
+}
+
+#El detalle incluye ademas el email del profesor
+CAMPOS_DETALLE_CURSO = {
+    **CAMPOS_CURSO,
+    'profesor': Campo(('profesor__id', 'profesor__username', 'profesor__email'), lambda curso: {
+        'id': curso.profesor.id,
+        'nombre': curso.profesor.username,
+        'email': curso.profesor.email
+    }),
+}
+
+#Convierte un curso al diccionario que se devuelve en el listado
+def serializar_curso(curso):
+    return serializar(curso, CAMPOS_CURSO)
 
 #Metodo que devuelve el JSON
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('cursos', 'usuarios')
+@cachear_listado('cursos', 'usuarios')
 def listar_cursos(request):
-    cursos = Curso.objects.all()
+    cursos = consulta_cursos()
+    return responder_listado(request, cursos, ORDEN_CURSOS, CAMPOS_CURSO)
+
+#Metodo que devuelve solo los cursos en los que esta inscrito el usuario actual
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condicional('cursos', 'usuarios', 'inscripciones', por_usuario=True)
+def mis_cursos(request):
+    cursos = consulta_cursos_de_usuario(request.user)
     data = [
         {
-            'id': curso.id,
-            'nombre': curso.nombre,
-            'descripcion': curso.descripcion,
-            'profesor': {
-                'id': curso.profesor.id,
-                'nombre': curso.profesor.username
+            **serializar_curso(curso),
+            'inscripcion': {
+                'id': curso.id_inscripcion,
+                'fecha_inscripcion': curso.fecha_inscripcion,
             },
-            'fecha_inicio': curso.fecha_inicio.isoformat() if curso.fecha_inicio else None,
-            'fecha_fin': curso.fecha_fin.isoformat() if curso.fecha_fin else None,
-            'estado': curso.estado,
-            'imagen_url': curso.imagen_url,
-        } 
+        }
         for curso in cursos
     ]
-    return JsonResponse(data, safe=False)
+    return RespuestaJson(data)
+
+#Convierte un curso con sus unidades, temas y tareas ya precargados en un arbol
+def serializar_arbol_curso(curso):
+    return {
+        **serializar_curso(curso),
+        'unidades': [
+            {
+                'id': unidad.id,
+                'nombre': unidad.nombre,
+                'orden': unidad.orden,
+                'temas': [
+                    {
+                        'id': tema.id,
+                        'nombre': tema.nombre,
+                        'descripcion': tema.descripcion,
+                        'orden': tema.orden,
+                        'tareas': [
+                            {
+                                'id': tarea.id,
+                                'titulo': tarea.titulo,
+                                'descripcion': tarea.descripcion,
+                                'fecha_entrega': tarea.fecha_entrega,
+                            }
+                            for tarea in tema.tareas.all()
+                        ],
+                    }
+                    for tema in unidad.temas.all()
+                ],
+            }
+            for unidad in curso.unidades.all()
+        ],
+    }
+
+#Metodo que devuelve el temario completo de uno o varios cursos
+#Uso: /cursos/arbol/<id>/ o /cursos/arbol/?ids=<id>,<id>
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condicional('cursos', 'usuarios', 'unidades', 'temas', 'tareas')
+def arbol_cursos(request, id=None):
+    valores = [id] if id else request.GET.get('ids', '').split(',')
+    try:
+        ids = {uuid.UUID(valor.strip()) for valor in valores if valor.strip()}
+    except ValueError:
+        return RespuestaJson({'error': 'Id de curso invalido'}, status=400)
+    if not ids:
+        return RespuestaJson({'error': 'Debe indicar al menos un curso'}, status=400)
+    if len(ids) > MAXIMO_ARBOLES:
+        return RespuestaJson({'error': f'Se pueden pedir hasta {MAXIMO_ARBOLES} cursos'}, status=400)
+
+    cursos = consulta_arbol_cursos().filter(id__in=ids).order_by('nombre', 'id')
+    data = [serializar_arbol_curso(curso) for curso in cursos]
+    if id:
+        if not data:
+            return RespuestaJson({'error': 'Curso no encontrado'}, status=404)
+        return RespuestaJson(data[0], status=200)
+    return RespuestaJson(data)
 
 @csrf_exempt
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('cursos', 'usuarios')
 def obtener_curso(request, id):
     if request.method == 'GET':
-        curso = get_object_or_404(Curso, id=id)
         try:
-            data = {
-                'id': curso.id,
-                'nombre': curso.nombre,
-                'descripcion': curso.descripcion,
-                'profesor': {
-                    'id': curso.profesor.id,
-                    'nombre': curso.profesor.username,
-                    'email': curso.profesor.email
-                },
-                'fecha_inicio': curso.fecha_inicio,
-                'fecha_fin': curso.fecha_fin,
-                'estado': curso.estado,
-                'imagen_url': curso.imagen_url,
-            }
-            return JsonResponse(data, status=200)
+            claves = campos_solicitados(request, CAMPOS_DETALLE_CURSO)
+        except ParametroInvalido as e:
+            return RespuestaJson({'error': str(e)}, status=400)
+        curso = get_object_or_404(proyectar(consulta_cursos(), CAMPOS_DETALLE_CURSO, claves), id=id)
+        try:
+            data = serializar(curso, CAMPOS_DETALLE_CURSO, claves)
+            return RespuestaJson(data, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 #Funcion que registre sin recargar la pagina osea sin hacer render 
 @csrf_exempt
@@ -83,15 +178,15 @@ def registrar_curso(request):
                 imagen_url=data.get('imagen_url', None),
             )
             #Retornar un JSON con un mensaje de exito y el id del curso creado
-            return JsonResponse({'mensaje': 'Curso creado correctamente', 'id': curso.id}, status=201)
+            return RespuestaJson({'mensaje': 'Curso creado correctamente', 'id': curso.id}, status=201)
         #Si hay un error
         except Usuario.DoesNotExist:
-            return JsonResponse({'error': 'El profesor especificado no existe'}, status=400)
+            return RespuestaJson({'error': 'El profesor especificado no existe'}, status=400)
         except Exception as e:
             #Retornar un JSON con un mensaje de error
-            return JsonResponse({'error': str(e)}, status=400)
+            return RespuestaJson({'error': str(e)}, status=400)
     #Si el metodo no es POST
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 
 #Funcion que actualiza un curso
@@ -117,12 +212,12 @@ def actualizar_curso(request, id):
             curso.estado = data['estado']
             curso.imagen_url = data.get('imagen_url', curso.imagen_url)
             curso.save()
-            return JsonResponse({'mensaje': 'Curso actualizado correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Curso actualizado correctamente'}, status=200)
         except Usuario.DoesNotExist:
-            return JsonResponse({'error': 'El profesor especificado no existe'}, status=400)
+            return RespuestaJson({'error': 'El profesor especificado no existe'}, status=400)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)   
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)   
 
 
 #Funcion que elimina un curso
@@ -138,11 +233,11 @@ def eliminar_curso(request, id):
             #Eliminar el curso
             curso.delete()
             #Retornar un JSON con un mensaje de exito
-            return JsonResponse({'mensaje': 'Curso eliminado correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Curso eliminado correctamente'}, status=200)
         #Si hay un error
         except Exception as e:
             #Retornar un JSON con un mensaje de error
-            return JsonResponse({'error': str(e)}, status=400)
+            return RespuestaJson({'error': str(e)}, status=400)
     #Si el metodo no es DELETE
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
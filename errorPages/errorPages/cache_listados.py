@@ -0,0 +1,93 @@
+"""
+Cache de respuestas para las vistas listar_*.
+
+La clave de cada respuesta se forma con la version (generacion) de todos los
+recursos que aparecen en ella, mas la ruta con sus parametros. Como las
+versiones cambian con post_save/post_delete (ver errorPages.versiones), una
+escritura deja inaccesibles todas las entradas que dependian de ella sin
+tener que borrarlas una por una. Por ejemplo renombrar a un Usuario cambia la
+version de 'usuarios' y con ello las entradas de listar_cursos, que muestran
+el nombre del profesor.
+
+Los aciertos y fallos se cuentan por vista y se consultan en
+/cache/estadisticas/.
+"""
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from errorPages.listados import FORMATOS_STREAMING
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import calcular_etag
+
+#Las entradas no se invalidan por tiempo sino por version; el tiempo solo
+#sirve para que las versiones viejas terminen saliendo de la cache
+TIEMPO_CACHE = 60 * 60
+
+VISTAS_CACHEADAS = []
+
+
+def clave_contador(vista, tipo):
+    return f'cache-listado:{tipo}:{vista}'
+
+
+def contar(vista, tipo):
+    clave = clave_contador(vista, tipo)
+    cache.add(clave, 0, None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        #El contador fue expulsado entre add() e incr()
+        cache.set(clave, 1, None)
+
+
+def cachear_listado(*recursos):
+    """
+    Decorador para las vistas listar_*: guarda el cuerpo de las respuestas 200
+    bajo una clave versionada por `recursos`. Las respuestas por streaming no
+    se guardan porque su objetivo es no tener la tabla completa en memoria.
+    """
+    def decorador(vista):
+        nombre = vista.__name__
+        VISTAS_CACHEADAS.append(nombre)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.GET.get('formato') in FORMATOS_STREAMING:
+                return vista(request, *args, **kwargs)
+
+            clave = f'cache-listado:{nombre}:{calcular_etag(request, recursos)}'
+            guardado = cache.get(clave)
+            if guardado is not None:
+                contar(nombre, 'aciertos')
+                return HttpResponse(guardado, content_type='application/json')
+
+            contar(nombre, 'fallos')
+            respuesta = vista(request, *args, **kwargs)
+            if respuesta.status_code == 200 and not respuesta.streaming:
+                cache.set(clave, respuesta.content, TIEMPO_CACHE)
+            return respuesta
+        return envoltura
+    return decorador
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def estadisticas_cache(request):
+    contadores = cache.get_many(
+        [clave_contador(vista, tipo) for vista in VISTAS_CACHEADAS for tipo in ('aciertos', 'fallos')]
+    )
+    data = {}
+    for vista in VISTAS_CACHEADAS:
+        aciertos = contadores.get(clave_contador(vista, 'aciertos'), 0)
+        fallos = contadores.get(clave_contador(vista, 'fallos'), 0)
+        total = aciertos + fallos
+        data[vista] = {
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': round(aciertos / total, 4) if total else None,
+        }
+    return RespuestaJson(data)
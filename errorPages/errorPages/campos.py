@@ -0,0 +1,60 @@
+"""
+Campos dispersos (?fields=) para las vistas de listado y detalle.
+
+Cada vista describe su respuesta como un diccionario ordenado de Campo: la
+clave JSON, las columnas que necesita y como se obtiene el valor. Con eso
+se puede recortar la salida a los campos pedidos y, sobre todo, reducir la
+consulta SQL con .only() para que columnas grandes (descripcion, password,
+token...) ni siquiera se lean de la base de datos.
+
+Uso: /cursos/listar_cursos/?fields=id,nombre,profesor
+"""
+
+
+class ParametroInvalido(ValueError):
+    """Error en los parametros de consulta enviados por el cliente."""
+
+
+class Campo:
+    """Un campo de la respuesta: columnas que necesita y como se obtiene."""
+
+    def __init__(self, columnas, obtener):
+        self.columnas = (columnas,) if isinstance(columnas, str) else tuple(columnas)
+        self.obtener = obtener
+
+
+def campos_solicitados(request, campos):
+    """Claves pedidas en ?fields=, en el orden de la definicion."""
+    valor = request.GET.get('fields')
+    if not valor:
+        return list(campos)
+    claves = {clave.strip() for clave in valor.split(',') if clave.strip()}
+    desconocidos = sorted(claves.difference(campos))
+    if desconocidos:
+        raise ParametroInvalido(f'Campos desconocidos: {", ".join(desconocidos)}')
+    return [clave for clave in campos if clave in claves]
+
+
+def proyectar(queryset, campos, claves, extra=()):
+    """
+    Limita el SELECT a las columnas de los campos pedidos (mas las de
+    `extra`, por ejemplo la clave de orden) y solo hace JOIN con las
+    relaciones que esos campos usan.
+    """
+    columnas = list(extra)
+    for clave in claves:
+        columnas.extend(campos[clave].columnas)
+    #Cada tramo de una ruta como tema__unidad__curso__nombre: tema, tema__unidad y tema__unidad__curso
+    relaciones = sorted({
+        '__'.join(partes[:fin])
+        for partes in (columna.split('__') for columna in columnas)
+        for fin in range(1, len(partes))
+    })
+    queryset = queryset.select_related(None)
+    if relaciones:
+        queryset = queryset.select_related(*relaciones)
+    return queryset.only(*relaciones, *columnas)
+
+
+def serializar(objeto, campos, claves=None):
+    return {clave: campos[clave].obtener(objeto) for clave in (claves or campos)}
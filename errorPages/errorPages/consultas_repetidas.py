@@ -0,0 +1,181 @@
+"""
+Detector de consultas N+1 y duplicadas.
+
+Registra cada SELECT de una peticion (o de un bloque `with Detector():`) con
+su huella: el SQL sin literales, con las listas IN (%s, %s, ...) reducidas a
+una sola, de modo que `WHERE id = 3` y `WHERE id = 8` dan la misma huella.
+Al terminar senala:
+
+    n+1        la misma huella lanzada settings.CONSULTAS_REPETIDAS_UMBRAL
+               veces o mas desde la misma linea; tipicamente un acceso a una
+               relacion sin select_related/prefetch_related dentro de un
+               bucle (`inscripcion.curso.nombre`), que se indica aparte
+    duplicada  la misma consulta, con los mismos parametros, mas de una vez
+
+Cada hallazgo apunta a la linea de la vista (el views.py mas interno de la
+pila; si no hay, el archivo del proyecto mas interno) que lanzo la consulta.
+
+settings.CONSULTAS_REPETIDAS elige el modo:
+
+    'estricto'  lanza ConsultasRepetidas (en los tests)
+    'avisar'    escribe un warning en el logger errorPages.consultas (en
+                desarrollo)
+    None        sin detector; el middleware se quita de la cadena
+
+Cuando una repeticion es intencional (lotes que se validan fila por fila,
+por ejemplo) se envuelve el codigo en `with permitir_repetidas():`, como
+hace listados.recorrer_por_lotes con cada lote.
+"""
+import linecache
+import logging
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger('errorPages.consultas')
+
+MODOS = ('estricto', 'avisar')
+LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+LISTAS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+ESPACIOS = re.compile(r'\s+')
+#La consulta salio de un descriptor de relacion (curso.profesor, tema.unidad...)
+DESCRIPTORES = os.path.join('django', 'db', 'models', 'fields', 'related_descriptors.py')
+
+_local = threading.local()
+
+
+class ConsultasRepetidas(Exception):
+    pass
+
+
+def huella(sql):
+    sql = LITERALES.sub('?', sql.replace('%s', '?'))
+    return ESPACIOS.sub(' ', LISTAS.sub('(...)', sql)).strip()
+
+
+def origen():
+    """(archivo, linea, funcion) de la vista que lanzo la consulta y si paso por una relacion."""
+    base = str(settings.BASE_DIR)
+    propio = __file__
+    proyecto = None
+    relacion = False
+    marco = sys._getframe(2)
+    while marco is not None:
+        archivo = marco.f_code.co_filename
+        if archivo.endswith(DESCRIPTORES):
+            relacion = True
+        elif archivo.startswith(base) and archivo != propio and 'site-packages' not in archivo:
+            lugar = (os.path.relpath(archivo, base), marco.f_lineno, marco.f_code.co_name)
+            if archivo.endswith('views.py'):
+                return lugar, relacion
+            if proyecto is None:
+                proyecto = lugar
+        marco = marco.f_back
+    return proyecto, relacion
+
+
+class Detector:
+    """execute_wrapper que guarda los SELECT; tambien se usa como contexto."""
+
+    def __init__(self, modo=None, umbral=None, alias=DEFAULT_DB_ALIAS):
+        self.modo = modo or settings.CONSULTAS_REPETIDAS
+        self.umbral = umbral or settings.CONSULTAS_REPETIDAS_UMBRAL
+        self.alias = alias
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and not getattr(_local, 'permitidas', 0) and sql.lstrip()[:6].upper() == 'SELECT':
+            lugar, relacion = origen()
+            self.consultas.append((huella(sql), sql, repr(params), lugar, relacion))
+        return execute(sql, params, many, context)
+
+    def hallazgos(self):
+        por_linea = {}
+        identicas = {}
+        for consulta in self.consultas:
+            por_linea.setdefault((consulta[0], consulta[3]), []).append(consulta)
+            identicas.setdefault((consulta[1], consulta[2]), []).append(consulta)
+        hallazgos = []
+        for (forma, lugar), grupo in por_linea.items():
+            if len(grupo) >= self.umbral:
+                hallazgos.append({
+                    'tipo': 'n+1', 'veces': len(grupo), 'sql': forma, 'lugar': lugar,
+                    'relacion': any(consulta[4] for consulta in grupo),
+                })
+        en_n_mas_uno = {(hallazgo['sql'], hallazgo['lugar']) for hallazgo in hallazgos}
+        for grupo in identicas.values():
+            #Las que ya forman parte de un n+1 no se cuentan dos veces
+            if len(grupo) > 1 and (grupo[0][0], grupo[0][3]) not in en_n_mas_uno:
+                hallazgos.append({
+                    'tipo': 'duplicada', 'veces': len(grupo), 'sql': grupo[0][0],
+                    'lugar': grupo[0][3], 'relacion': any(consulta[4] for consulta in grupo),
+                })
+        return hallazgos
+
+    def informar(self, contexto):
+        hallazgos = self.hallazgos()
+        if not hallazgos:
+            return
+        mensaje = describir(hallazgos, contexto)
+        if self.modo == 'estricto':
+            raise ConsultasRepetidas(mensaje)
+        logger.warning(mensaje)
+
+    def __enter__(self):
+        connections[self.alias].execute_wrappers.append(self)
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        connections[self.alias].execute_wrappers.remove(self)
+        #Si el bloque ya fallo, no se tapa su excepcion
+        if tipo is None:
+            self.informar('bloque')
+
+
+def describir(hallazgos, contexto):
+    lineas = [f'{len(hallazgos)} consulta(s) repetida(s) en {contexto}:']
+    for hallazgo in hallazgos:
+        if hallazgo['lugar']:
+            archivo, linea, funcion = hallazgo['lugar']
+            codigo = linecache.getline(os.path.join(settings.BASE_DIR, archivo), linea).strip()
+            lugar = f'{archivo}:{linea} en {funcion}(): {codigo}'
+        else:
+            lugar = 'fuera del proyecto'
+        relacion = ', acceso a una relacion' if hallazgo['relacion'] else ''
+        lineas.append(f'  [{hallazgo["tipo"]}] {hallazgo["veces"]} veces{relacion}, {lugar}')
+        lineas.append(f'      {hallazgo["sql"]}')
+    return '\n'.join(lineas)
+
+
+@contextmanager
+def permitir_repetidas():
+    """Las consultas del bloque no se registran."""
+    _local.permitidas = getattr(_local, 'permitidas', 0) + 1
+    try:
+        yield
+    finally:
+        _local.permitidas -= 1
+
+
+class ConsultasRepetidasMiddleware:
+    def __init__(self, get_response):
+        if settings.CONSULTAS_REPETIDAS not in MODOS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = Detector()
+        envoltorios = connections[DEFAULT_DB_ALIAS].execute_wrappers
+        envoltorios.append(detector)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            envoltorios.remove(detector)
+        detector.informar(f'{request.method} {request.path}')
+        return respuesta
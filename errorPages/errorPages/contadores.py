@@ -0,0 +1,179 @@
+"""
+Contadores desnormalizados (inscripciones y unidades por curso, tareas por
+tema).
+
+Cada contador se registra en el ready() de la app del modelo hijo y se
+mantiene con UPDATE ... SET campo = campo + n (expresiones F(), sin leer el
+valor actual), asi que las escrituras concurrentes no pierden incrementos:
+
+    - post_save de una fila nueva suma 1 a su padre
+    - post_save que cambia la clave foranea mueve 1 del padre anterior al nuevo
+    - un borrado resta las filas borradas de cada padre con un UPDATE por
+      cada diferencia distinta, no uno por fila, al final del borrado (ver
+      errorPages.eliminaciones). Las filas borradas en cascada junto con su
+      padre no lo actualizan: el padre tambien desaparece
+
+Los modelos hijos heredan ContadoresMixin para que la fila y su contador se
+escriban en la misma transaccion. bulk_create/bulk_update no envian
+senales: quien los use debe llamar a ajustar_contadores() /
+mover_contadores() dentro de su transaction.atomic (ver errorPages.lotes).
+Un contador nunca baja de 0, aunque se haya desviado; cualquier desviacion
+se corrige con `python manage.py reconciliar_contadores`.
+"""
+from collections import defaultdict
+
+from django.db import router, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_save, pre_save
+
+from errorPages.eliminaciones import al_eliminar
+from errorPages.versiones import cambiar_version
+
+CONTADORES = []
+
+
+class Contador:
+    """
+    hijo     -- modelo que se cuenta (p. ej. Inscripcion)
+    atributo -- columna de la clave foranea al padre (p. ej. 'curso_id')
+    padre    -- modelo que guarda el contador (p. ej. Curso)
+    campo    -- campo del contador en el padre
+    recurso  -- recurso del padre en errorPages.versiones
+    """
+
+    def __init__(self, hijo, atributo, padre, campo, recurso):
+        self.hijo = hijo
+        self.atributo = atributo
+        self.padre = padre
+        self.campo = campo
+        self.recurso = recurso
+
+    def __str__(self):
+        return f'{self.padre.__name__}.{self.campo}'
+
+    def ajustar(self, cambios):
+        """
+        Aplica {id del padre: diferencia}. Se agrupan los padres con la misma
+        diferencia, de modo que un lote hace una consulta por cada diferencia
+        distinta y no una por padre.
+        """
+        por_diferencia = defaultdict(list)
+        for id_padre, diferencia in cambios.items():
+            if id_padre is not None and diferencia:
+                por_diferencia[diferencia].append(id_padre)
+        for diferencia, ids in por_diferencia.items():
+            valor = F(self.campo) + diferencia
+            if diferencia < 0:
+                #GREATEST(campo, n) - n en vez de GREATEST(campo - n, 0): en
+                #MySQL la columna es UNSIGNED y campo - n fallaria antes
+                valor = Greatest(F(self.campo), Value(-diferencia)) + diferencia
+            self.padre.objects.filter(pk__in=ids).update(**{self.campo: valor})
+        if por_diferencia:
+            #update() no envia post_save
+            cambiar_version(self.recurso)
+
+    def total_real(self):
+        filas = (
+            self.hijo.objects
+            .filter(**{self.atributo: OuterRef('pk')})
+            .order_by()
+            .values(self.atributo)
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return Coalesce(Subquery(filas), Value(0))
+
+    def reconciliar(self, corregir=True):
+        """Padres cuyo contador no coincide con COUNT(*); si `corregir`, se reparan."""
+        desviados = (
+            self.padre.objects
+            .annotate(total_real=self.total_real())
+            .exclude(**{self.campo: F('total_real')})
+        )
+        cantidad = desviados.count()
+        if cantidad and corregir:
+            #Un solo UPDATE con subconsulta correlacionada para toda la tabla
+            self.padre.objects.filter(pk__in=desviados.values('pk')).update(**{self.campo: self.total_real()})
+            cambiar_version(self.recurso)
+        return cantidad
+
+
+class ContadoresMixin:
+    """Para los modelos hijos: la fila y los contadores de sus padres se guardan en una transaccion."""
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+def contadores_de(modelo):
+    return [contador for contador in CONTADORES if contador.hijo is modelo]
+
+
+def ajustar_contadores(modelo, objetos, signo):
+    """Suma (signo=1) o resta (signo=-1) los objetos a los contadores de sus padres."""
+    for contador in contadores_de(modelo):
+        cambios = defaultdict(int)
+        for objeto in objetos:
+            cambios[getattr(objeto, contador.atributo)] += signo
+        contador.ajustar(cambios)
+
+
+def valores_contados(modelo, objeto):
+    """Claves foraneas de `objeto` que tienen contador, para mover_contadores()."""
+    return {contador.atributo: getattr(objeto, contador.atributo) for contador in contadores_de(modelo)}
+
+
+def mover_contadores(modelo, cambios):
+    """`cambios` son pares (valores_contados() antes de modificar, objeto modificado)."""
+    for contador in contadores_de(modelo):
+        diferencias = defaultdict(int)
+        for anteriores, objeto in cambios:
+            anterior, nuevo = anteriores[contador.atributo], getattr(objeto, contador.atributo)
+            if anterior != nuevo:
+                diferencias[anterior] -= 1
+                diferencias[nuevo] += 1
+        contador.ajustar(diferencias)
+
+
+def registrar_contador(hijo, atributo, padre, campo, recurso):
+    contador = Contador(hijo, atributo, padre, campo, recurso)
+    CONTADORES.append(contador)
+    anteriores = f'_contador_anterior_{campo}'
+
+    def antes_de_guardar(sender, instance, raw=False, **kwargs):
+        if raw or instance._state.adding:
+            return
+        #Valor guardado de la clave foranea, para saber si la fila cambia de padre
+        setattr(instance, anteriores, sender.objects.filter(pk=instance.pk).values_list(atributo, flat=True).first())
+
+    def despues_de_guardar(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            #loaddata: los contadores se recalculan con reconciliar_contadores
+            return
+        nuevo = getattr(instance, atributo)
+        if created:
+            contador.ajustar({nuevo: 1})
+            return
+        anterior = instance.__dict__.pop(anteriores, nuevo)
+        if anterior != nuevo:
+            contador.ajustar({anterior: -1, nuevo: 1})
+
+    def despues_de_eliminar(objetos, borrados):
+        cambios = defaultdict(int)
+        for objeto in objetos.get(hijo, ()):
+            cambios[getattr(objeto, atributo)] -= 1
+        #Los padres que se borran en el mismo borrado no se actualizan
+        for id_padre in borrados.get(padre, ()):
+            cambios.pop(id_padre, None)
+        contador.ajustar(cambios)
+
+    uid = f'contador:{padre._meta.label}.{campo}'
+    pre_save.connect(antes_de_guardar, sender=hijo, weak=False, dispatch_uid=f'{uid}:pre_save')
+    post_save.connect(despues_de_guardar, sender=hijo, weak=False, dispatch_uid=f'{uid}:post_save')
+    #El padre se registra para saber si se borra junto con sus hijos
+    al_eliminar(hijo, despues_de_eliminar, f'{uid}:eliminar')
+    al_eliminar(padre, despues_de_eliminar, f'{uid}:eliminar')
+    return contador
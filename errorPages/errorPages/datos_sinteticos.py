@@ -0,0 +1,388 @@
+"""
+Datos sinteticos con volumenes de produccion para pruebas de carga.
+
+Los usa el comando `python manage.py generar_datos`. Con la misma semilla y
+la misma fecha de referencia (--hasta) se generan exactamente las mismas
+filas, ids incluidos, en SQLite o MySQL. Cada tabla tiene su propio
+generador aleatorio, asi que cambiar el volumen de una tabla no cambia las
+filas de las tablas anteriores.
+
+Distribuciones:
+
+    - usuarios: 93% student, 6% teacher, 1% admin; 4% desactivados; altas
+      repartidas en los tres anos anteriores a --hasta
+    - cursos: unos pocos profesores dictan muchos cursos (pesos lognormales);
+      cuatrimestres, semestres, trimestres y cursos anuales; activos los que
+      no terminaron y un 10% de los terminados
+    - unidades por curso, temas por unidad y tareas por tema: lognormales,
+      al menos una por padre mientras alcance. `orden` empieza en 1 y en un
+      10% de los padres tiene huecos (elementos eliminados)
+    - fecha_entrega: avanza con la posicion de la unidad dentro del curso y
+      la mitad cae en viernes
+    - inscripciones: la popularidad de los cursos sigue una ley de Zipf y
+      la cantidad de cursos por alumno es lognormal; cada alumno se inscribe
+      una sola vez en cada curso, entre un mes antes y dos semanas despues
+      del inicio
+
+Las filas se insertan con bulk_create por lotes, cada lote en su propia
+transaccion, y los ids son uuid7 crecientes en el orden de insercion (cada
+INSERT cae al final del indice, como en produccion). Tras cada lote se
+cambia la version del recurso y se envia filas_creadas_en_lote (estadisticas);
+los contadores desnormalizados se calculan al final con una sola consulta
+por contador (Contador.reconciliar).
+
+Todos los usuarios comparten la contrasena CLAVE, de modo que un script de
+carga puede pedir tokens para cualquiera de ellos.
+"""
+import datetime
+import itertools
+import random
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from cursos.models import Curso
+from errorPages.contadores import CONTADORES
+from errorPages.identificadores import MAXIMO_CONTADOR, componer_uuid7
+from errorPages.senales import filas_creadas_en_lote
+from errorPages.versiones import cambiar_version
+from inscripciones.models import Inscripcion
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+#Volumen aproximado de produccion; el orden es el de insercion
+VOLUMEN = {
+    'usuarios': 200_000,
+    'cursos': 5_000,
+    'unidades': 80_000,
+    'temas': 80_000,
+    'tareas': 500_000,
+    'inscripciones': 2_000_000,
+}
+TAMANO_LOTE = 5000
+CLAVE = 'clave-sintetica'
+PREFIJO = 'sintetico'
+
+ROLES = ('student', 'teacher', 'admin')
+PESOS_ROLES = (93, 6, 1)
+#Duracion de los cursos en dias y su frecuencia
+DURACIONES = (120, 180, 90, 365)
+PESOS_DURACIONES = (45, 30, 15, 10)
+
+NOMBRES = (
+    'Ana', 'Luis', 'Maria', 'Carlos', 'Lucia', 'Jorge', 'Sofia', 'Diego', 'Valeria', 'Miguel',
+    'Camila', 'Andres', 'Paula', 'Javier', 'Daniela', 'Fernando', 'Gabriela', 'Ricardo', 'Elena', 'Pablo',
+)
+APELLIDOS = (
+    'Garcia', 'Rodriguez', 'Martinez', 'Lopez', 'Gonzalez', 'Perez', 'Sanchez', 'Ramirez', 'Torres', 'Flores',
+    'Rivera', 'Gomez', 'Diaz', 'Cruz', 'Morales', 'Reyes', 'Ortiz', 'Castro', 'Vargas', 'Rojas',
+)
+MATERIAS = (
+    'Programacion', 'Algebra', 'Calculo', 'Fisica', 'Quimica', 'Historia', 'Redes', 'Bases de datos',
+    'Estadistica', 'Ingles', 'Biologia', 'Economia', 'Contabilidad', 'Diseno', 'Literatura', 'Sistemas operativos',
+)
+NIVELES = ('I', 'II', 'III', 'basico', 'intermedio', 'avanzado')
+TIPOS_TAREA = ('Practica', 'Ejercicios', 'Proyecto', 'Cuestionario', 'Lectura', 'Informe', 'Laboratorio')
+PALABRAS = (
+    'analisis', 'conceptos', 'ejemplos', 'introduccion', 'funciones', 'estructuras', 'modelos', 'metodos',
+    'problemas', 'teoria', 'aplicaciones', 'variables', 'datos', 'sistemas', 'procesos', 'diseno',
+    'evaluacion', 'practica', 'lectura', 'resumen', 'investigacion', 'algoritmos', 'ecuaciones', 'graficos',
+    'historia', 'principios', 'herramientas', 'proyecto', 'casos', 'revision',
+)
+
+
+def lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while lote := list(itertools.islice(iterador, tamano)):
+        yield lote
+
+
+def repartir(total, pesos, aleatorio, maximo=None):
+    """
+    Reparte `total` hijos entre len(pesos) padres en proporcion a `pesos`.
+    Cada padre recibe al menos uno mientras alcance y nunca mas de `maximo`.
+    """
+    cantidad = len(pesos)
+    minimo = 1 if total >= cantidad else 0
+    cantidades = [minimo] * cantidad
+    if cantidad and total > minimo * cantidad:
+        acumulados = list(itertools.accumulate(pesos))
+        for indice in aleatorio.choices(range(cantidad), cum_weights=acumulados, k=total - minimo * cantidad):
+            cantidades[indice] += 1
+    if maximo is not None:
+        sobrante = 0
+        for indice, valor in enumerate(cantidades):
+            if valor > maximo:
+                sobrante += valor - maximo
+                cantidades[indice] = maximo
+        #El llamador garantiza total <= maximo * len(pesos)
+        for indice in itertools.cycle(range(cantidad)):
+            if not sobrante:
+                break
+            if cantidades[indice] < maximo:
+                cantidades[indice] += 1
+                sobrante -= 1
+    return cantidades
+
+
+def cantidades_roles(usuarios):
+    """{rol: cantidad} exacta para `usuarios`; los alumnos se llevan el redondeo."""
+    cantidades = {rol: round(usuarios * peso / sum(PESOS_ROLES)) for rol, peso in zip(ROLES[1:], PESOS_ROLES[1:])}
+    return {ROLES[0]: usuarios - sum(cantidades.values()), **cantidades}
+
+
+def pesos_lognormales(cantidad, sigma, aleatorio):
+    return [aleatorio.lognormvariate(0, sigma) for _ in range(cantidad)]
+
+
+def ordenes(cantidad, aleatorio):
+    """Valores de `orden` de los hijos de un padre: 1..n o, a veces, con huecos."""
+    if aleatorio.random() >= 0.1:
+        return range(1, cantidad + 1)
+    return list(itertools.accumulate(aleatorio.randint(1, 3) for _ in range(cantidad)))
+
+
+def texto(aleatorio, minimo, maximo):
+    return ' '.join(aleatorio.choices(PALABRAS, k=aleatorio.randint(minimo, maximo))).capitalize()
+
+
+class Identificadores:
+    """uuid7 reproducibles y estrictamente crecientes a partir de `ms`."""
+
+    def __init__(self, aleatorio, ms):
+        self.aleatorio = aleatorio
+        self.ms = ms
+        self.contador = 0
+
+    def __call__(self):
+        self.contador += 1
+        if self.contador > MAXIMO_CONTADOR:
+            self.ms, self.contador = self.ms + 1, 0
+        return componer_uuid7(self.ms, self.contador, self.aleatorio.getrandbits(62))
+
+
+@contextmanager
+def fechas_explicitas(*campos):
+    """bulk_create pisa los campos auto_now_add con la hora actual; aqui se generan."""
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+class Generador:
+    """
+    semilla  -- semilla de todos los generadores aleatorios
+    hasta    -- fecha de referencia (date): las altas e inscripciones son
+                anteriores y los cursos empiezan hasta tres meses despues
+    progreso -- funcion que se llama con (tabla, filas creadas) tras cada lote
+    """
+
+    def __init__(self, semilla=0, hasta=None, tamano_lote=TAMANO_LOTE, prefijo=PREFIJO, progreso=None):
+        self.semilla = semilla
+        self.hasta = hasta or datetime.date.today()
+        self.tamano_lote = tamano_lote
+        self.prefijo = prefijo
+        self.progreso = progreso
+        self.desde = self.hasta - datetime.timedelta(days=3 * 365)
+        #Padres ya insertados que necesitan las tablas siguientes
+        self.alumnos = []
+        self.profesores = []
+        self.cursos = []
+        self.unidades = []
+        self.temas = []
+
+    def aleatorio(self, tabla):
+        return random.Random(f'{self.semilla}:{tabla}')
+
+    def identificadores(self, aleatorio):
+        inicio = datetime.datetime.combine(self.desde, datetime.time(), datetime.timezone.utc)
+        return Identificadores(aleatorio, int(inicio.timestamp() * 1000))
+
+    def momento(self, dia, aleatorio):
+        """Instante al azar dentro de `dia`, sin pasar de --hasta."""
+        dia = min(dia, self.hasta)
+        inicio = datetime.datetime.combine(dia, datetime.time(), datetime.timezone.utc)
+        return inicio + datetime.timedelta(seconds=aleatorio.randrange(86400))
+
+    def validar(self, volumen):
+        if Usuario.objects.filter(username__startswith=f'{self.prefijo}_').exists():
+            raise ValueError(f'Ya hay usuarios con el prefijo {self.prefijo}_; use otro prefijo')
+        alumnos = cantidades_roles(volumen['usuarios'])[ROLES[0]]
+        if volumen['cursos'] and not volumen['usuarios']:
+            raise ValueError('Los cursos necesitan al menos un usuario que los dicte')
+        if volumen['inscripciones'] > alumnos * volumen['cursos']:
+            raise ValueError('Hay mas inscripciones que pares (alumno, curso) posibles')
+        for hijo, padre in (('unidades', 'cursos'), ('temas', 'unidades'), ('tareas', 'temas')):
+            if volumen[hijo] and not volumen[padre]:
+                raise ValueError(f'No se pueden generar {hijo} sin {padre}')
+
+    def generar(self, volumen=VOLUMEN):
+        """Genera todas las tablas y devuelve {tabla: filas creadas}."""
+        volumen = {**VOLUMEN, **volumen}
+        self.validar(volumen)
+        creadas = {}
+        with fechas_explicitas(Usuario._meta.get_field('fecha_creacion'),
+                               Inscripcion._meta.get_field('fecha_inscripcion')):
+            for tabla, modelo, filas in (
+                ('usuarios', Usuario, self.filas_usuarios(volumen['usuarios'])),
+                ('cursos', Curso, self.filas_cursos(volumen['cursos'])),
+                ('unidades', Unidad, self.filas_unidades(volumen['unidades'])),
+                ('temas', Tema, self.filas_temas(volumen['temas'])),
+                ('tareas', Tarea, self.filas_tareas(volumen['tareas'])),
+                ('inscripciones', Inscripcion, self.filas_inscripciones(volumen['inscripciones'])),
+            ):
+                creadas[tabla] = self.insertar(tabla, modelo, filas)
+        #bulk_create no pasa por los contadores: una consulta por contador
+        for contador in CONTADORES:
+            contador.reconciliar()
+        return creadas
+
+    def insertar(self, tabla, modelo, filas):
+        total = 0
+        for lote in lotes(filas, self.tamano_lote):
+            with transaction.atomic():
+                modelo.objects.bulk_create(lote)
+            #bulk_create no envia post_save
+            cambiar_version(tabla)
+            filas_creadas_en_lote.send(sender=modelo, objetos=lote)
+            total += len(lote)
+            if self.progreso:
+                self.progreso(tabla, total)
+        return total
+
+    def filas_usuarios(self, cantidad):
+        aleatorio = self.aleatorio('usuarios')
+        nuevo_id = self.identificadores(aleatorio)
+        #Un solo hash para todos: calcular 200k hashes tardaria horas
+        password = make_password(CLAVE)
+        dias = sorted(aleatorio.randrange((self.hasta - self.desde).days + 1) for _ in range(cantidad))
+        roles = [rol for rol, total in cantidades_roles(cantidad).items() for _ in range(total)]
+        aleatorio.shuffle(roles)
+        for numero, (dia, rol) in enumerate(zip(dias, roles), start=1):
+            username = f'{self.prefijo}_{numero:07d}'
+            usuario = Usuario(
+                id=nuevo_id(),
+                username=username,
+                email=f'{username}@ejemplo.com',
+                password=password,
+                nombre_completo=f'{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}',
+                rol=rol,
+                fecha_creacion=self.momento(self.desde + datetime.timedelta(days=dia), aleatorio),
+                is_active=aleatorio.random() >= 0.04,
+                is_staff=rol == 'admin',
+            )
+            if rol == 'student':
+                self.alumnos.append(usuario.id)
+            elif rol == 'teacher':
+                self.profesores.append(usuario.id)
+            yield usuario
+
+    def filas_cursos(self, cantidad):
+        aleatorio = self.aleatorio('cursos')
+        nuevo_id = self.identificadores(aleatorio)
+        #En un volumen muy chico puede no haber profesores
+        profesores = self.profesores or self.alumnos
+        pesos = list(itertools.accumulate(pesos_lognormales(len(profesores), 1.0, aleatorio)))
+        dias = (self.hasta - self.desde).days + 90
+        for inicio in sorted(aleatorio.randrange(dias) for _ in range(cantidad)):
+            fecha_inicio = self.desde + datetime.timedelta(days=inicio)
+            duracion, = aleatorio.choices(DURACIONES, weights=PESOS_DURACIONES)
+            fecha_fin = fecha_inicio + datetime.timedelta(days=duracion)
+            materia = aleatorio.choice(MATERIAS)
+            curso = Curso(
+                id=nuevo_id(),
+                nombre=f'{materia} {aleatorio.choice(NIVELES)}',
+                descripcion=f'{materia}: {texto(aleatorio, 10, 40)}',
+                profesor_id=aleatorio.choices(profesores, cum_weights=pesos)[0],
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                estado=fecha_fin >= self.hasta or aleatorio.random() < 0.1,
+            )
+            self.cursos.append((curso.id, fecha_inicio, duracion))
+            yield curso
+
+    def filas_unidades(self, cantidad):
+        aleatorio = self.aleatorio('unidades')
+        nuevo_id = self.identificadores(aleatorio)
+        por_curso = repartir(cantidad, pesos_lognormales(len(self.cursos), 0.5, aleatorio), aleatorio)
+        for indice_curso, total in enumerate(por_curso):
+            for posicion, orden in enumerate(ordenes(total, aleatorio)):
+                unidad = Unidad(
+                    id=nuevo_id(),
+                    nombre=f'Unidad {posicion + 1}: {texto(aleatorio, 1, 3)}',
+                    curso_id=self.cursos[indice_curso][0],
+                    orden=orden,
+                )
+                #Fraccion del curso que cubre la unidad, para las fechas de entrega
+                self.unidades.append((unidad.id, indice_curso, posicion / total, (posicion + 1) / total))
+                yield unidad
+
+    def filas_temas(self, cantidad):
+        aleatorio = self.aleatorio('temas')
+        nuevo_id = self.identificadores(aleatorio)
+        por_unidad = repartir(cantidad, pesos_lognormales(len(self.unidades), 0.6, aleatorio), aleatorio)
+        for indice_unidad, total in enumerate(por_unidad):
+            for orden in ordenes(total, aleatorio):
+                tema = Tema(
+                    id=nuevo_id(),
+                    nombre=texto(aleatorio, 2, 5),
+                    unidad_id=self.unidades[indice_unidad][0],
+                    descripcion=texto(aleatorio, 5, 25) if aleatorio.random() < 0.7 else None,
+                    orden=orden,
+                )
+                self.temas.append((tema.id, indice_unidad))
+                yield tema
+
+    def filas_tareas(self, cantidad):
+        aleatorio = self.aleatorio('tareas')
+        nuevo_id = self.identificadores(aleatorio)
+        por_tema = repartir(cantidad, pesos_lognormales(len(self.temas), 0.7, aleatorio), aleatorio)
+        for (id_tema, indice_unidad), total in zip(self.temas, por_tema):
+            _, indice_curso, desde, hasta = self.unidades[indice_unidad]
+            _, fecha_inicio, duracion = self.cursos[indice_curso]
+            for numero in range(1, total + 1):
+                dia = round(duracion * aleatorio.uniform(desde, hasta))
+                if aleatorio.random() < 0.5:
+                    #Viernes siguiente, sin pasar del fin del curso
+                    dia = min(dia + (4 - (fecha_inicio.weekday() + dia)) % 7, duracion)
+                yield Tarea(
+                    id=nuevo_id(),
+                    titulo=f'{aleatorio.choice(TIPOS_TAREA)} {numero}',
+                    descripcion=texto(aleatorio, 8, 40) if aleatorio.random() < 0.8 else None,
+                    fecha_entrega=fecha_inicio + datetime.timedelta(days=dia),
+                    tema_id=id_tema,
+                )
+
+    def filas_inscripciones(self, cantidad):
+        aleatorio = self.aleatorio('inscripciones')
+        nuevo_id = self.identificadores(aleatorio)
+        #Popularidad de Zipf con el ranking de los cursos al azar
+        rangos = list(range(1, len(self.cursos) + 1))
+        aleatorio.shuffle(rangos)
+        popularidad = list(itertools.accumulate(rango ** -0.9 for rango in rangos))
+        indices = range(len(self.cursos))
+        por_alumno = repartir(cantidad, pesos_lognormales(len(self.alumnos), 0.8, aleatorio), aleatorio,
+                              maximo=len(self.cursos))
+        for id_usuario, total in zip(self.alumnos, por_alumno):
+            if total > len(self.cursos) // 4:
+                elegidos = aleatorio.sample(indices, total)
+            else:
+                elegidos = set()
+                while len(elegidos) < total:
+                    elegidos.update(aleatorio.choices(indices, cum_weights=popularidad, k=total - len(elegidos)))
+            for indice_curso in sorted(elegidos):
+                id_curso, fecha_inicio, _ = self.cursos[indice_curso]
+                dia = fecha_inicio + datetime.timedelta(days=aleatorio.randint(-30, 14))
+                yield Inscripcion(
+                    id=nuevo_id(),
+                    usuario_id=id_usuario,
+                    curso_id=id_curso,
+                    fecha_inscripcion=self.momento(dia, aleatorio),
+                )
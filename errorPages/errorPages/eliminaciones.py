@@ -0,0 +1,94 @@
+"""
+Agrupa las senales post_delete de un mismo borrado.
+
+Model.delete() y QuerySet.delete() abren su propio transaction.atomic,
+envian pre_delete por cada fila que van a borrar (tambien las de cascada),
+borran y luego envian post_delete por cada una. Quien mantiene totales
+(errorPages.contadores, estadisticas.resumen) no debe hacer un UPDATE por
+fila borrada: registra aqui una funcion con al_eliminar() para uno o mas
+modelos, y la funcion se llama una sola vez por borrado, tras el ultimo
+post_delete y todavia dentro de la transaccion del borrado, con:
+
+    objetos  -- {modelo: filas borradas} de los modelos que registro
+    borrados -- {modelo: ids} de las filas del borrado de todos los modelos
+                registrados, para no actualizar padres que tambien se
+                estan borrando (el padre tambien se registra)
+
+Cada borrado se identifica por su bloque atomic (connection.atomic_blocks),
+asi que un reintento o un borrado anidado nunca se mezclan con otro.
+"""
+import weakref
+from collections import defaultdict
+
+from django.db import connections
+from django.db.models.signals import post_delete, pre_delete
+
+#{uid: (modelos, funcion)}; el uid evita registrar dos veces, como dispatch_uid
+RECEPTORES = {}
+MODELOS = set()
+
+#Bloque atomic del borrado -> Borrado; desaparece con el bloque
+_borrados = weakref.WeakKeyDictionary()
+
+
+class Borrado:
+    def __init__(self):
+        #post_delete que faltan
+        self.pendientes = 0
+        self.ids = defaultdict(set)
+        self.objetos = defaultdict(list)
+
+
+def al_eliminar(modelo, funcion, uid):
+    """
+    Llama a funcion(objetos, borrados) una vez por borrado que incluya filas
+    de `modelo`. Con el mismo uid se agregan modelos a la misma funcion.
+    """
+    modelos, _ = RECEPTORES.get(uid, (set(), None))
+    modelos.add(modelo)
+    RECEPTORES[uid] = (modelos, funcion)
+    if modelo not in MODELOS:
+        MODELOS.add(modelo)
+        #Solo para los modelos registrados: una senal sin sender haria que
+        #ningun borrado pudiera usar el DELETE rapido de Django
+        etiqueta = modelo._meta.label
+        pre_delete.connect(antes_de_eliminar, sender=modelo, weak=False, dispatch_uid=f'eliminaciones:{etiqueta}:pre')
+        post_delete.connect(despues_de_eliminar, sender=modelo, weak=False, dispatch_uid=f'eliminaciones:{etiqueta}:post')
+
+
+def bloque(using):
+    bloques = connections[using].atomic_blocks
+    return bloques[-1] if bloques else None
+
+
+def entregar(objetos, borrados):
+    for modelos, funcion in list(RECEPTORES.values()):
+        propios = {modelo: objetos[modelo] for modelo in modelos if modelo in objetos}
+        if propios:
+            funcion(propios, borrados)
+
+
+def antes_de_eliminar(sender, instance, using, **kwargs):
+    clave = bloque(using)
+    if clave is None:
+        return
+    borrado = _borrados.get(clave)
+    if borrado is None:
+        borrado = _borrados[clave] = Borrado()
+    borrado.ids[sender].add(instance.pk)
+    borrado.pendientes += 1
+
+
+def despues_de_eliminar(sender, instance, using, **kwargs):
+    clave = bloque(using)
+    borrado = _borrados.get(clave) if clave is not None else None
+    if borrado is None or not borrado.pendientes:
+        #post_delete sin su pre_delete (enviado a mano): se entrega solo
+        entregar({sender: [instance]}, {sender: {instance.pk}})
+        return
+    borrado.objetos[sender].append(instance)
+    borrado.pendientes -= 1
+    if not borrado.pendientes:
+        del _borrados[clave]
+        entregar(borrado.objetos, borrado.ids)
+
@@ -0,0 +1,95 @@
+"""
+UUID version 7 (RFC 9562) para las claves primarias.
+
+Los primeros 48 bits son la marca de tiempo Unix en milisegundos, asi que los
+ids nuevos llegan en orden creciente. En InnoDB la tabla esta agrupada por la
+clave primaria: con uuid4 cada INSERT cae en una pagina al azar (divisiones
+de pagina y un buffer pool disperso); con uuid7 todos caen al final del
+indice. Los ids uuid4 existentes siguen siendo validos, solo se ordenan
+distinto.
+
+Los 12 bits que siguen a la version son un contador dentro del mismo
+milisegundo (metodo 1 del RFC), de modo que los ids generados por un proceso
+son estrictamente crecientes incluso en un bulk_create.
+
+UUIDBinarioField guarda esos mismos ids en 16 bytes en MySQL.
+"""
+import os
+import threading
+import time
+import uuid
+
+from django.db import models
+
+_candado = threading.Lock()
+_ultimo_ms = 0
+_contador = 0
+
+MAXIMO_CONTADOR = 0xFFF
+
+
+def _marca_y_contador():
+    global _ultimo_ms, _contador
+    with _candado:
+        ahora = time.time_ns() // 1_000_000
+        if ahora > _ultimo_ms:
+            #Se empieza en la mitad inferior para dejar espacio al contador
+            _ultimo_ms, _contador = ahora, int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            #Mismo milisegundo (o el reloj retrocedio): se sigue el contador y,
+            #si se agota, se toma prestado el milisegundo siguiente
+            _contador += 1
+            if _contador > MAXIMO_CONTADOR:
+                _ultimo_ms, _contador = _ultimo_ms + 1, 0
+        return _ultimo_ms, _contador
+
+
+def componer_uuid7(ms, contador, aleatorio):
+    """UUID v7 con los 48 bits de tiempo, 12 de contador y 62 aleatorios dados."""
+    valor = (ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | contador << 64 | 0b10 << 62 | aleatorio
+    return uuid.UUID(int=valor)
+
+
+def uuid7():
+    ms, contador = _marca_y_contador()
+    return componer_uuid7(ms, contador, int.from_bytes(os.urandom(8), 'big') & 0x3FFF_FFFF_FFFF_FFFF)
+
+
+class UUIDBinarioField(models.UUIDField):
+    """
+    UUIDField que en MySQL se guarda como BINARY(16) en lugar de char(32).
+    Las claves foraneas heredan el tipo de la clave a la que apuntan, asi que
+    curso_id, unidad_id, etc. tambien ocupan 16 bytes, igual que la copia de
+    la clave primaria en cada indice secundario de InnoDB.
+
+    En Python el valor sigue siendo uuid.UUID, asi que las vistas, los
+    filtros y la salida JSON no cambian. En otros motores se usa la columna
+    normal de UUIDField (char(32) en SQLite, uuid en PostgreSQL).
+    """
+    description = 'UUID (BINARY(16) en MySQL)'
+
+    def get_internal_type(self):
+        #Con 'UUIDField' el backend de MySQL intentaria leer los 16 bytes
+        #como texto hexadecimal antes de llegar a from_db_value()
+        return 'UUIDBinarioField'
+
+    def db_type(self, connection):
+        if connection.vendor == 'mysql':
+            return 'binary(16)'
+        return connection.data_types['UUIDField']
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if connection.vendor != 'mysql':
+            return super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = self.to_python(value)
+        return value.bytes
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return uuid.UUID(bytes=bytes(value))
+        return uuid.UUID(value)
@@ -0,0 +1,228 @@
+"""
+Respuestas compartidas por las vistas listar_* de todas las apps.
+
+Los listados se paginan por keyset (cursor): cada pagina se pide con el
+cursor opaco que devolvio la anterior y la consulta filtra por la clave de
+orden en lugar de usar OFFSET, de modo que pedir la pagina 1000 cuesta lo
+mismo que pedir la primera.
+
+Parametros de la peticion:
+    limit   -- numero de filas por pagina (por defecto LIMITE_POR_DEFECTO)
+    cursor  -- cursor devuelto en 'siguiente' por la pagina anterior
+    todos   -- 'true' para obtener la lista completa sin paginar (formato
+               anterior, se conserva por compatibilidad)
+    fields  -- campos a incluir separados por comas (ver errorPages.campos)
+    formato -- 'stream' devuelve la tabla completa como un arreglo JSON que se
+               va enviando por partes; 'ndjson' la devuelve con un objeto JSON
+               por linea. En ambos casos la memoria por peticion no depende
+               del tamano de la tabla.
+"""
+import base64
+import binascii
+import csv
+import io
+import json
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+from errorPages.campos import ParametroInvalido, campos_solicitados, proyectar, serializar
+from errorPages.consultas_repetidas import permitir_repetidas
+from errorPages.renderizado import RespuestaJson, codificar
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+#Filas que se leen de la base de datos por cada consulta al transmitir
+TAMANO_LOTE = 2000
+
+FORMATOS_STREAMING = {
+    'stream': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+VALORES_VERDADEROS = ('1', 'true', 'si', 'yes')
+
+
+def es_verdadero(valor):
+    return valor is not None and valor.strip().lower() in VALORES_VERDADEROS
+
+
+def obtener_limite(request):
+    valor = request.GET.get('limit')
+    if valor in (None, ''):
+        return LIMITE_POR_DEFECTO
+    try:
+        limite = int(valor)
+    except ValueError:
+        raise ParametroInvalido('El parametro limit debe ser un numero entero')
+    if limite < 1:
+        raise ParametroInvalido('El parametro limit debe ser mayor que cero')
+    return min(limite, LIMITE_MAXIMO)
+
+
+def codificar_cursor(valores):
+    texto = json.dumps([str(valor) for valor in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, orden):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ParametroInvalido('Cursor invalido')
+    if not isinstance(valores, list) or len(valores) != len(orden):
+        raise ParametroInvalido('Cursor invalido')
+    return valores
+
+
+def filtro_keyset(orden, valores):
+    """
+    Construye la condicion "fila posterior al cursor" para una clave de orden
+    compuesta: (a > x) OR (a = x AND b > y) OR ...
+    """
+    condicion = Q()
+    iguales = {}
+    for campo, valor in zip(orden, valores):
+        nombre = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        condicion |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+        iguales[nombre] = valor
+    return condicion
+
+
+def valores_de_orden(objeto, orden):
+    return [getattr(objeto, campo.lstrip('-')) for campo in orden]
+
+
+def paginar(request, queryset, orden, serializar):
+    """
+    Devuelve una pagina del queryset ordenado por `orden`, que debe terminar
+    en un campo unico (normalmente 'id') para que el orden sea estable.
+    """
+    limite = obtener_limite(request)
+    queryset = queryset.order_by(*orden)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(filtro_keyset(orden, decodificar_cursor(cursor, orden)))
+
+    # Se pide una fila de mas para saber si existe una pagina siguiente
+    filas = list(queryset[:limite + 1])
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(valores_de_orden(filas[-1], orden))
+
+    return {
+        'resultados': [serializar(fila) for fila in filas],
+        'siguiente': siguiente,
+        'limite': limite,
+    }
+
+
+def recorrer_por_lotes(queryset, orden, tamano=None):
+    """
+    Recorre todo el queryset en lotes de `tamano` filas usando el mismo
+    filtro keyset que la paginacion. A diferencia de QuerySet.iterator(), que
+    con PyMySQL carga el resultado completo en el cliente, cada lote es una
+    consulta acotada, asi que la memoria se mantiene constante en cualquier
+    motor y la primera fila llega tras leer un solo lote.
+
+    Las consultas de los lotes siguientes tienen la misma forma por diseno y
+    no cuentan para el detector de consultas repetidas; las que haga quien
+    recorre los lotes si.
+    """
+    tamano = tamano or TAMANO_LOTE
+    queryset = queryset.order_by(*orden)
+    lote = list(queryset[:tamano])
+    while lote:
+        yield lote
+        if len(lote) < tamano:
+            return
+        ultimo = valores_de_orden(lote[-1], orden)
+        with permitir_repetidas():
+            lote = list(queryset.filter(filtro_keyset(orden, ultimo))[:tamano])
+
+
+def generar_json(queryset, orden, serializar, ndjson=False):
+    """
+    Codifica las filas lote por lote. El arreglo JSON resultante es identico
+    byte a byte al que genera RespuestaJson con la lista completa.
+    """
+    separador = b'\n' if ndjson else b','
+    primero = True
+    if not ndjson:
+        yield b'['
+    for lote in recorrer_por_lotes(queryset, orden):
+        texto = separador.join(codificar(serializar(fila)) for fila in lote)
+        if ndjson:
+            texto += separador
+        elif not primero:
+            texto = separador + texto
+        primero = False
+        yield texto
+    if not ndjson:
+        yield b']'
+
+
+def responder_streaming(queryset, orden, serializar, formato):
+    return StreamingHttpResponse(
+        generar_json(queryset, orden, serializar, ndjson=formato == 'ndjson'),
+        content_type=FORMATOS_STREAMING[formato],
+    )
+
+
+def generar_csv(queryset, orden, encabezados, fila):
+    """
+    Escribe el CSV lote por lote con la misma lectura por keyset que
+    generar_json, asi que la descarga empieza tras la primera consulta y la
+    memoria no depende del numero de filas. `fila` convierte cada objeto en
+    la lista de valores de `encabezados`.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(encabezados)
+    for lote in recorrer_por_lotes(queryset, orden):
+        escritor.writerows(fila(objeto) for objeto in lote)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        #Solo la cabecera: el queryset no tenia filas
+        yield buffer.getvalue().encode()
+
+
+def responder_csv(queryset, orden, encabezados, fila, nombre_archivo):
+    respuesta = StreamingHttpResponse(
+        generar_csv(queryset, orden, encabezados, fila),
+        content_type='text/csv; charset=utf-8',
+    )
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return respuesta
+
+
+def responder_listado(request, queryset, orden, campos):
+    """
+    Respuesta comun de las vistas listar_*. `campos` es el diccionario de
+    errorPages.campos.Campo que describe cada fila del listado.
+    """
+    try:
+        formato = request.GET.get('formato', 'json')
+        if formato != 'json' and formato not in FORMATOS_STREAMING:
+            raise ParametroInvalido('Formato no soportado')
+        claves = campos_solicitados(request, campos)
+        queryset = proyectar(queryset, campos, claves, extra=[campo.lstrip('-') for campo in orden])
+
+        def serializar_fila(fila):
+            return serializar(fila, campos, claves)
+
+        if formato in FORMATOS_STREAMING:
+            return responder_streaming(queryset, orden, serializar_fila, formato)
+        #Formato anterior: la tabla completa en una sola lista
+        if es_verdadero(request.GET.get('todos')):
+            return RespuestaJson([serializar_fila(fila) for fila in queryset])
+        pagina = paginar(request, queryset, orden, serializar_fila)
+    except ParametroInvalido as e:
+        return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson(pagina)
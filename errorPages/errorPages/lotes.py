@@ -0,0 +1,274 @@
+"""
+Registro, actualizacion y eliminacion en lote.
+
+Cada app describe su modelo con un Lote (campos que acepta y padres a los que
+apunta) y expone tres vistas que reciben un arreglo JSON:
+
+    registrar_lote/  POST   [{...}, {...}]
+    actualizar_lote/ PUT    [{'id': ..., ...}, ...]
+    eliminar_lote/   DELETE [id, id, ...]
+
+Todos los ids de padres del lote se comprueban con una sola consulta IN por
+modelo padre y las escrituras se hacen con bulk_create/bulk_update dentro de
+una sola transaccion. La respuesta trae un resultado por elemento, en el
+mismo orden del arreglo; los elementos con error no detienen a los demas.
+"""
+import json
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from errorPages.contadores import ajustar_contadores, mover_contadores, valores_contados
+from errorPages.renderizado import RespuestaJson
+from errorPages.senales import filas_creadas_en_lote
+from errorPages.versiones import cambiar_version
+
+MAXIMO_LOTE = 1000
+
+
+class ErrorElemento(Exception):
+    """Error de un elemento del lote; no afecta al resto."""
+
+
+def leer_lote(request):
+    try:
+        elementos = json.loads(request.body)
+    except ValueError:
+        raise ErrorElemento('El cuerpo debe ser un arreglo JSON')
+    if not isinstance(elementos, list) or not elementos:
+        raise ErrorElemento('El cuerpo debe ser un arreglo JSON no vacio')
+    if len(elementos) > MAXIMO_LOTE:
+        raise ErrorElemento(f'El lote no puede tener mas de {MAXIMO_LOTE} elementos')
+    return elementos
+
+
+def leer_uuid(valor, nombre):
+    try:
+        return uuid.UUID(str(valor))
+    except ValueError:
+        raise ErrorElemento(f'{nombre} invalido: {valor}')
+
+
+def leer_id(elemento):
+    if not isinstance(elemento, dict):
+        raise ErrorElemento('Cada elemento debe ser un objeto JSON')
+    if 'id' not in elemento:
+        raise ErrorElemento('Falta el campo id')
+    return leer_uuid(elemento['id'], 'id')
+
+
+def describir_error(error):
+    if isinstance(error, ValidationError):
+        return error.message_dict if hasattr(error, 'error_dict') else error.messages
+    if isinstance(error, KeyError):
+        return f'Falta el campo {error.args[0]}'
+    return str(error)
+
+
+class Lote:
+    """
+    modelo  -- modelo que se escribe
+    recurso -- nombre del recurso en errorPages.versiones
+    campos  -- {clave JSON: campo del modelo}
+    padres  -- {clave JSON: (atributo FK, modelo padre)}, p. ej.
+               {'curso': ('curso_id', Curso)}
+    unicos  -- tuplas de atributos que forman una restriccion unica, p. ej.
+               (('usuario_id', 'curso_id'),)
+    """
+
+    def __init__(self, modelo, recurso, campos, padres, unicos=()):
+        self.modelo = modelo
+        self.recurso = recurso
+        self.campos = campos
+        self.padres = padres
+        self.unicos = unicos
+
+    def padres_existentes(self, elementos):
+        """Una consulta IN por modelo padre con todos los ids del lote."""
+        existentes = {}
+        for clave, (_, modelo_padre) in self.padres.items():
+            ids = set()
+            for elemento in elementos:
+                if isinstance(elemento, dict) and clave in elemento:
+                    try:
+                        ids.add(leer_uuid(elemento[clave], clave))
+                    except ErrorElemento:
+                        pass
+            existentes[clave] = set(modelo_padre.objects.filter(id__in=ids).values_list('id', flat=True))
+        return existentes
+
+    def asignar(self, objeto, elemento, existentes, parcial=False):
+        """Copia el elemento al objeto y devuelve los campos modificados."""
+        if not isinstance(elemento, dict):
+            raise ErrorElemento('Cada elemento debe ser un objeto JSON')
+        modificados = []
+        for clave, campo in self.campos.items():
+            if parcial and clave not in elemento:
+                continue
+            setattr(objeto, campo, elemento[clave])
+            modificados.append(campo)
+        for clave, (atributo, _) in self.padres.items():
+            if parcial and clave not in elemento:
+                continue
+            id_padre = leer_uuid(elemento[clave], clave)
+            if id_padre not in existentes[clave]:
+                raise ErrorElemento(f'{clave} no encontrado: {id_padre}')
+            setattr(objeto, atributo, id_padre)
+            modificados.append(atributo.removesuffix('_id'))
+        #Las FK ya se comprobaron en bloque y la unicidad del id la garantiza
+        #la base de datos, asi que se excluyen para no hacer una consulta por fila
+        objeto.full_clean(
+            exclude=[atributo.removesuffix('_id') for atributo, _ in self.padres.values()],
+            validate_unique=False,
+            validate_constraints=False,
+        )
+        return modificados
+
+    def quitar_repetidos(self, objetos, resultados):
+        """
+        Marca con error los objetos que repiten una restriccion unica, ya sea
+        con una fila existente o con otro objeto del lote. Una consulta por
+        restriccion con los valores de todo el lote.
+        """
+        for atributos in self.unicos:
+            filtro = {
+                f'{atributo}__in': {getattr(objeto, atributo) for objeto, _ in objetos}
+                for atributo in atributos
+            }
+            ocupados = {
+                tuple(fila[1:]): fila[0]
+                for fila in self.modelo.objects.filter(**filtro).values_list('pk', *atributos)
+            }
+            restantes = []
+            for objeto, resultado in objetos:
+                valores = tuple(getattr(objeto, atributo) for atributo in atributos)
+                if ocupados.get(valores, objeto.pk) != objeto.pk:
+                    resultado['error'] = f'Ya existe un registro con {", ".join(atributos)}: {valores}'
+                    if objeto._state.adding:
+                        #El objeto nuevo no se guardo, asi que no tiene id
+                        del resultado['id']
+                    continue
+                ocupados[valores] = objeto.pk
+                restantes.append((objeto, resultado))
+            objetos = restantes
+        return [objeto for objeto, _ in objetos]
+
+    def responder(self, resultados, status):
+        errores = sum(1 for resultado in resultados if 'error' in resultado)
+        if errores == len(resultados):
+            status = 400
+        return RespuestaJson({
+            'resultados': resultados,
+            'correctos': len(resultados) - errores,
+            'errores': errores,
+        }, status=status)
+
+    def registrar(self, request):
+        try:
+            elementos = leer_lote(request)
+        except ErrorElemento as e:
+            return RespuestaJson({'error': str(e)}, status=400)
+
+        existentes = self.padres_existentes(elementos)
+        resultados, nuevos = [], []
+        for indice, elemento in enumerate(elementos):
+            objeto = self.modelo()
+            try:
+                self.asignar(objeto, elemento, existentes)
+            except (ErrorElemento, ValidationError, KeyError) as e:
+                resultados.append({'indice': indice, 'error': describir_error(e)})
+                continue
+            resultados.append({'indice': indice, 'id': objeto.id})
+            nuevos.append((objeto, resultados[-1]))
+
+        nuevos = self.quitar_repetidos(nuevos, resultados)
+        if nuevos:
+            try:
+                with transaction.atomic():
+                    self.modelo.objects.bulk_create(nuevos)
+                    #bulk_create no envia post_save
+                    ajustar_contadores(self.modelo, nuevos, 1)
+            except IntegrityError as e:
+                #Otra peticion escribio los mismos valores al mismo tiempo
+                return RespuestaJson({'error': str(e)}, status=409)
+            #bulk_create no envia post_save
+            cambiar_version(self.recurso)
+            filas_creadas_en_lote.send(sender=self.modelo, objetos=nuevos)
+        return self.responder(resultados, status=201)
+
+    def actualizar(self, request):
+        try:
+            elementos = leer_lote(request)
+        except ErrorElemento as e:
+            return RespuestaJson({'error': str(e)}, status=400)
+
+        #Un elemento sin id valido es un error de ese elemento, no de todo el lote
+        ids = []
+        for elemento in elementos:
+            try:
+                ids.append(leer_id(elemento))
+            except ErrorElemento as e:
+                ids.append(e)
+        objetos = self.modelo.objects.in_bulk([id for id in ids if isinstance(id, uuid.UUID)])
+        existentes = self.padres_existentes(elementos)
+        resultados, modificados, campos, cambios = [], [], set(), []
+        for indice, (id, elemento) in enumerate(zip(ids, elementos)):
+            if isinstance(id, ErrorElemento):
+                resultados.append({'indice': indice, 'error': str(id)})
+                continue
+            objeto = objetos.get(id)
+            try:
+                if objeto is None:
+                    raise ErrorElemento(f'No encontrado: {id}')
+                anteriores = valores_contados(self.modelo, objeto)
+                campos.update(self.asignar(objeto, elemento, existentes, parcial=True))
+            except (ErrorElemento, ValidationError, KeyError) as e:
+                resultados.append({'indice': indice, 'id': id, 'error': describir_error(e)})
+                continue
+            resultados.append({'indice': indice, 'id': id})
+            modificados.append((objeto, resultados[-1]))
+            cambios.append((anteriores, objeto))
+
+        modificados = self.quitar_repetidos(modificados, resultados)
+        if modificados and campos:
+            try:
+                with transaction.atomic():
+                    self.modelo.objects.bulk_update(modificados, sorted(campos))
+                    #Filas que cambiaron de padre (p. ej. una tarea movida a otro tema)
+                    guardados = {objeto.pk for objeto in modificados}
+                    mover_contadores(self.modelo, [
+                        (anteriores, objeto) for anteriores, objeto in cambios if objeto.pk in guardados
+                    ])
+            except IntegrityError as e:
+                return RespuestaJson({'error': str(e)}, status=409)
+            #bulk_update no envia post_save
+            cambiar_version(self.recurso)
+        return self.responder(resultados, status=200)
+
+    def eliminar(self, request):
+        try:
+            valores = leer_lote(request)
+        except ErrorElemento as e:
+            return RespuestaJson({'error': str(e)}, status=400)
+
+        ids = []
+        for valor in valores:
+            try:
+                ids.append(leer_uuid(valor, 'id'))
+            except ErrorElemento as e:
+                ids.append(e)
+        with transaction.atomic():
+            queryset = self.modelo.objects.filter(id__in=[id for id in ids if isinstance(id, uuid.UUID)])
+            encontrados = set(queryset.values_list('id', flat=True))
+            #QuerySet.delete() borra en cascada y envia post_delete por fila
+            queryset.delete()
+        resultados = []
+        for indice, id in enumerate(ids):
+            if isinstance(id, ErrorElemento):
+                resultados.append({'indice': indice, 'error': str(id)})
+            elif id in encontrados:
+                resultados.append({'indice': indice, 'id': id})
+            else:
+                resultados.append({'indice': indice, 'id': id, 'error': f'No encontrado: {id}'})
+        return self.responder(resultados, status=200)
@@ -0,0 +1,273 @@
+"""
+Metricas por ruta en formato de texto de Prometheus (/metrics) y cabecera
+Server-Timing.
+
+MetricasMiddleware mide cada peticion y la agrupa por el nombre de la URL
+resuelta (listar_cursos, registrar_inscripcion, ...; 'sin_ruta' para los
+404 de rutas inexistentes, para no crear una serie por URL) y por proceso:
+
+    peticiones_total{ruta, metodo, estado, proceso}       contador
+    duracion_peticion_segundos{ruta, metodo, proceso}     histograma
+    tamano_respuesta_bytes{ruta, metodo, proceso}         histograma (sin las
+                                                          respuestas por
+                                                          streaming)
+    consultas_sql_por_peticion{ruta, metodo, proceso}     histograma
+    duracion_sql_segundos_total{ruta, metodo, proceso}    contador
+
+Cada proceso acumula sus series en memoria (un diccionario y un lock, sin
+E/S por peticion). Un hilo publica una copia en la cache compartida cada
+PUBLICAR_SEGUNDOS en una ranura propia (cache.add, una por proceso vivo), y
+/metrics devuelve las ranuras de todos los procesos, asi que un scrape ve
+todo el servidor sin importar que worker lo atienda. Cada proceso tiene su
+propia etiqueta `proceso` (host:pid:aleatorio): si termina, sus series
+desaparecen cuando vence su ranura en lugar de bajar un total, y ningun
+contador retrocede. El total se calcula en PromQL sumando despues de rate(),
+por ejemplo `sum by (ruta) (rate(peticiones_total[5m]))`.
+
+Server-Timing lleva el tiempo total y el de SQL, visible en las
+herramientas de desarrollo del navegador. La duracion de una respuesta por
+streaming es hasta el primer byte.
+
+El costo medido esta en benchmarks/metricas.py.
+"""
+import hmac
+import os
+import socket
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+PUBLICAR_SEGUNDOS = 15
+#Ranuras de la cache: procesos que se pueden publicar a la vez
+RANURAS = 64
+PREFIJO = 'metricas'
+
+BUCKETS_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+HISTOGRAMAS = (
+    ('duracion', 'duracion_peticion_segundos', 'Duracion de la peticion en segundos.', BUCKETS_DURACION),
+    ('bytes', 'tamano_respuesta_bytes', 'Tamano del cuerpo de la respuesta en bytes.', BUCKETS_BYTES),
+    ('consultas', 'consultas_sql_por_peticion', 'Consultas SQL por peticion.', BUCKETS_CONSULTAS),
+)
+
+
+class Serie:
+    """Valores de una (ruta, metodo). Los buckets se guardan sin acumular."""
+
+    def __init__(self):
+        self.estados = {}
+        self.buckets = {nombre: [0] * (len(limites) + 1) for nombre, _, _, limites in HISTOGRAMAS}
+        self.sumas = {nombre: 0 for nombre, _, _, _ in HISTOGRAMAS}
+        self.segundos_sql = 0.0
+
+    def observar(self, nombre, limites, valor):
+        self.buckets[nombre][bisect_left(limites, valor)] += 1
+        self.sumas[nombre] += valor
+
+    def copia(self):
+        return {
+            'estados': dict(self.estados),
+            'buckets': {nombre: list(valores) for nombre, valores in self.buckets.items()},
+            'sumas': dict(self.sumas),
+            'segundos_sql': self.segundos_sql,
+        }
+
+
+class Registro:
+    def __init__(self, publicar_segundos=PUBLICAR_SEGUNDOS):
+        self.publicar_segundos = publicar_segundos
+        self.reiniciar()
+
+    def reiniciar(self):
+        #Tambien despues de un fork (ver REGISTRO): el hijo no hereda las
+        #series, la ranura ni el hilo
+        self.id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.series = {}
+        self.ranura = None
+        self.hilo = None
+        self.lock = threading.Lock()
+
+    def registrar(self, ruta, metodo, estado, duracion, tamano, consultas, segundos_sql):
+        with self.lock:
+            if self.hilo is None and self.publicar_segundos:
+                self.hilo = threading.Thread(target=self.publicar_periodicamente, name='metricas', daemon=True)
+                self.hilo.start()
+            serie = self.series.get((ruta, metodo))
+            if serie is None:
+                serie = self.series[(ruta, metodo)] = Serie()
+            serie.estados[estado] = serie.estados.get(estado, 0) + 1
+            serie.observar('duracion', BUCKETS_DURACION, duracion)
+            if tamano is not None:
+                serie.observar('bytes', BUCKETS_BYTES, tamano)
+            serie.observar('consultas', BUCKETS_CONSULTAS, consultas)
+            serie.segundos_sql += segundos_sql
+
+    def copia(self):
+        with self.lock:
+            return {clave: serie.copia() for clave, serie in self.series.items()}
+
+    def publicar_periodicamente(self):
+        while True:
+            time.sleep(self.publicar_segundos)
+            try:
+                self.publicar()
+            except Exception:
+                #Una cache caida no debe detener el hilo; se reintenta
+                pass
+
+    def publicar(self):
+        vence = 4 * (self.publicar_segundos or PUBLICAR_SEGUNDOS)
+        if self.ranura is None or cache.get(clave_ranura(self.ranura)) != self.id:
+            self.ranura = next((ranura for ranura in range(RANURAS) if cache.add(clave_ranura(ranura), self.id, vence)), None)
+            if self.ranura is None:
+                return
+        cache.set_many({clave_ranura(self.ranura): self.id, clave_datos(self.ranura): (self.id, self.copia())}, vence)
+
+
+def clave_ranura(ranura):
+    return f'{PREFIJO}:ranura:{ranura}'
+
+
+def clave_datos(ranura):
+    return f'{PREFIJO}:datos:{ranura}'
+
+
+REGISTRO = Registro()
+os.register_at_fork(after_in_child=REGISTRO.reiniciar)
+
+
+class MedidorSQL:
+    """execute_wrapper que cuenta y cronometra las consultas de la peticion."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.segundos += time.perf_counter() - inicio
+
+
+class MetricasMiddleware:
+    """Va primero en MIDDLEWARE para que la duracion incluya a los demas."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medidor = MedidorSQL()
+        #Lo mismo que connection.execute_wrapper(), sin el contextmanager ni
+        #pasar dos veces por el proxy de la conexion
+        envoltorios = connections[DEFAULT_DB_ALIAS].execute_wrappers
+        envoltorios.append(medidor)
+        inicio = time.perf_counter()
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            envoltorios.pop()
+        duracion = time.perf_counter() - inicio
+
+        coincidencia = request.resolver_match
+        ruta = coincidencia.view_name if coincidencia else 'sin_ruta'
+        tamano = None if respuesta.streaming else len(respuesta.content)
+        REGISTRO.registrar(ruta, request.method, respuesta.status_code, duracion, tamano,
+                           medidor.consultas, medidor.segundos)
+        respuesta['Server-Timing'] = (
+            f'db;dur={medidor.segundos * 1000:.1f};desc="{medidor.consultas} consultas", '
+            f'total;dur={duracion * 1000:.1f}'
+        )
+        return respuesta
+
+
+def etiquetas(**valores):
+    partes = []
+    for nombre, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nombre}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def formatear(copias):
+    """
+    Texto de exposicion de Prometheus (version 0.0.4) de las copias
+    {proceso: {(ruta, metodo): serie}}, una serie por proceso.
+    """
+    lineas = [
+        '# HELP metricas_procesos Procesos publicados.',
+        '# TYPE metricas_procesos gauge',
+        f'metricas_procesos {len(copias)}',
+        '# HELP peticiones_total Peticiones atendidas.',
+        '# TYPE peticiones_total counter',
+    ]
+    ordenadas = sorted(
+        (ruta, metodo, proceso, serie)
+        for proceso, copia in copias.items() for (ruta, metodo), serie in copia.items()
+    )
+    for ruta, metodo, proceso, serie in ordenadas:
+        for estado, cantidad in sorted(serie['estados'].items()):
+            lineas.append(
+                f'peticiones_total{etiquetas(ruta=ruta, metodo=metodo, estado=estado, proceso=proceso)} {cantidad}'
+            )
+
+    for nombre, metrica, ayuda, limites in HISTOGRAMAS:
+        lineas += [f'# HELP {metrica} {ayuda}', f'# TYPE {metrica} histogram']
+        for ruta, metodo, proceso, serie in ordenadas:
+            acumulado = 0
+            for limite, cantidad in zip((*limites, '+Inf'), serie['buckets'][nombre]):
+                acumulado += cantidad
+                lineas.append(
+                    f'{metrica}_bucket{etiquetas(ruta=ruta, metodo=metodo, proceso=proceso, le=limite)} {acumulado}'
+                )
+            lineas.append(f'{metrica}_sum{etiquetas(ruta=ruta, metodo=metodo, proceso=proceso)} {serie["sumas"][nombre]}')
+            lineas.append(f'{metrica}_count{etiquetas(ruta=ruta, metodo=metodo, proceso=proceso)} {acumulado}')
+
+    lineas += [
+        '# HELP duracion_sql_segundos_total Tiempo en consultas SQL.',
+        '# TYPE duracion_sql_segundos_total counter',
+    ]
+    for ruta, metodo, proceso, serie in ordenadas:
+        lineas.append(
+            f'duracion_sql_segundos_total{etiquetas(ruta=ruta, metodo=metodo, proceso=proceso)} {serie["segundos_sql"]}'
+        )
+    return '\n'.join(lineas) + '\n'
+
+
+def autorizado(request):
+    if request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICAS_IPS', ('127.0.0.1', '::1')):
+        return False
+    token = getattr(settings, 'METRICAS_TOKEN', None)
+    if not token:
+        return True
+    tipo, _, enviado = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return tipo == 'Bearer' and hmac.compare_digest(enviado.encode(), token.encode())
+
+
+def metricas(request):
+    """
+    /metrics para el scraper de Prometheus. Sin JWT: solo responde a las IP
+    de settings.METRICAS_IPS y, si settings.METRICAS_TOKEN esta definido, a
+    quien lo envie como token Bearer (detras de un proxy todas las peticiones
+    llegan desde la IP del proxy).
+    """
+    if not autorizado(request):
+        return HttpResponseForbidden()
+    #La copia de este proceso va al dia; las demas, con hasta PUBLICAR_SEGUNDOS de atraso
+    REGISTRO.publicar()
+    ranuras = cache.get_many([clave_ranura(ranura) for ranura in range(RANURAS)])
+    copias = dict(cache.get_many([clave_datos(int(clave.rsplit(':', 1)[1])) for clave in ranuras]).values())
+    if REGISTRO.ranura is None:
+        copias[REGISTRO.id] = REGISTRO.copia()
+    return HttpResponse(formatear(copias),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
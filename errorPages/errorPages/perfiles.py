@@ -0,0 +1,309 @@
+"""
+Perfiles bajo demanda de peticiones individuales.
+
+PerfilMiddleware ejecuta una peticion bajo cProfile cuando:
+
+    - trae la cabecera `X-Perfil: 1` y el token es de un administrador
+      (is_staff); la cabecera de cualquier otro usuario se ignora
+    - o la elige el muestreo: settings.PERFILES_MUESTREO es la fraccion de
+      peticiones que se perfilan (0 por defecto)
+
+De cada peticion perfilada se guardan en settings.PERFILES_DIR dos archivos:
+
+    <id>.prof  -- estadisticas de cProfile (formato pstats: arbol de
+                  llamadas con tiempos por funcion); se abre con
+                  `python -m pstats`, snakeviz o gprof2dot
+    <id>.json  -- ruta, estado, duracion y cada sentencia SQL con su tiempo
+                  (sin los parametros, que pueden tener datos personales)
+
+En una respuesta por streaming (?formato=stream|ndjson, exportaciones CSV)
+las consultas y la serializacion ocurren mientras el servidor consume el
+cuerpo, despues de que la vista la devolvio: el perfil sigue activo durante
+cada lectura del cuerpo y se guarda al terminar (o al cerrarse la respuesta
+si el cliente se desconecta). La duracion es la de la vista mas la de
+generar el cuerpo, sin el tiempo de envio.
+
+Solo se conservan los settings.PERFILES_MAXIMO mas recientes (un anillo en
+disco local de cada servidor). Un proceso perfila una peticion a la vez; si
+ya hay una en curso, la siguiente se atiende sin perfilar. La respuesta de
+una peticion perfilada trae la cabecera X-Perfil-Id.
+
+Los perfiles se listan en /perfiles/ y se descargan en /perfiles/<id>/
+(?formato=prof, sql o texto), solo administradores.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import FileResponse, Http404
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
+from rest_framework.settings import api_settings
+
+from errorPages.renderizado import RespuestaJson
+
+CABECERA = 'HTTP_X_PERFIL'
+#Sentencias SQL que se guardan por perfil; las demas solo se cuentan
+MAXIMO_SQL = 1000
+#Funciones en el resumen ?formato=texto
+FUNCIONES_TEXTO = 60
+FORMATOS = ('prof', 'sql', 'texto')
+PATRON_ID = re.compile(r'^\d{8}T\d{12}-[0-9a-f]{8}$')
+
+_en_curso = threading.Lock()
+
+
+def directorio():
+    return settings.PERFILES_DIR
+
+
+def es_administrador(request):
+    """Autentica el token con las mismas clases que las vistas de DRF."""
+    for clase in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            resultado = clase().authenticate(request)
+        except APIException:
+            return False
+        if resultado is not None:
+            return resultado[0].is_staff
+    return False
+
+
+def motivo(request):
+    if request.META.get(CABECERA) == '1' and es_administrador(request):
+        return 'cabecera'
+    muestreo = settings.PERFILES_MUESTREO
+    if muestreo and random.random() < muestreo:
+        return 'muestreo'
+    return None
+
+
+class RegistroSQL:
+    """execute_wrapper que guarda cada sentencia con su duracion."""
+
+    def __init__(self):
+        self.sentencias = []
+        self.total = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            segundos = time.perf_counter() - inicio
+            self.total += 1
+            self.segundos += segundos
+            if len(self.sentencias) < MAXIMO_SQL:
+                self.sentencias.append({'sql': sql, 'ms': round(segundos * 1000, 3), 'many': many})
+
+
+def escribir(ruta, contenido):
+    #Primero a un temporal: un listado nunca ve un archivo a medio escribir
+    temporal = f'{ruta}.tmp'
+    contenido(temporal)
+    os.replace(temporal, ruta)
+
+
+def recortar():
+    """Borra los perfiles mas viejos hasta dejar PERFILES_MAXIMO."""
+    ids = sorted(listar_ids(), reverse=True)
+    for id in ids[settings.PERFILES_MAXIMO:]:
+        for extension in ('json', 'prof'):
+            try:
+                os.remove(os.path.join(directorio(), f'{id}.{extension}'))
+            except FileNotFoundError:
+                #Otro proceso lo borro primero
+                pass
+
+
+def listar_ids():
+    try:
+        nombres = os.listdir(directorio())
+    except FileNotFoundError:
+        return []
+    return [nombre[:-5] for nombre in nombres if nombre.endswith('.json') and PATRON_ID.match(nombre[:-5])]
+
+
+class Perfil:
+    """Perfil de una peticion; se activa una vez por la vista y otra por cada lectura de un cuerpo por streaming."""
+
+    def __init__(self, request, motivo):
+        self.fecha = datetime.now(timezone.utc)
+        #Los ids ordenan como las fechas
+        self.id = f'{self.fecha:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}'
+        self.request = request
+        self.motivo = motivo
+        self.registro = RegistroSQL()
+        self.perfilador = cProfile.Profile()
+        self.segundos = 0.0
+        self.terminado = False
+
+    @contextmanager
+    def activo(self):
+        envoltorios = connections[DEFAULT_DB_ALIAS].execute_wrappers
+        envoltorios.append(self.registro)
+        inicio = time.perf_counter()
+        self.perfilador.enable()
+        try:
+            yield
+        finally:
+            self.perfilador.disable()
+            self.segundos += time.perf_counter() - inicio
+            envoltorios.pop()
+
+    def terminar(self, respuesta):
+        """Guarda el perfil y libera el turno; solo la primera vez."""
+        if self.terminado:
+            return
+        self.terminado = True
+        try:
+            guardar(self, respuesta)
+        finally:
+            _en_curso.release()
+
+
+class CuerpoPerfilado:
+    """streaming_content de una respuesta perfilada."""
+
+    def __init__(self, contenido, perfil, respuesta):
+        self.contenido = iter(contenido)
+        self.perfil = perfil
+        self.respuesta = respuesta
+
+    def __iter__(self):
+        try:
+            while True:
+                with self.perfil.activo():
+                    try:
+                        parte = next(self.contenido)
+                    except StopIteration:
+                        return
+                yield parte
+        finally:
+            self.close()
+
+    def close(self):
+        #StreamingHttpResponse.close() lo llama aunque el cuerpo no se haya leido
+        self.perfil.terminar(self.respuesta)
+
+
+def guardar(perfil, respuesta):
+    request = perfil.request
+    registro = perfil.registro
+    coincidencia = request.resolver_match
+    datos = {
+        'id': perfil.id,
+        'fecha': perfil.fecha.isoformat(),
+        'ruta': coincidencia.view_name if coincidencia else None,
+        'metodo': request.method,
+        'path': request.get_full_path(),
+        'estado': respuesta.status_code,
+        'motivo': perfil.motivo,
+        'streaming': respuesta.streaming,
+        'duracion_ms': round(perfil.segundos * 1000, 3),
+        'consultas': registro.total,
+        'sql_ms': round(registro.segundos * 1000, 3),
+        'sql': registro.sentencias,
+    }
+    os.makedirs(directorio(), exist_ok=True)
+    base = os.path.join(directorio(), perfil.id)
+    perfil.perfilador.create_stats()
+    escribir(f'{base}.prof', perfil.perfilador.dump_stats)
+
+    def escribir_json(ruta):
+        with open(ruta, 'w') as archivo:
+            json.dump(datos, archivo)
+    escribir(f'{base}.json', escribir_json)
+    recortar()
+
+
+class PerfilMiddleware:
+    """Va despues de MetricasMiddleware: las metricas incluyen el costo de perfilar."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        razon = motivo(request)
+        if razon is None or not _en_curso.acquire(blocking=False):
+            return self.get_response(request)
+        perfil = Perfil(request, razon)
+        try:
+            with perfil.activo():
+                respuesta = self.get_response(request)
+        except BaseException:
+            _en_curso.release()
+            raise
+        respuesta['X-Perfil-Id'] = perfil.id
+        if respuesta.streaming and not respuesta.is_async:
+            #El turno se libera cuando se termina o se cierra el cuerpo
+            respuesta.streaming_content = CuerpoPerfilado(respuesta.streaming_content, perfil, respuesta)
+        else:
+            perfil.terminar(respuesta)
+        return respuesta
+
+
+def leer(id):
+    if not PATRON_ID.match(id):
+        raise Http404
+    try:
+        with open(os.path.join(directorio(), f'{id}.json')) as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        #Nunca existio o salio del anillo
+        raise Http404
+
+
+#Perfiles guardados, del mas reciente al mas viejo, sin las sentencias SQL
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def listar_perfiles(request):
+    perfiles = []
+    for id in sorted(listar_ids(), reverse=True):
+        try:
+            datos = leer(id)
+        except Http404:
+            continue
+        datos.pop('sql')
+        perfiles.append(datos)
+    return RespuestaJson(perfiles)
+
+
+#Uso: /perfiles/<id>/?formato=prof|sql|texto
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def descargar_perfil(request, id):
+    datos = leer(id)
+    formato = request.GET.get('formato', 'prof')
+    if formato not in FORMATOS:
+        return RespuestaJson({'error': f'formato debe ser uno de: {", ".join(FORMATOS)}'}, status=400)
+    if formato == 'sql':
+        return RespuestaJson(datos)
+    ruta = os.path.join(directorio(), f'{id}.prof')
+    if formato == 'texto':
+        salida = io.StringIO()
+        try:
+            estadisticas = pstats.Stats(ruta, stream=salida)
+        except (FileNotFoundError, OSError):
+            #El .json sobrevivio a su .prof (recortado por otro proceso)
+            raise Http404
+        estadisticas.sort_stats('cumulative').print_stats(FUNCIONES_TEXTO)
+        return RespuestaJson({**datos, 'sql': None, 'perfil': salida.getvalue()})
+    try:
+        return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=f'{id}.prof',
+                            content_type='application/octet-stream')
+    except FileNotFoundError:
+        raise Http404
@@ -0,0 +1,92 @@
+"""
+Utilidades compartidas por los tests de las apps.
+"""
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from cursos.models import Curso
+from inscripciones.models import Inscripcion
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+
+
+def crear_usuario(username, rol='estudiante'):
+    return Usuario.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='clave-de-prueba',
+        nombre_completo=username.title(),
+        rol=rol,
+    )
+
+
+def crear_curso_completo(sufijo, alumno=None):
+    """Crea un profesor con un curso, una unidad, un tema y una tarea."""
+    profesor = crear_usuario(f'profesor{sufijo}', rol='profesor')
+    curso = Curso.objects.create(
+        nombre=f'Curso {sufijo}',
+        descripcion='Descripcion',
+        profesor=profesor,
+        fecha_inicio=datetime.date(2025, 1, 1),
+        fecha_fin=datetime.date(2025, 6, 30),
+    )
+    unidad = Unidad.objects.create(nombre=f'Unidad {sufijo}', curso=curso, orden=1)
+    tema = Tema.objects.create(nombre=f'Tema {sufijo}', unidad=unidad, descripcion='', orden=1)
+    tarea = Tarea.objects.create(
+        titulo=f'Tarea {sufijo}', descripcion='', fecha_entrega=datetime.date(2025, 3, 1), tema=tema,
+    )
+    if alumno is not None:
+        Inscripcion.objects.create(usuario=alumno, curso=curso)
+    return curso, unidad, tema, tarea
+
+
+class ConsultasConstantesMixin:
+    """
+    Comprueba que el numero de consultas SQL de una ruta no crece con el
+    numero de filas (es decir, que no hay consultas N+1).
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.alumno = crear_usuario('alumno')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alumno)
+
+    def contar_consultas(self, url, params=None):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url, params or {})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return len(consultas)
+
+    def recorrer_paginas(self, url, limite):
+        """Pide todas las paginas siguiendo 'siguiente'; devuelve las filas y las paginas."""
+        filas, paginas, cursor = [], [], None
+        while True:
+            params = {'limit': limite, **({'cursor': cursor} if cursor else {})}
+            respuesta = self.client.get(url, params)
+            self.assertEqual(respuesta.status_code, 200, respuesta.content)
+            pagina = respuesta.json()
+            self.assertLessEqual(len(pagina['resultados']), limite)
+            filas.extend(pagina['resultados'])
+            paginas.append(pagina)
+            cursor = pagina['siguiente']
+            if cursor is None:
+                return filas, paginas
+
+    def crear_cursos(self, cantidad):
+        for _ in range(cantidad):
+            self.creados = getattr(self, 'creados', 0) + 1
+            crear_curso_completo(self.creados, alumno=self.alumno)
+
+    def assertConsultasConstantes(self, url, params=None, filas_extra=5):
+        self.crear_cursos(1)
+        antes = self.contar_consultas(url, params)
+        self.crear_cursos(filas_extra)
+        self.assertEqual(self.contar_consultas(url, params), antes)
@@ -0,0 +1,71 @@
+"""
+Codificacion JSON compartida por todas las vistas.
+
+Si orjson esta instalado se usa para codificar: serializa UUID de forma
+nativa (en C) y solo llama a default() para las fechas. Si no esta instalado
+se usa la libreria estandar con un default() que produce exactamente los
+mismos bytes:
+
+    - separadores compactos (',' y ':') y UTF-8 sin escapar; frente a
+      JsonResponse cambian los bytes pero no el JSON que se lee
+    - UUID con guiones
+    - date/datetime/time como DjangoJSONEncoder: ISO 8601 con milisegundos
+      (no microsegundos) y 'Z' para UTC, que es lo que acepta Date() en
+      cualquier navegador
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+from django.http import HttpResponse
+from django.utils.duration import duration_iso_string
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def convertir(valor):
+    """default() de la ruta con la libreria estandar (y respaldo de orjson)."""
+    #Fechas igual que DjangoJSONEncoder, que es lo que recibia el frontend
+    if isinstance(valor, datetime.datetime):
+        texto = valor.isoformat()
+        if valor.microsecond:
+            texto = texto[:23] + texto[26:]
+        return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+    if isinstance(valor, datetime.date):
+        return valor.isoformat()
+    if isinstance(valor, datetime.time):
+        if valor.utcoffset() is not None:
+            raise ValueError('JSON no puede representar horas con zona horaria')
+        texto = valor.isoformat()
+        return texto[:12] if valor.microsecond else texto
+    if isinstance(valor, datetime.timedelta):
+        return duration_iso_string(valor)
+    if isinstance(valor, uuid.UUID):
+        return str(valor)
+    if isinstance(valor, (decimal.Decimal, Promise)):
+        return str(valor)
+    raise TypeError(f'Object of type {type(valor).__name__} is not JSON serializable')
+
+
+def codificar_estandar(data):
+    return json.dumps(data, default=convertir, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+if orjson is not None:
+    def codificar(data):
+        return orjson.dumps(data, default=convertir, option=orjson.OPT_PASSTHROUGH_DATETIME)
+else:
+    codificar = codificar_estandar
+
+
+class RespuestaJson(HttpResponse):
+    """Equivalente a JsonResponse que codifica con codificar()."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=codificar(data), **kwargs)
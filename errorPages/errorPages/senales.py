@@ -0,0 +1,10 @@
+"""
+Senales propias del proyecto.
+
+filas_creadas_en_lote se envia despues de un bulk_create, que no envia
+post_save por cada fila. Argumentos: sender (el modelo) y objetos (las filas
+creadas).
+"""
+from django.dispatch import Signal
+
+filas_creadas_en_lote = Signal()
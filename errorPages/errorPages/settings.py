@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import pymysql
 pymysql.install_as_MySQLdb()
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +50,8 @@ INSTALLED_APPS = [
     'temas',
     'unidades',
     'usuarios',
+    'estadisticas',
+    'busqueda',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders'
@@ -56,7 +60,8 @@ INSTALLED_APPS = [
 # Add REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication sin leer la fila del usuario en cada peticion
+        'usuarios.autenticacion.JWTAutenticacionPorClaims',
     )
 }
 
@@ -83,6 +88,12 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 MIDDLEWARE = [
+    # Primero, para medir a todos los demas (ver errorPages.metricas)
+    'errorPages.metricas.MetricasMiddleware',
+    # Perfiles bajo demanda (ver errorPages.perfiles)
+    'errorPages.perfiles.PerfilMiddleware',
+    # Consultas N+1 y duplicadas (ver errorPages.consultas_repetidas)
+    'errorPages.consultas_repetidas.ConsultasRepetidasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -130,6 +141,51 @@ DATABASES = {
     }
 }
 
+# Cache compartida por todos los procesos del servidor. Guarda las versiones
+# de cada recurso que se usan para los ETag (errorPages.versiones), por eso no
+# puede ser LocMemCache si hay varios workers. En produccion conviene usar
+# Redis o Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+    }
+}
+
+# Las pruebas (manage.py test) usan SQLite para no depender del servidor MySQL
+if 'test' in sys.argv:
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_db.sqlite3',
+    }
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # Cache propia de cada ejecucion: no reutiliza lo que dejaron las anteriores
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# IPs que pueden leer /metrics (el scraper de Prometheus). Detras de un proxy
+# inverso REMOTE_ADDR es la del proxy: hay que definir METRICAS_TOKEN (el
+# scraper lo envia como `Authorization: Bearer <token>`, bearer_token en
+# Prometheus) o bloquear /metrics en el proxy
+METRICAS_IPS = ['127.0.0.1', '::1']
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+
+# Perfiles por peticion (errorPages.perfiles): carpeta del anillo, cuantos se
+# conservan y fraccion de peticiones perfiladas sin la cabecera X-Perfil
+PERFILES_DIR = BASE_DIR / '.perfiles'
+PERFILES_MAXIMO = 50
+PERFILES_MUESTREO = 0.0
+
+# Importacion de usuarios por HTTP (/usuarios/importar/): procesos para los
+# hashes de cada importacion y cuantas puede atender a la vez cada worker.
+# Los archivos grandes van por `manage.py importar_usuarios`, fuera del servidor
+IMPORTACION_PROCESOS = 2
+IMPORTACIONES_SIMULTANEAS = 1
+
+# Detector de consultas N+1 y duplicadas (errorPages.consultas_repetidas):
+# 'estricto' lanza una excepcion, 'avisar' escribe en el log y None lo apaga.
+# Una misma consulta desde la misma linea UMBRAL veces o mas cuenta como N+1
+CONSULTAS_REPETIDAS = 'estricto' if 'test' in sys.argv else 'avisar' if DEBUG else None
+CONSULTAS_REPETIDAS_UMBRAL = 3
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
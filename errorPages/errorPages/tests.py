@@ -0,0 +1,313 @@
+import datetime
+import json
+import os
+import pstats
+import re
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+from unittest import mock, skipIf
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from errorPages import metricas, renderizado
+from errorPages.campos import Campo
+from errorPages.consultas_repetidas import ConsultasRepetidas, Detector, huella, permitir_repetidas
+from errorPages.identificadores import UUIDBinarioField, uuid7
+from errorPages.listados import recorrer_por_lotes
+from errorPages.pruebas import ConsultasConstantesMixin, crear_curso_completo, crear_usuario
+from cursos.models import Curso
+from tareas.models import Tarea
+
+
+class RenderizadoTests(SimpleTestCase):
+    DATOS = [
+        {
+            'id': uuid.UUID('550e8400-e29b-41d4-a716-446655440000'),
+            'nombre': 'Programación básica',
+            'fecha': datetime.date(2025, 3, 1),
+            'creado': datetime.datetime(2025, 3, 1, 10, 30, tzinfo=datetime.timezone.utc),
+            'modificado': datetime.datetime(2025, 3, 1, 10, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+            'local': datetime.datetime(2025, 3, 1, 10, 30),
+            'hora': datetime.time(9, 15, 0, 250000),
+            'profesor': {'id': 7, 'activo': True, 'token': None},
+        },
+    ]
+
+    @skipIf(renderizado.orjson is None, 'orjson no esta instalado')
+    def test_orjson_y_libreria_estandar_identicos(self):
+        self.assertIsNot(renderizado.codificar, renderizado.codificar_estandar)
+        self.assertEqual(renderizado.codificar(self.DATOS), renderizado.codificar_estandar(self.DATOS))
+
+    def test_mismo_json_que_jsonresponse(self):
+        #Cambian los separadores y el escape de no ASCII, no los valores
+        anterior = JsonResponse(self.DATOS, safe=False).content
+        for codificar in (renderizado.codificar, renderizado.codificar_estandar):
+            self.assertEqual(json.loads(codificar(self.DATOS)), json.loads(anterior))
+            self.assertEqual(
+                codificar(self.DATOS),
+                json.dumps(self.DATOS, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode(),
+            )
+
+    def test_formato(self):
+        datos = {'fecha': self.DATOS[0]['creado'], 'modificado': self.DATOS[0]['modificado'], 'id': self.DATOS[0]['id']}
+        self.assertEqual(
+            renderizado.codificar(datos),
+            b'{"fecha":"2025-03-01T10:30:00Z","modificado":"2025-03-01T10:30:05.123Z",'
+            b'"id":"550e8400-e29b-41d4-a716-446655440000"}',
+        )
+
+
+class Uuid7Tests(SimpleTestCase):
+    def test_version_variante_y_marca_de_tiempo(self):
+        antes = time.time_ns() // 1_000_000
+        valor = uuid7()
+        self.assertEqual((valor.version, valor.variant), (7, uuid.RFC_4122))
+        self.assertLessEqual(abs((valor.int >> 80) - antes), 1000)
+
+    def test_estrictamente_crecientes(self):
+        valores = [uuid7() for _ in range(20000)]
+        self.assertEqual(valores, sorted(valores))
+        self.assertEqual(len(set(valores)), len(valores))
+        #El orden tambien se mantiene en la forma de texto que guarda la base de datos
+        self.assertEqual([valor.hex for valor in valores], sorted(valor.hex for valor in valores))
+
+
+class UUIDBinarioFieldTests(SimpleTestCase):
+    mysql = SimpleNamespace(vendor='mysql')
+
+    def test_mysql_guarda_16_bytes(self):
+        campo = UUIDBinarioField()
+        valor = uuid7()
+        self.assertEqual(campo.db_type(self.mysql), 'binary(16)')
+        self.assertEqual(campo.get_db_prep_value(valor, self.mysql), valor.bytes)
+        self.assertEqual(campo.get_db_prep_value(str(valor), self.mysql), valor.bytes)
+        self.assertEqual(campo.get_db_prep_value(valor.hex, self.mysql), valor.bytes)
+        self.assertIsNone(campo.get_db_prep_value(None, self.mysql))
+        self.assertEqual(campo.from_db_value(valor.bytes, None, self.mysql), valor)
+
+    def test_otros_motores_sin_cambios(self):
+        from django.db import connection
+        campo = UUIDBinarioField()
+        valor = uuid.uuid4()
+        self.assertEqual(campo.db_type(connection), connection.data_types['UUIDField'])
+        self.assertEqual(campo.from_db_value(valor.hex, None, connection), valor)
+
+
+PROCESO = re.compile(r',proceso="[^"]*"')
+
+
+class MetricasTests(ConsultasConstantesMixin, TestCase):
+    def series(self, texto):
+        return {linea.rsplit(' ', 1)[0]: float(linea.rsplit(' ', 1)[1])
+                for linea in texto.splitlines() if not linea.startswith('#')}
+
+    def valor(self, texto, linea):
+        #Suma la serie de todos los procesos
+        return sum(valor for serie, valor in self.series(texto).items()
+                   if PROCESO.sub('', serie) == linea)
+
+    def metricas(self):
+        respuesta = self.client.get('/metrics')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.content.decode()
+
+    def test_series_por_nombre_de_ruta(self):
+        peticiones = 'peticiones_total{ruta="obtener_curso",metodo="GET",estado="200"}'
+        consultas = 'consultas_sql_por_peticion_bucket{ruta="obtener_curso",metodo="GET",le="1"}'
+        antes = self.metricas()
+        curso, _, _, _ = crear_curso_completo('metricas')
+        respuesta = self.client.get(f'/cursos/obtener_curso/{curso.id}/')
+        self.assertRegex(respuesta['Server-Timing'], r'^db;dur=[\d.]+;desc="1 consultas", total;dur=[\d.]+$')
+        despues = self.metricas()
+        self.assertEqual(self.valor(despues, peticiones) - self.valor(antes, peticiones), 1)
+        self.assertEqual(self.valor(despues, consultas) - self.valor(antes, consultas), 1)
+        self.assertIn('# TYPE duracion_peticion_segundos histogram', despues)
+
+    def test_una_serie_por_proceso_publicado(self):
+        otro = metricas.Registro(publicar_segundos=None)
+        otro.registrar('listar_cursos', 'GET', 200, 0.02, 512, 1, 0.001)
+        otro.publicar()
+        texto = self.metricas()
+        self.assertGreaterEqual(self.valor(texto, 'metricas_procesos'), 2)
+        serie = f'peticiones_total{{ruta="listar_cursos",metodo="GET",estado="200",proceso="{otro.id}"}}'
+        self.assertEqual(self.series(texto)[serie], 1)
+
+    def test_proceso_que_termina_no_baja_contadores(self):
+        otro = metricas.Registro(publicar_segundos=None)
+        otro.registrar('listar_cursos', 'GET', 200, 0.02, 512, 1, 0.001)
+        otro.publicar()
+        self.client.get('/cursos/')
+        antes = self.series(self.metricas())
+        #La ranura del proceso vence
+        cache.delete_many([metricas.clave_ranura(otro.ranura), metricas.clave_datos(otro.ranura)])
+        self.client.get('/cursos/')
+        despues = self.series(self.metricas())
+        self.assertFalse([serie for serie in despues if otro.id in serie])
+        for serie, valor in despues.items():
+            if serie in antes and not serie.startswith('metricas_procesos'):
+                self.assertGreaterEqual(valor, antes[serie], serie)
+
+    def test_solo_ips_permitidas(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.8').status_code, 403)
+
+    @override_settings(METRICAS_TOKEN='secreto-del-scraper')
+    def test_token_del_scraper(self):
+        #Detras de un proxy inverso toda peticion llega desde una IP permitida
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Token secreto-del-scraper').status_code, 403)
+        respuesta = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto-del-scraper')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.8',
+                                         HTTP_AUTHORIZATION='Bearer secreto-del-scraper').status_code, 403)
+
+
+class PerfilesTests(TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        configuracion = override_settings(PERFILES_DIR=directorio.name, PERFILES_MAXIMO=3, PERFILES_MUESTREO=0.0)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.directorio = directorio.name
+        self.curso, _, _, _ = crear_curso_completo('perfiles')
+        administrador = crear_usuario('admin_perfiles', 'admin')
+        administrador.is_staff = True
+        administrador.save()
+        self.administrador = self.cliente_con_token(administrador)
+        self.alumno = self.cliente_con_token(crear_usuario('alumno_perfiles'))
+
+    def cliente_con_token(self, usuario):
+        cliente = APIClient()
+        respuesta = cliente.post('/api/token/', {'username': usuario.username, 'password': 'clave-de-prueba'})
+        cliente.credentials(HTTP_AUTHORIZATION=f'Bearer {respuesta.json()["access"]}')
+        return cliente
+
+    def perfilar(self):
+        respuesta = self.administrador.get(f'/cursos/obtener_curso/{self.curso.id}/', HTTP_X_PERFIL='1')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta['X-Perfil-Id']
+
+    def test_cabecera_de_administrador(self):
+        id = self.perfilar()
+        listado = self.administrador.get('/perfiles/').json()
+        self.assertEqual([perfil['id'] for perfil in listado], [id])
+        self.assertEqual(listado[0]['ruta'], 'obtener_curso')
+        self.assertEqual(listado[0]['motivo'], 'cabecera')
+
+        sql = self.administrador.get(f'/perfiles/{id}/?formato=sql').json()
+        self.assertEqual(sql['consultas'], len(sql['sql']))
+        self.assertTrue(any('cursos_curso' in sentencia['sql'] for sentencia in sql['sql']))
+
+        descarga = self.administrador.get(f'/perfiles/{id}/')
+        ruta = f'{self.directorio}/descargado.prof'
+        with open(ruta, 'wb') as archivo:
+            archivo.write(b''.join(descarga.streaming_content))
+        funciones = {funcion for _, _, funcion in pstats.Stats(ruta).stats}
+        self.assertIn('obtener_curso', funciones)
+        self.assertIn('obtener_curso', self.administrador.get(f'/perfiles/{id}/?formato=texto').json()['perfil'])
+
+    def test_cabecera_ignorada_sin_permiso(self):
+        respuesta = self.alumno.get(f'/cursos/obtener_curso/{self.curso.id}/', HTTP_X_PERFIL='1')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('X-Perfil-Id', respuesta)
+        self.assertEqual(self.alumno.get('/perfiles/').status_code, 403)
+        self.assertEqual(self.administrador.get('/perfiles/').json(), [])
+
+    def test_anillo_acotado(self):
+        ids = [self.perfilar() for _ in range(5)]
+        listado = self.administrador.get('/perfiles/').json()
+        self.assertEqual([perfil['id'] for perfil in listado], ids[:1:-1])
+        self.assertEqual(self.administrador.get(f'/perfiles/{ids[0]}/').status_code, 404)
+
+    def test_respuesta_por_streaming(self):
+        crear_curso_completo('perfiles_stream', alumno=crear_usuario('alumno_stream'))
+        respuesta = self.administrador.get('/inscripciones/?formato=stream', HTTP_X_PERFIL='1')
+        id = respuesta['X-Perfil-Id']
+        #Antes de leer el cuerpo el perfil no esta guardado
+        self.assertEqual(self.administrador.get('/perfiles/').json(), [])
+        self.assertEqual(len(json.loads(b''.join(respuesta.streaming_content))), 1)
+        sql = self.administrador.get(f'/perfiles/{id}/?formato=sql').json()
+        self.assertTrue(sql['streaming'])
+        self.assertTrue(any('inscripciones_inscripcion' in sentencia['sql'] for sentencia in sql['sql']))
+        self.assertIn('generar_json', self.administrador.get(f'/perfiles/{id}/?formato=texto').json()['perfil'])
+        #El turno quedo libre
+        self.perfilar()
+
+    def test_streaming_cerrado_sin_leer(self):
+        respuesta = self.administrador.get('/inscripciones/?formato=stream', HTTP_X_PERFIL='1')
+        respuesta.close()
+        self.assertEqual([perfil['id'] for perfil in self.administrador.get('/perfiles/').json()],
+                         [respuesta['X-Perfil-Id']])
+
+    def test_prof_borrado(self):
+        id = self.perfilar()
+        os.remove(f'{self.directorio}/{id}.prof')
+        for formato in ('prof', 'texto'):
+            self.assertEqual(self.administrador.get(f'/perfiles/{id}/?formato={formato}').status_code, 404)
+        self.assertEqual(self.administrador.get(f'/perfiles/{id}/?formato=sql').status_code, 200)
+
+    @override_settings(PERFILES_MUESTREO=1.0)
+    def test_muestreo(self):
+        respuesta = self.alumno.get(f'/cursos/obtener_curso/{self.curso.id}/')
+        self.assertIn('X-Perfil-Id', respuesta)
+
+
+class ConsultasRepetidasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alumno = crear_usuario('alumno_repetidas')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alumno)
+        for sufijo in range(3):
+            crear_curso_completo(f'repetidas{sufijo}', alumno=self.alumno)
+
+    def test_huella(self):
+        self.assertEqual(
+            huella('SELECT "a"."id" FROM "a" WHERE "a"."n" = %s AND "a"."id" IN (%s, %s) LIMIT 21'),
+            huella('SELECT  "a"."id" FROM "a"\nWHERE "a"."n" = \'x\' AND "a"."id" IN (%s) LIMIT 1'),
+        )
+
+    def test_n_mas_uno_en_la_vista(self):
+        #Sin el select_related de tema__nombre, cada tarea consulta su tema
+        perezoso = Campo('tema_id', lambda tarea: tarea.tema.nombre)
+        with mock.patch.dict('tareas.views.CAMPOS_TAREA', {'tema': perezoso}):
+            with self.assertRaises(ConsultasRepetidas) as error:
+                self.client.get('/tareas/')
+        mensaje = str(error.exception)
+        self.assertIn('GET /tareas/', mensaje)
+        self.assertIn('[n+1] 3 veces, acceso a una relacion', mensaje)
+        self.assertIn('temas_tema', mensaje)
+        self.assertEqual(self.client.get('/tareas/').status_code, 200)
+
+    def test_duplicadas_y_permitidas(self):
+        with self.assertRaisesRegex(ConsultasRepetidas, r'\[duplicada\] 2 veces, errorPages/tests.py:\d+'):
+            with Detector(modo='estricto'):
+                Curso.objects.filter(nombre='Curso repetidas0').exists()
+                Curso.objects.filter(nombre='Curso repetidas0').exists()
+        with Detector(modo='estricto'), permitir_repetidas():
+            for tarea in Tarea.objects.all():
+                tarea.tema.nombre
+
+    def test_lotes_keyset(self):
+        #Mas lotes que el umbral: la consulta de cada lote no es un n+1
+        with Detector(modo='estricto', umbral=3):
+            lotes = list(recorrer_por_lotes(Tarea.objects.all(), ('id',), tamano=1))
+        self.assertEqual(len(lotes), 3)
+        #Lo que se consulta por fila dentro del recorrido se sigue senalando
+        with self.assertRaisesRegex(ConsultasRepetidas, r'\[n\+1\] 3 veces, acceso a una relacion'):
+            with Detector(modo='estricto', umbral=3):
+                for lote in recorrer_por_lotes(Tarea.objects.all(), ('id',), tamano=1):
+                    lote[0].tema.nombre
+
+    def test_modo_avisar(self):
+        with self.assertLogs('errorPages.consultas', 'WARNING') as registros, Detector(modo='avisar'):
+            for tarea in Tarea.objects.all():
+                tarea.tema.nombre
+        self.assertIn('[n+1] 3 veces, acceso a una relacion', registros.output[0])
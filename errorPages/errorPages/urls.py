@@ -21,6 +21,9 @@ from usuarios.jwt_views import CustomTokenObtainPairView
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from usuarios.serializers import CustomTokenObtainPairView
+from errorPages.cache_listados import estadisticas_cache
+from errorPages.metricas import metricas
+from errorPages.perfiles import descargar_perfil, listar_perfiles
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -30,6 +33,12 @@ urlpatterns = [
     path('unidades/', include('unidades.urls')),  # Add this line
     path('temas/', include('temas.urls')),
     path('tareas/', include('tareas.urls')),
+    path('estadisticas/', include('estadisticas.urls')),
+    path('busqueda/', include('busqueda.urls')),
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('cache/estadisticas/', estadisticas_cache, name='estadisticas_cache'),
+    path('metrics', metricas, name='metricas'),
+    path('perfiles/', listar_perfiles, name='listar_perfiles'),
+    path('perfiles/<str:id>/', descargar_perfil, name='descargar_perfil'),
 ]
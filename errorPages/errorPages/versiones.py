@@ -0,0 +1,93 @@
+"""
+Versiones por recurso para GET condicional (ETag / If-None-Match / 304).
+
+Cada recurso (cursos, unidades, temas, tareas, inscripciones, usuarios) tiene
+una version en la cache que cambia cada vez que se guarda o elimina una fila
+de su modelo. El ETag de una vista se calcula solo a partir de las versiones
+de los recursos que muestra, asi que responder 304 no lee ninguna fila ni
+serializa nada.
+
+Las versiones viven en la cache de Django (settings.CACHES), que debe ser
+compartida por todos los procesos del servidor.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+PREFIJO = 'version-recurso'
+
+
+def clave_version(recurso):
+    return f'{PREFIJO}:{recurso}'
+
+
+def obtener_versiones(recursos):
+    claves = [clave_version(recurso) for recurso in recursos]
+    versiones = cache.get_many(claves)
+    for clave in claves:
+        if clave not in versiones:
+            #Recurso sin version (cache vacia o expulsada): se crea una nueva
+            cache.add(clave, uuid.uuid4().hex, None)
+            versiones[clave] = cache.get(clave)
+    return [versiones[clave] for clave in claves]
+
+
+def cambiar_version(recurso):
+    """
+    Invalida las respuestas del recurso. Se cambia en el momento y otra vez
+    al confirmar la transaccion, para que ninguna lectura concurrente hecha
+    antes del COMMIT quede guardada con la version nueva.
+    """
+    clave = clave_version(recurso)
+    cache.set(clave, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(clave, uuid.uuid4().hex, None))
+
+
+def registrar_modelo(modelo, recurso):
+    """Conecta post_save/post_delete del modelo con la version del recurso."""
+    def al_cambiar(sender, **kwargs):
+        cambiar_version(recurso)
+
+    post_save.connect(al_cambiar, sender=modelo, weak=False, dispatch_uid=f'{PREFIJO}:{recurso}:save')
+    post_delete.connect(al_cambiar, sender=modelo, weak=False, dispatch_uid=f'{PREFIJO}:{recurso}:delete')
+
+
+def calcular_etag(request, recursos, por_usuario=False):
+    partes = obtener_versiones(recursos)
+    partes.append(request.get_full_path())
+    if por_usuario:
+        partes.append(str(request.user.pk))
+    return hashlib.sha1('|'.join(partes).encode()).hexdigest()
+
+
+def condicional(*recursos, por_usuario=False):
+    """
+    Decorador para vistas de lectura: emite un ETag fuerte y responde 304 si
+    coincide con If-None-Match. `recursos` son todos los recursos cuyos datos
+    aparecen en la respuesta (por ejemplo un curso muestra a su profesor, asi
+    que depende de 'cursos' y de 'usuarios'). Con `por_usuario` el ETag
+    tambien depende del usuario autenticado.
+
+    Va debajo de @api_view/@permission_classes para que la autenticacion se
+    compruebe antes de responder 304. Cache-Control: no-cache hace que el
+    navegador guarde la respuesta pero la revalide siempre con If-None-Match.
+    """
+    def etag(request, *args, **kwargs):
+        return calcular_etag(request, recursos, por_usuario)
+
+    def decorador(vista):
+        vista_condicional = condition(etag_func=etag)(vista)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            respuesta = vista_condicional(request, *args, **kwargs)
+            patch_cache_control(respuesta, private=True, no_cache=True)
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,16 @@
+from django.apps import AppConfig, apps
+
+
+class EstadisticasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'estadisticas'
+
+    def ready(self):
+        from .resumen import claves_curso, claves_inscripcion, claves_usuario, contar_en, registrar_fuente
+
+        registrar_fuente(apps.get_model('usuarios', 'Usuario'), claves_usuario, campos=('rol', 'is_active'))
+        registrar_fuente(apps.get_model('cursos', 'Curso'), claves_curso, campos=('estado',))
+        registrar_fuente(apps.get_model('inscripciones', 'Inscripcion'), claves_inscripcion, campos=('fecha_inscripcion',))
+        registrar_fuente(apps.get_model('unidades', 'Unidad'), contar_en('unidades'))
+        registrar_fuente(apps.get_model('temas', 'Tema'), contar_en('temas'))
+        registrar_fuente(apps.get_model('tareas', 'Tarea'), contar_en('tareas'))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from estadisticas.resumen import recalcular
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula desde cero el resumen del panel de administracion. '
+        'Programarlo periodicamente (p. ej. cada hora en cron) para corregir desviaciones.'
+    )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        valores = recalcular()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(valores)} valores recalculados en {(time.perf_counter() - inicio) * 1000:.0f} ms'
+        ))
@@ -0,0 +1,9 @@
+from django.db import models
+
+class Estadistica(models.Model):
+    """Un valor precalculado del panel de administracion (ver estadisticas.resumen)."""
+    clave = models.CharField(max_length=100, primary_key=True)
+    valor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.clave}: {self.valor}'
@@ -0,0 +1,241 @@
+"""
+Resumen precalculado para el panel de administracion.
+
+Los totales se guardan en la tabla Estadistica (clave -> valor), asi que
+leer el panel es una sola consulta sobre unas pocas decenas de filas sin
+importar el tamano de las demas tablas. Claves:
+
+    usuarios, usuarios:activos, usuarios:rol:<rol>
+    cursos, cursos:activos
+    unidades, temas, tareas
+    inscripciones, inscripciones:mes:<AAAA-MM>
+    recalculado  (marca de tiempo Unix del ultimo recalculo completo)
+
+Se mantiene de dos formas:
+
+    - incremental: cada alta, baja o cambio de una fila suma o resta 1 a sus
+      claves con UPDATE ... SET valor = valor + n (post_save y
+      errorPages.senales.filas_creadas_en_lote para los bulk_create). Las
+      bajas se suman por clave para todo el borrado, cascadas incluidas, y
+      se aplican al final con un UPDATE por diferencia distinta (ver
+      errorPages.eliminaciones)
+    - completa: recalcular() vuelve a contar todo, con las consultas de
+      agregacion en paralelo, cada una en su propia conexion. Se programa con
+      `python manage.py recalcular_estadisticas` (p. ej. cada hora en cron)
+      y corrige cualquier desviacion del modo incremental.
+"""
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_save, pre_save
+
+from cursos.models import Curso
+from errorPages.eliminaciones import al_eliminar
+from errorPages.senales import filas_creadas_en_lote
+from inscripciones.models import Inscripcion
+from tareas.models import Tarea
+from temas.models import Tema
+from unidades.models import Unidad
+from usuarios.models import Usuario
+from .models import Estadistica
+
+CLAVE_RECALCULADO = 'recalculado'
+
+#{modelo: claves(fila)} de cada fuente registrada
+FUENTES = {}
+
+
+#Claves a las que aporta cada fila
+def claves_usuario(usuario):
+    claves = ['usuarios', f'usuarios:rol:{usuario.rol}']
+    if usuario.is_active:
+        claves.append('usuarios:activos')
+    return claves
+
+def claves_curso(curso):
+    return ['cursos', 'cursos:activos'] if curso.estado else ['cursos']
+
+def claves_inscripcion(inscripcion):
+    #actualizar_inscripcion asigna la fecha como texto
+    fecha = Inscripcion._meta.get_field('fecha_inscripcion').to_python(inscripcion.fecha_inscripcion)
+    return ['inscripciones', f'inscripciones:mes:{fecha:%Y-%m}']
+
+def contar_en(clave):
+    def claves(objeto):
+        return [clave]
+    return claves
+
+
+def sumar(cambios):
+    """
+    Aplica {clave: diferencia} con UPDATE atomicos. Como en
+    Contador.ajustar, las claves con la misma diferencia van en una sola
+    consulta; las que aun no existen se crean.
+    """
+    por_diferencia = defaultdict(list)
+    for clave, diferencia in cambios.items():
+        if diferencia:
+            por_diferencia[diferencia].append(clave)
+    for diferencia, claves in por_diferencia.items():
+        actualizadas = Estadistica.objects.filter(clave__in=claves).update(valor=F('valor') + diferencia)
+        if actualizadas == len(claves):
+            continue
+        existentes = set(Estadistica.objects.filter(clave__in=claves).values_list('clave', flat=True))
+        for clave in claves:
+            if clave not in existentes:
+                crear(clave, diferencia)
+
+
+def crear(clave, diferencia):
+    try:
+        with transaction.atomic():
+            Estadistica.objects.create(clave=clave, valor=diferencia)
+    except IntegrityError:
+        #Otra peticion creo la clave al mismo tiempo
+        Estadistica.objects.filter(clave=clave).update(valor=F('valor') + diferencia)
+
+
+def diferencias(claves, objetos, signo):
+    cambios = defaultdict(int)
+    for objeto in objetos:
+        for clave in claves(objeto):
+            cambios[clave] += signo
+    return cambios
+
+
+def despues_de_eliminar(objetos, borrados):
+    """Todas las filas de un borrado, de todas las fuentes: un UPDATE por diferencia."""
+    cambios = defaultdict(int)
+    for modelo, filas in objetos.items():
+        for clave, diferencia in diferencias(FUENTES[modelo], filas, -1).items():
+            cambios[clave] += diferencia
+    sumar(cambios)
+
+
+def registrar_fuente(modelo, claves, campos=()):
+    """
+    Mantiene las claves que devuelve `claves(fila)` para cada fila de
+    `modelo`. `campos` son los campos de los que dependen las claves: solo si
+    los hay se lee la fila anterior al guardar para detectar el cambio.
+    """
+    anteriores = '_claves_estadisticas'
+    uid = f'estadisticas:{modelo._meta.label}'
+
+    def antes_de_guardar(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or instance._state.adding:
+            return
+        if update_fields is not None and not set(update_fields) & set(campos):
+            return
+        guardada = sender.objects.filter(pk=instance.pk).only(*campos).first()
+        if guardada is not None:
+            setattr(instance, anteriores, claves(guardada))
+
+    def despues_de_guardar(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        if created:
+            sumar(diferencias(claves, [instance], 1))
+            return
+        claves_anteriores = instance.__dict__.pop(anteriores, None)
+        if claves_anteriores is not None:
+            cambios = diferencias(claves, [instance], 1)
+            for clave in claves_anteriores:
+                cambios[clave] -= 1
+            sumar(cambios)
+
+    def despues_de_lote(sender, objetos, **kwargs):
+        sumar(diferencias(claves, objetos, 1))
+
+    if campos:
+        pre_save.connect(antes_de_guardar, sender=modelo, weak=False, dispatch_uid=f'{uid}:pre_save')
+    post_save.connect(despues_de_guardar, sender=modelo, weak=False, dispatch_uid=f'{uid}:post_save')
+    FUENTES[modelo] = claves
+    al_eliminar(modelo, despues_de_eliminar, 'estadisticas')
+    filas_creadas_en_lote.connect(despues_de_lote, sender=modelo, weak=False, dispatch_uid=f'{uid}:lote')
+
+
+#Consultas del recalculo completo; son independientes entre si
+def contar_usuarios():
+    valores = defaultdict(int)
+    for fila in Usuario.objects.order_by().values('rol', 'is_active').annotate(total=Count('pk')):
+        valores['usuarios'] += fila['total']
+        valores[f'usuarios:rol:{fila["rol"]}'] += fila['total']
+        if fila['is_active']:
+            valores['usuarios:activos'] += fila['total']
+    return valores
+
+def contar_cursos():
+    totales = Curso.objects.aggregate(cursos=Count('pk'), activos=Count('pk', filter=Q(estado=True)))
+    return {'cursos': totales['cursos'], 'cursos:activos': totales['activos']}
+
+def contar_inscripciones():
+    valores = {'inscripciones': 0}
+    meses = (
+        Inscripcion.objects
+        .annotate(mes=TruncMonth('fecha_inscripcion'))
+        .order_by()
+        .values('mes')
+        .annotate(total=Count('pk'))
+    )
+    for fila in meses:
+        valores['inscripciones'] += fila['total']
+        valores[f'inscripciones:mes:{fila["mes"]:%Y-%m}'] = fila['total']
+    return valores
+
+def contar_tabla(modelo, clave):
+    def contar():
+        return {clave: modelo.objects.count()}
+    return contar
+
+CONSULTAS = [
+    contar_usuarios,
+    contar_cursos,
+    contar_inscripciones,
+    contar_tabla(Unidad, 'unidades'),
+    contar_tabla(Tema, 'temas'),
+    contar_tabla(Tarea, 'tareas'),
+]
+
+
+def en_conexion_propia(consulta):
+    #Cada hilo abre su propia conexion; se cierra al terminar
+    try:
+        return consulta()
+    finally:
+        connections.close_all()
+
+
+def recalcular(paralelo=None):
+    """
+    Vuelve a contar todo y reemplaza la tabla de resumen. Dentro de una
+    transaccion las consultas se hacen en la conexion actual (otra conexion
+    no veria las filas aun sin confirmar).
+    """
+    if paralelo is None:
+        paralelo = not connection.in_atomic_block
+    if paralelo:
+        with ThreadPoolExecutor(len(CONSULTAS)) as pool:
+            partes = list(pool.map(en_conexion_propia, CONSULTAS))
+    else:
+        partes = [consulta() for consulta in CONSULTAS]
+
+    valores = {}
+    for parte in partes:
+        valores.update(parte)
+    valores[CLAVE_RECALCULADO] = int(time.time())
+    with transaction.atomic():
+        Estadistica.objects.all().delete()
+        Estadistica.objects.bulk_create([Estadistica(clave=clave, valor=valor) for clave, valor in valores.items()])
+    return valores
+
+
+def obtener_resumen():
+    valores = dict(Estadistica.objects.values_list('clave', 'valor'))
+    if CLAVE_RECALCULADO not in valores:
+        #Primera lectura (o tabla vaciada): se calcula una vez
+        valores = recalcular()
+    return valores
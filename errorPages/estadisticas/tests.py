@@ -0,0 +1,98 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from errorPages.pruebas import crear_curso_completo, crear_usuario
+from inscripciones.models import Inscripcion
+from usuarios.models import Usuario
+from .models import Estadistica
+from .resumen import CLAVE_RECALCULADO, obtener_resumen, recalcular
+
+
+class EstadisticasTests(TestCase):
+    def setUp(self):
+        recalcular(paralelo=False)
+        self.administrador = crear_usuario('admin_estadisticas', 'admin')
+        self.administrador.is_staff = True
+        self.administrador.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.administrador)
+
+    def valores(self):
+        valores = dict(Estadistica.objects.values_list('clave', 'valor'))
+        valores.pop(CLAVE_RECALCULADO)
+        return {clave: valor for clave, valor in valores.items() if valor}
+
+    def assertIgualAlRecalculo(self):
+        incrementales = self.valores()
+        recalcular(paralelo=False)
+        self.assertEqual(incrementales, self.valores())
+
+    def test_altas_bajas_y_cambios_incrementales(self):
+        antes = obtener_resumen()
+        alumno = crear_usuario('alumno_estadisticas')
+        curso, _, _, _ = crear_curso_completo('estadisticas', alumno=alumno)
+        resumen = obtener_resumen()
+        self.assertEqual(resumen['usuarios'], antes['usuarios'] + 2)
+        self.assertEqual(resumen['cursos'], antes.get('cursos', 0) + 1)
+        self.assertEqual(resumen['tareas'], antes.get('tareas', 0) + 1)
+        self.assertEqual(resumen['inscripciones'], antes.get('inscripciones', 0) + 1)
+
+        alumno.rol = 'profesor'
+        alumno.is_active = False
+        alumno.save()
+        curso.estado = False
+        curso.save(update_fields=['estado'])
+        self.assertIgualAlRecalculo()
+
+        #La cascada envia post_delete por unidades, temas, tareas e inscripciones
+        curso.delete()
+        alumno.delete()
+        self.assertIgualAlRecalculo()
+
+    def test_borrado_en_cascada_agrupa_las_claves(self):
+        curso, _, _, _ = crear_curso_completo('cascada')
+        for i in range(20):
+            Inscripcion.objects.create(usuario=crear_usuario(f'cascada{i}'), curso=curso)
+        with CaptureQueriesContext(connection) as consultas:
+            curso.delete()
+        actualizaciones = [c['sql'] for c in consultas if c['sql'].startswith('UPDATE "estadisticas_estadistica"')]
+        #-1 para cursos, cursos:activos, unidades, temas y tareas; -20 para las dos de inscripciones
+        self.assertEqual(len(actualizaciones), 2)
+        self.assertIgualAlRecalculo()
+
+    def test_filas_creadas_en_lote(self):
+        curso, _, _, _ = crear_curso_completo('lote')
+        respuesta = self.client.post('/unidades/registrar_lote/', [
+            {'nombre': f'Unidad {i}', 'curso': str(curso.id), 'orden': i + 2} for i in range(3)
+        ], format='json')
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertIgualAlRecalculo()
+
+    def test_lectura_una_consulta(self):
+        crear_curso_completo('lectura', alumno=crear_usuario('alumno_lectura'))
+        with self.assertNumQueries(1):
+            respuesta = self.client.get('/estadisticas/')
+        data = respuesta.json()
+        self.assertEqual(data['usuarios']['total'], Usuario.objects.count())
+        self.assertEqual(data['cursos'], {'total': 1, 'activos': 1})
+        self.assertEqual(sum(data['inscripciones']['por_mes'].values()), 1)
+
+    def test_primera_lectura_recalcula(self):
+        Estadistica.objects.all().delete()
+        respuesta = self.client.get('/estadisticas/')
+        self.assertEqual(respuesta.json()['usuarios']['total'], Usuario.objects.count())
+        self.assertTrue(Estadistica.objects.filter(clave=CLAVE_RECALCULADO).exists())
+
+    def test_solo_administradores(self):
+        self.client.force_authenticate(crear_usuario('alumno_sin_permiso'))
+        self.assertEqual(self.client.get('/estadisticas/').status_code, 403)
+
+    def test_comando(self):
+        Estadistica.objects.filter(clave='usuarios').update(valor=0)
+        call_command('recalcular_estadisticas', stdout=io.StringIO())
+        self.assertEqual(Estadistica.objects.get(clave='usuarios').valor, Usuario.objects.count())
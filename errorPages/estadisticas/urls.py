@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.obtener_estadisticas, name='obtener_estadisticas'),
+]
@@ -0,0 +1,41 @@
+import datetime
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from errorPages.renderizado import RespuestaJson
+from .resumen import CLAVE_RECALCULADO, obtener_resumen
+
+def agrupar(valores, prefijo):
+    """{'usuarios:rol:admin': 2, ...} -> {'admin': 2, ...}, sin las claves en cero."""
+    return {
+        clave[len(prefijo):]: valor
+        for clave, valor in sorted(valores.items())
+        if clave.startswith(prefijo) and valor
+    }
+
+#Totales del panel de administracion (ver estadisticas.resumen)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def obtener_estadisticas(request):
+    valores = obtener_resumen()
+    data = {
+        'usuarios': {
+            'total': valores.get('usuarios', 0),
+            'activos': valores.get('usuarios:activos', 0),
+            'por_rol': agrupar(valores, 'usuarios:rol:'),
+        },
+        'cursos': {
+            'total': valores.get('cursos', 0),
+            'activos': valores.get('cursos:activos', 0),
+        },
+        'unidades': valores.get('unidades', 0),
+        'temas': valores.get('temas', 0),
+        'tareas': valores.get('tareas', 0),
+        'inscripciones': {
+            'total': valores.get('inscripciones', 0),
+            'por_mes': agrupar(valores, 'inscripciones:mes:'),
+        },
+        'recalculado': datetime.datetime.fromtimestamp(valores[CLAVE_RECALCULADO], datetime.timezone.utc),
+    }
+    return RespuestaJson(data)
@@ -0,0 +1,37 @@
+from .models import Inscripcion
+
+#Columnas que leen las vistas de inscripciones (listado y detalle).
+#Solo se necesitan los ids de curso y usuario, que ya estan en la fila,
+#asi que no hace falta ningun JOIN.
+COLUMNAS_INSCRIPCION = ('id', 'curso_id', 'usuario_id', 'fecha_inscripcion')
+
+#Queryset compartido por las vistas de lectura
+def consulta_inscripciones():
+    return Inscripcion.objects.only(*COLUMNAS_INSCRIPCION)
+
+#Inscripciones de un usuario junto con su curso, en una sola consulta que
+#filtra por el indice de Inscripcion.usuario
+def consulta_inscripciones_de_usuario(usuario):
+    return (
+        Inscripcion.objects
+        .filter(usuario=usuario)
+        .select_related('curso')
+        .only(*COLUMNAS_INSCRIPCION, 'curso__id', 'curso__nombre')
+        .order_by('fecha_inscripcion', 'id')
+    )
+
+#Exportacion CSV: cada inscripcion con su alumno, su curso y el profesor del
+#curso en una sola consulta por lote
+COLUMNAS_EXPORTACION = (
+    'id', 'fecha_inscripcion',
+    'usuario__id', 'usuario__username', 'usuario__nombre_completo', 'usuario__email',
+    'curso__id', 'curso__nombre',
+    'curso__profesor__id', 'curso__profesor__nombre_completo', 'curso__profesor__email',
+)
+
+def consulta_exportacion():
+    return (
+        Inscripcion.objects
+        .select_related('usuario', 'curso__profesor')
+        .only(*COLUMNAS_EXPORTACION)
+    )
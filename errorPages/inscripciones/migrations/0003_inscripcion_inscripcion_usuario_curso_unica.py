@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def eliminar_duplicadas(apps, schema_editor):
+    #Antes de la restriccion: se conserva la inscripcion mas antigua de cada
+    #par (usuario, curso)
+    Inscripcion = apps.get_model('inscripciones', 'Inscripcion')
+    duplicadas = (
+        Inscripcion.objects
+        .values('usuario_id', 'curso_id')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for par in duplicadas.iterator():
+        ids = list(
+            Inscripcion.objects
+            .filter(usuario_id=par['usuario_id'], curso_id=par['curso_id'])
+            .order_by('fecha_inscripcion', 'id')
+            .values_list('id', flat=True)
+        )
+        Inscripcion.objects.filter(id__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0003_curso_curso_estado_inicio_idx'),
+        ('inscripciones', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='inscripcion',
+            constraint=models.UniqueConstraint(fields=('usuario', 'curso'), name='inscripcion_usuario_curso_unica'),
+        ),
+    ]
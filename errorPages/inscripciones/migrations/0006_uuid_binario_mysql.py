@@ -0,0 +1,105 @@
+"""
+Convierte en MySQL las claves UUID de char(32) (texto hexadecimal) a
+binary(16), junto con todas las columnas que apuntan a ellas: las claves
+foraneas entre las apps y las de Django (usuarios_usuario_groups,
+django_admin_log, ...). Las columnas que apuntan a estas tablas se buscan en
+information_schema, asi que no hace falta listarlas.
+
+Por cada tabla:
+    1. se quitan las claves foraneas que apuntan a las tablas convertidas
+    2. char(32) -> varbinary(32), que conserva el texto byte por byte
+    3. UPDATE col = UNHEX(col)
+    4. varbinary(32) -> binary(16)
+    5. se vuelven a crear las claves foraneas
+
+Reescribe las tablas, asi que conviene hacerlo en una ventana de
+mantenimiento. En otros motores no hace nada.
+"""
+from django.db import migrations
+
+MODELOS = [
+    ('usuarios', 'Usuario'),
+    ('cursos', 'Curso'),
+    ('unidades', 'Unidad'),
+    ('temas', 'Tema'),
+    ('tareas', 'Tarea'),
+    ('inscripciones', 'Inscripcion'),
+]
+
+
+def referencias(cursor, tablas):
+    marcadores = ', '.join(['%s'] * len(tablas))
+    cursor.execute(
+        'SELECT TABLE_NAME, COLUMN_NAME, CONSTRAINT_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME '
+        'FROM information_schema.KEY_COLUMN_USAGE '
+        f'WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IN ({marcadores})',
+        tablas,
+    )
+    return cursor.fetchall()
+
+
+def nulos(cursor, tabla, columna):
+    cursor.execute(
+        'SELECT IS_NULLABLE FROM information_schema.COLUMNS '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s',
+        [tabla, columna],
+    )
+    return 'NULL' if cursor.fetchone()[0] == 'YES' else 'NOT NULL'
+
+
+def convertir(apps, schema_editor, tipo_final, expresion):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    tablas = [apps.get_model(app, modelo)._meta.db_table for app, modelo in MODELOS]
+    q = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        claves_foraneas = referencias(cursor, tablas)
+        columnas = {tabla: ['id'] for tabla in tablas}
+        for tabla, columna, restriccion, _, _ in claves_foraneas:
+            schema_editor.execute(f'ALTER TABLE {q(tabla)} DROP FOREIGN KEY {q(restriccion)}')
+            columnas.setdefault(tabla, [])
+            if columna not in columnas[tabla]:
+                columnas[tabla].append(columna)
+
+        for tabla, nombres in columnas.items():
+            definiciones = [(q(columna), nulos(cursor, tabla, columna)) for columna in nombres]
+            schema_editor.execute(f'ALTER TABLE {q(tabla)} ' + ', '.join(
+                f'MODIFY {columna} varbinary(32) {nulo}' for columna, nulo in definiciones
+            ))
+            schema_editor.execute(f'UPDATE {q(tabla)} SET ' + ', '.join(
+                f'{columna} = {expresion.format(columna)}' for columna, _ in definiciones
+            ))
+            schema_editor.execute(f'ALTER TABLE {q(tabla)} ' + ', '.join(
+                f'MODIFY {columna} {tipo_final} {nulo}' for columna, nulo in definiciones
+            ))
+
+        for tabla, columna, restriccion, tabla_referida, columna_referida in claves_foraneas:
+            schema_editor.execute(
+                f'ALTER TABLE {q(tabla)} ADD CONSTRAINT {q(restriccion)} '
+                f'FOREIGN KEY ({q(columna)}) REFERENCES {q(tabla_referida)} ({q(columna_referida)})'
+            )
+
+
+def a_binario(apps, schema_editor):
+    convertir(apps, schema_editor, 'binary(16)', 'UNHEX({})')
+
+
+def a_texto(apps, schema_editor):
+    convertir(apps, schema_editor, 'char(32)', 'LOWER(HEX({}))')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0005_alter_curso_id'),
+        ('inscripciones', '0005_alter_inscripcion_id'),
+        ('tareas', '0004_alter_tarea_id'),
+        ('temas', '0004_alter_tema_id'),
+        ('unidades', '0004_alter_unidad_id'),
+        ('usuarios', '0004_alter_usuario_id'),
+        ('admin', '0003_logentry_add_action_flag_choices'),
+    ]
+
+    operations = [
+        migrations.RunPython(a_binario, a_texto),
+    ]
@@ -1,13 +1,21 @@
-import uuid
 from django.db import models
+from errorPages.contadores import ContadoresMixin
+from errorPages.identificadores import UUIDBinarioField, uuid7
 from usuarios.models import Usuario
 from cursos.models import Curso
 
-class Inscripcion(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+class Inscripcion(ContadoresMixin, models.Model):
+    id = UUIDBinarioField(primary_key=True, default=uuid7, editable=False)
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='inscripciones')
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='inscripciones')
     fecha_inscripcion = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        #Un alumno se inscribe una sola vez en cada curso; el indice tambien
+        #sirve para buscar la inscripcion de un usuario en un curso
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'curso'], name='inscripcion_usuario_curso_unica'),
+        ]
+
     def __str__(self):
         return f"Inscripción {self.id_inscripcion}: {self.usuario.username} en {self.curso.nombre}"
@@ -1,3 +1,167 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
 from django.test import TestCase
 
-# Create your tests here.
+from errorPages.pruebas import ConsultasConstantesMixin, crear_curso_completo, crear_usuario
+from .models import Inscripcion
+
+
+class ConsultasInscripcionesTests(ConsultasConstantesMixin, TestCase):
+    def test_listar_inscripciones_sin_consultas_por_fila(self):
+        self.assertConsultasConstantes('/inscripciones/')
+        self.assertConsultasConstantes('/inscripciones/', {'todos': 'true'})
+
+    def test_obtener_inscripcion_una_consulta(self):
+        curso, _, _, _ = crear_curso_completo('detalle', alumno=self.alumno)
+        inscripcion = Inscripcion.objects.get(curso=curso)
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/inscripciones/obtener/{inscripcion.id}/')
+        self.assertEqual(respuesta.json()['id_usuario'], str(self.alumno.id))
+
+
+class PaginacionInscripcionesTests(ConsultasConstantesMixin, TestCase):
+    def test_empates_en_fecha_se_desempatan_por_id(self):
+        self.crear_cursos(6)
+        crear_curso_completo('otro', alumno=crear_usuario('otro'))
+        #Todas con la misma fecha: solo el id separa las filas
+        Inscripcion.objects.update(fecha_inscripcion=Inscripcion.objects.earliest('fecha_inscripcion').fecha_inscripcion)
+        filas, paginas = self.recorrer_paginas('/inscripciones/', 3)
+        ids = [inscripcion['id'] for inscripcion in filas]
+        self.assertEqual(ids, [str(id) for id in Inscripcion.objects.order_by('id').values_list('id', flat=True)])
+        self.assertEqual(len(paginas), 3)
+        self.assertIsNone(paginas[-1]['siguiente'])
+
+    def test_ultima_pagina_exacta(self):
+        self.crear_cursos(4)
+        filas, paginas = self.recorrer_paginas('/inscripciones/', 2)
+        self.assertEqual(len(filas), 4)
+        self.assertEqual(len(paginas), 2)
+        self.assertIsNone(paginas[-1]['siguiente'])
+
+    def test_parametros_invalidos(self):
+        for params in ({'cursor': '%%%'}, {'cursor': 'eyJhIjoxfQ'}, {'limit': '0'}, {'limit': '1.5'}):
+            self.assertEqual(self.client.get('/inscripciones/', params).status_code, 400, params)
+
+
+class MisInscripcionesTests(ConsultasConstantesMixin, TestCase):
+    def test_solo_devuelve_inscripciones_del_usuario(self):
+        propio, _, _, _ = crear_curso_completo('propio', alumno=self.alumno)
+        crear_curso_completo('ajeno', alumno=crear_usuario('otro'))
+        respuesta = self.client.get('/inscripciones/mis_inscripciones/')
+        self.assertEqual([i['curso']['id'] for i in respuesta.json()], [str(propio.id)])
+
+    def test_mis_inscripciones_una_consulta(self):
+        self.crear_cursos(3)
+        self.assertEqual(self.contar_consultas('/inscripciones/mis_inscripciones/'), 1)
+
+
+class StreamingInscripcionesTests(ConsultasConstantesMixin, TestCase):
+    def leer(self, params):
+        respuesta = self.client.get('/inscripciones/', params)
+        self.assertTrue(respuesta.streaming)
+        return b''.join(respuesta.streaming_content)
+
+    def test_stream_igual_a_lista_completa(self):
+        self.crear_cursos(5)
+        completa = self.client.get('/inscripciones/', {'todos': 'true'}).json()
+        with patch('errorPages.listados.TAMANO_LOTE', 2):
+            contenido = self.leer({'formato': 'stream'})
+        self.assertEqual(
+            sorted(json.loads(contenido), key=lambda i: i['id']),
+            sorted(completa, key=lambda i: i['id']),
+        )
+
+    def test_ndjson_una_linea_por_fila(self):
+        self.crear_cursos(3)
+        lineas = self.leer({'formato': 'ndjson'}).decode().splitlines()
+        self.assertEqual(len(lineas), Inscripcion.objects.count())
+        self.assertEqual({json.loads(linea)['id_usuario'] for linea in lineas}, {str(self.alumno.id)})
+
+
+class ExportacionInscripcionesTests(ConsultasConstantesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.alumno.is_staff = True
+        self.alumno.save()
+
+    def leer(self, url):
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        return list(csv.DictReader(io.StringIO(b''.join(respuesta.streaming_content).decode())))
+
+    def test_exportacion_completa_una_consulta_por_lote(self):
+        self.crear_cursos(5)
+        with patch('errorPages.listados.TAMANO_LOTE', 2), self.assertNumQueries(3):
+            filas = self.leer('/inscripciones/exportar/')
+        self.assertEqual(len(filas), 5)
+        self.assertEqual({fila['username_alumno'] for fila in filas}, {self.alumno.username})
+        self.assertEqual(len({fila['id_inscripcion'] for fila in filas}), 5)
+
+    def test_exportacion_de_un_curso(self):
+        curso, _, _, _ = crear_curso_completo('lista', alumno=self.alumno)
+        crear_curso_completo('otro', alumno=self.alumno)
+        filas = self.leer(f'/inscripciones/exportar/{curso.id}/')
+        self.assertEqual([fila['curso'] for fila in filas], [curso.nombre])
+        self.assertEqual(filas[0]['email_profesor'], curso.profesor.email)
+
+    def test_curso_sin_inscripciones_solo_cabecera(self):
+        curso, _, _, _ = crear_curso_completo('vacio')
+        self.assertEqual(self.leer(f'/inscripciones/exportar/{curso.id}/'), [])
+
+    def test_solo_administradores(self):
+        self.alumno.is_staff = False
+        self.alumno.save()
+        self.assertEqual(self.client.get('/inscripciones/exportar/').status_code, 403)
+
+
+class LoteInscripcionesTests(ConsultasConstantesMixin, TestCase):
+    def test_no_repite_usuario_y_curso(self):
+        curso, _, _, _ = crear_curso_completo('lote', alumno=self.alumno)
+        otro, _, _, _ = crear_curso_completo('lote-otro')
+        elemento = {'id_curso': str(otro.id), 'id_usuario': str(self.alumno.id)}
+        respuesta = self.client.post('/inscripciones/registrar_lote/', json.dumps([
+            {'id_curso': str(curso.id), 'id_usuario': str(self.alumno.id)},
+            elemento,
+            elemento,
+        ]), content_type='application/json')
+        resultados = respuesta.json()['resultados']
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(['error' in resultado for resultado in resultados], [True, False, True])
+        self.assertNotIn('id', resultados[0])
+        self.assertEqual(Inscripcion.objects.filter(usuario=self.alumno).count(), 2)
+
+    def test_actualizar_a_un_par_ocupado(self):
+        curso, _, _, _ = crear_curso_completo('lote', alumno=self.alumno)
+        otro, _, _, _ = crear_curso_completo('lote-otro', alumno=self.alumno)
+        tercero, _, _, _ = crear_curso_completo('lote-tercero')
+        primera = Inscripcion.objects.get(curso=curso)
+        segunda = Inscripcion.objects.get(curso=otro)
+        respuesta = self.client.put('/inscripciones/actualizar_lote/', json.dumps([
+            #Ya existe la inscripcion del alumno en otro
+            {'id': str(primera.id), 'id_curso': str(otro.id)},
+            {'id': str(segunda.id), 'id_curso': str(tercero.id)},
+            {'id_curso': str(tercero.id)},
+        ]), content_type='application/json')
+        resultados = respuesta.json()['resultados']
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(['error' in resultado for resultado in resultados], [True, False, True])
+        self.assertIn('Ya existe', resultados[0]['error'])
+        self.assertEqual(
+            set(Inscripcion.objects.filter(usuario=self.alumno).values_list('curso_id', flat=True)),
+            {curso.id, tercero.id},
+        )
+
+    def test_dos_elementos_al_mismo_par(self):
+        curso, _, _, _ = crear_curso_completo('lote', alumno=self.alumno)
+        otro, _, _, _ = crear_curso_completo('lote-otro', alumno=self.alumno)
+        destino, _, _, _ = crear_curso_completo('lote-destino')
+        ids = [str(Inscripcion.objects.get(curso=c).id) for c in (curso, otro)]
+        respuesta = self.client.put('/inscripciones/actualizar_lote/', json.dumps([
+            {'id': id, 'id_curso': str(destino.id)} for id in ids
+        ]), content_type='application/json')
+        resultados = respuesta.json()['resultados']
+        self.assertEqual(['error' in resultado for resultado in resultados], [False, True])
+        self.assertEqual(Inscripcion.objects.filter(usuario=self.alumno, curso=destino).count(), 1)
@@ -3,6 +3,12 @@ from .views import *
 
 urlpatterns = [
     path('', listar_inscripciones, name='listar_inscripciones'),
+    path('mis_inscripciones/', mis_inscripciones, name='mis_inscripciones'),
+    path('exportar/', exportar_inscripciones, name='exportar_inscripciones'),
+    path('exportar/<str:id>/', exportar_inscripciones_curso, name='exportar_inscripciones_curso'),
+    path('registrar_lote/', registrar_inscripciones_lote, name='registrar_inscripciones_lote'),
+    path('actualizar_lote/', actualizar_inscripciones_lote, name='actualizar_inscripciones_lote'),
+    path('eliminar_lote/', eliminar_inscripciones_lote, name='eliminar_inscripciones_lote'),
     path('registrar/', registrar_inscripcion, name='registrar_inscripcion'),
     path('actualizar/<str:id>/', actualizar_inscripcion, name='actualizar_inscripcion'),
     path('eliminar/<str:id>/', eliminar_inscripcion, name='eliminar_inscripcion'),
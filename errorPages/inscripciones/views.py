@@ -1,29 +1,108 @@
 import json
 from django.shortcuts import render
-from django.http import JsonResponse
 from .models import Inscripcion
+from cursos.models import Curso
+from usuarios.models import Usuario
 from .forms import InscripcionForm
 from django.shortcuts import redirect
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from errorPages.campos import Campo, ParametroInvalido, campos_solicitados, proyectar, serializar
+from errorPages.cache_listados import cachear_listado
+from errorPages.listados import responder_csv, responder_listado
+from errorPages.lotes import Lote
+from errorPages.renderizado import RespuestaJson, convertir
+from errorPages.versiones import condicional
+from .consultas import consulta_exportacion, consulta_inscripciones, consulta_inscripciones_de_usuario
+
+#Clave de orden estable para la paginacion por cursor
+ORDEN_INSCRIPCIONES = ('fecha_inscripcion', 'id')
+
+#Campos que aceptan las vistas en lote
+LOTE_INSCRIPCIONES = Lote(
+    Inscripcion, 'inscripciones',
+    campos={},
+    padres={'id_curso': ('curso_id', Curso), 'id_usuario': ('usuario_id', Usuario)},
+    unicos=(('usuario_id', 'curso_id'),),
+)
+
+#Campos de cada inscripcion (listado y detalle): columnas que necesita y como se obtiene
+CAMPOS_INSCRIPCION = {
+    'id': Campo('id', lambda inscripcion: inscripcion.id),
+    'id_curso': Campo('curso_id', lambda inscripcion: inscripcion.curso_id),  # The curso id is already in the row
+    'id_usuario': Campo('usuario_id', lambda inscripcion: inscripcion.usuario_id),  # The usuario id is already in the row
+    'fecha_inscripcion': Campo('fecha_inscripcion', lambda inscripcion: inscripcion.fecha_inscripcion),
+}
+
+def serializar_inscripcion(inscripcion):
+    return serializar(inscripcion, CAMPOS_INSCRIPCION)
+
+#Exportacion CSV. La exportacion completa se recorre por la clave primaria,
+#que es un rango del indice en cada lote; la de un curso solo lee sus filas
+ORDEN_EXPORTACION = ('id',)
+ENCABEZADOS_EXPORTACION = (
+    'id_inscripcion', 'fecha_inscripcion',
+    'id_alumno', 'username_alumno', 'nombre_alumno', 'email_alumno',
+    'id_curso', 'curso',
+    'id_profesor', 'nombre_profesor', 'email_profesor',
+)
+
+def fila_exportacion(inscripcion):
+    alumno, curso = inscripcion.usuario, inscripcion.curso
+    return (
+        inscripcion.id, convertir(inscripcion.fecha_inscripcion),
+        alumno.id, alumno.username, alumno.nombre_completo, alumno.email,
+        curso.id, curso.nombre,
+        curso.profesor.id, curso.profesor.nombre_completo, curso.profesor.email,
+    )
 
 #Metodo que devuelve el JSON
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('inscripciones')
+@cachear_listado('inscripciones')
 def listar_inscripciones(request):
-    inscripciones = Inscripcion.objects.all()
+    inscripciones = consulta_inscripciones()
+    return responder_listado(request, inscripciones, ORDEN_INSCRIPCIONES, CAMPOS_INSCRIPCION)
+
+#Metodo que devuelve solo las inscripciones del usuario actual
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condicional('inscripciones', 'cursos', por_usuario=True)
+def mis_inscripciones(request):
+    inscripciones = consulta_inscripciones_de_usuario(request.user)
     data = [
         {
-            'id': inscripcion.id,
-            'id_curso': inscripcion.curso.id,  # Access the related curso's id
-            'id_usuario': inscripcion.usuario.id,  # Access the related usuario's id
-            'fecha_inscripcion': inscripcion.fecha_inscripcion
-        } 
+            **serializar_inscripcion(inscripcion),
+            'curso': {
+                'id': inscripcion.curso.id,
+                'nombre': inscripcion.curso.nombre,
+            },
+        }
         for inscripcion in inscripciones
     ]
-    return JsonResponse(data, safe=False)
+    return RespuestaJson(data)
+
+#Exportacion CSV de todas las inscripciones (solo administradores)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_inscripciones(request):
+    return responder_csv(
+        consulta_exportacion(), ORDEN_EXPORTACION, ENCABEZADOS_EXPORTACION, fila_exportacion,
+        'inscripciones.csv',
+    )
+
+#Exportacion CSV de los alumnos inscritos en un curso (solo administradores)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_inscripciones_curso(request, id):
+    curso = get_object_or_404(Curso.objects.only('id'), id=id)
+    return responder_csv(
+        consulta_exportacion().filter(curso=curso), ORDEN_INSCRIPCIONES, ENCABEZADOS_EXPORTACION,
+        fila_exportacion, f'inscripciones-{curso.id}.csv',
+    )
 
 #Funcion que registre sin recargar la pagina osea sin hacer render 
 @csrf_exempt
@@ -46,10 +125,10 @@ def registrar_inscripcion(request):
                 usuario=usuario,
                 fecha_inscripcion=data['fecha_inscripcion']
             )
-            return JsonResponse({'mensaje': 'Inscripcion creada correctamente', 'id': inscripcion.id}, status=201)
+            return RespuestaJson({'mensaje': 'Inscripcion creada correctamente', 'id': inscripcion.id}, status=201)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 #Funcion que actualiza sin recargar la pagina osea sin hacer render 
 @csrf_exempt
@@ -73,10 +152,10 @@ def actualizar_inscripcion(request, id):
             inscripcion.save()  # Se agregó para asegurar que los cambios se guarden en la BD
 
             #5)Retornar un JSON
-            return JsonResponse({'mensaje': 'Inscripcion actualizada correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Inscripcion actualizada correctamente'}, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 
 #Funcion que elimina sin recargar la pagina osea sin hacer render
@@ -94,33 +173,52 @@ def eliminar_inscripcion(request, id):
             #2) Eliminar la entidad
             inscripcion.delete()
             #3) Retornar un mensaje de exito
-            return JsonResponse({'mensaje': 'Inscripcion eliminada correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Inscripcion eliminada correctamente'}, status=200)
         except Exception as e:
             #4) Retornar un mensaje de error
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 #Funcion que obtiene un objeto sin recargar la pagina osea sin hacer render
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('inscripciones')
 def obtener_inscripcion(request, id):
     #checar que estemos manejando un metodo GET
     if request.method == 'GET':
         #Intentar obtener el objeto
         #1) Obtener la entidad a obtener
         #Parametros: modelo y id o identificador del objeto
-        inscripcion = get_object_or_404(Inscripcion, id=id)
+        try:
+            claves = campos_solicitados(request, CAMPOS_INSCRIPCION)
+        except ParametroInvalido as e:
+            return RespuestaJson({'error': str(e)}, status=400)
+        inscripcion = get_object_or_404(proyectar(consulta_inscripciones(), CAMPOS_INSCRIPCION, claves), id=id)
         try:
             #2) Crear un diccionario con los datos de la entidad
-            data = {
-                'id': inscripcion.id,
-                'id_curso': inscripcion.curso.id,  # Access the related curso's id
-                'id_usuario': inscripcion.usuario.id,  # Access the related usuario's id
-                'fecha_inscripcion': inscripcion.fecha_inscripcion
-            }
+            data = serializar(inscripcion, CAMPOS_INSCRIPCION, claves)
             #3) Retornar un JSON
-            return JsonResponse(data, status=200)
+            return RespuestaJson(data, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
+
 
+#Registro, actualizacion y eliminacion de varias inscripciones en una sola peticion
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def registrar_inscripciones_lote(request):
+    return LOTE_INSCRIPCIONES.registrar(request)
+
+@csrf_exempt
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def actualizar_inscripciones_lote(request):
+    return LOTE_INSCRIPCIONES.actualizar(request)
+
+@csrf_exempt
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def eliminar_inscripciones_lote(request):
+    return LOTE_INSCRIPCIONES.eliminar(request)
@@ -1,6 +1,16 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+
+from errorPages.contadores import registrar_contador
+from errorPages.versiones import registrar_modelo
 
 
 class TareasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tareas'
+
+    def ready(self):
+        registrar_modelo(self.get_model('Tarea'), 'tareas')
+        registrar_contador(
+            self.get_model('Tarea'), 'tema_id',
+            apps.get_model('temas', 'Tema'), 'total_tareas', 'temas',
+        )
@@ -0,0 +1,19 @@
+from .models import Tarea
+
+#Columnas que leen las vistas de tareas (listado y detalle)
+COLUMNAS_TAREA = ('id', 'titulo', 'descripcion', 'fecha_entrega', 'tema', 'tema__id', 'tema__nombre')
+
+#Queryset compartido por las vistas de lectura: trae el tema en el mismo JOIN
+def consulta_tareas():
+    return Tarea.objects.select_related('tema').only(*COLUMNAS_TAREA)
+
+#Tareas con entrega en [desde, hasta] de los cursos en los que esta inscrito el
+#usuario. Se resuelve en una consulta que va de Inscripcion (indice por usuario)
+#a Curso, Unidad (curso, orden), Tema (unidad, orden) y Tarea, donde el rango de
+#fechas usa el indice (tema, fecha_entrega): solo se leen los temas y tareas de
+#los cursos del alumno, sin importar el tamano del catalogo.
+def consulta_proximas_tareas(usuario, desde, hasta):
+    return consulta_tareas().filter(
+        tema__unidad__curso__inscripciones__usuario=usuario,
+        fecha_entrega__range=(desde, hasta),
+    )
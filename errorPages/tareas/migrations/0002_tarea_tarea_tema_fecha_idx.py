@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0001_initial'),
+        ('temas', '0002_tema_tema_unidad_orden_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['tema', 'fecha_entrega'], name='tarea_tema_fecha_idx'),
+        ),
+    ]
@@ -1,13 +1,18 @@
-import uuid
 from django.db import models
+from errorPages.contadores import ContadoresMixin
+from errorPages.identificadores import UUIDBinarioField, uuid7
 from temas.models import Tema
 
-class Tarea(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+class Tarea(ContadoresMixin, models.Model):
+    id = UUIDBinarioField(primary_key=True, default=uuid7, editable=False)
     titulo = models.CharField(max_length=100)
     descripcion = models.TextField(null=True, blank=True)
     fecha_entrega = models.DateField()
     tema = models.ForeignKey(Tema, on_delete=models.CASCADE, related_name='tareas')
 
+    class Meta:
+        #Tareas de un tema por fecha de entrega (proximas entregas, arbol de cursos)
+        indexes = [models.Index(fields=['tema', 'fecha_entrega'], name='tarea_tema_fecha_idx')]
+
     def __str__(self):
         return self.titulo
@@ -1,3 +1,98 @@
+import datetime
+import json
+
 from django.test import TestCase
 
-# Create your tests here.
+from errorPages.pruebas import ConsultasConstantesMixin, crear_curso_completo
+from temas.models import Tema
+from .models import Tarea
+
+
+class ConsultasTareasTests(ConsultasConstantesMixin, TestCase):
+    def test_listar_tareas_sin_consultas_por_fila(self):
+        self.assertConsultasConstantes('/tareas/')
+        self.assertConsultasConstantes('/tareas/', {'todos': 'true'})
+
+    def test_obtener_tarea_una_consulta(self):
+        _, _, tema, tarea = crear_curso_completo('detalle')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/tareas/obtener/{tarea.id}/')
+        self.assertEqual(respuesta.json()['tema'], tema.nombre)
+
+
+class ProximasTareasTests(ConsultasConstantesMixin, TestCase):
+    VENTANA = {'desde': '2025-01-01', 'hasta': '2025-06-30'}
+
+    def proximas(self, **params):
+        return self.client.get('/tareas/proximas/', {**self.VENTANA, **params})
+
+    def test_solo_cursos_inscritos_y_en_la_ventana(self):
+        propio, _, tema, tarea = crear_curso_completo('propio', alumno=self.alumno)
+        crear_curso_completo('ajeno')
+        Tarea.objects.create(titulo='Antes', tema=tema, fecha_entrega=datetime.date(2025, 2, 1))
+        Tarea.objects.create(titulo='Fuera', tema=tema, fecha_entrega=datetime.date(2025, 8, 1))
+        respuesta = self.proximas()
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        resultados = respuesta.json()['resultados']
+        self.assertEqual([r['titulo'] for r in resultados], ['Antes', tarea.titulo])
+        self.assertEqual(resultados[1]['curso'], {'id': str(propio.id), 'nombre': propio.nombre})
+
+    def test_paginacion_por_fecha(self):
+        _, _, tema, _ = crear_curso_completo('paginas', alumno=self.alumno)
+        for dia in range(1, 6):
+            Tarea.objects.create(titulo=f'Dia {dia}', tema=tema, fecha_entrega=datetime.date(2025, 4, dia))
+        primera = self.proximas(limit=4).json()
+        segunda = self.proximas(limit=4, cursor=primera['siguiente']).json()
+        fechas = [r['fecha_entrega'] for r in primera['resultados'] + segunda['resultados']]
+        self.assertEqual(len(fechas), 6)
+        self.assertEqual(fechas, sorted(fechas))
+        self.assertIsNone(segunda['siguiente'])
+
+    def test_una_consulta_sin_importar_el_catalogo(self):
+        self.assertConsultasConstantes('/tareas/proximas/', self.VENTANA)
+        self.assertEqual(self.contar_consultas('/tareas/proximas/', self.VENTANA), 1)
+
+    def test_ventana_invalida(self):
+        self.assertEqual(self.proximas(desde='01/02/2025').status_code, 400)
+        self.assertEqual(self.proximas(desde='2025-06-30', hasta='2025-01-01').status_code, 400)
+        self.assertEqual(self.proximas(hasta='2027-01-01').status_code, 400)
+
+
+class LoteTareasTests(ConsultasConstantesMixin, TestCase):
+    def enviar(self, metodo, ruta, elementos):
+        return getattr(self.client, metodo)(f'/tareas/{ruta}/', json.dumps(elementos), content_type='application/json')
+
+    def test_registrar_y_contadores(self):
+        _, _, tema, _ = crear_curso_completo('lote')
+        respuesta = self.enviar('post', 'registrar_lote', [
+            {'titulo': 'Una', 'descripcion': '', 'fecha_entrega': '2025-04-01', 'tema': str(tema.id)},
+            {'titulo': 'Dos', 'descripcion': '', 'fecha_entrega': 'no-es-fecha', 'tema': str(tema.id)},
+            {'titulo': 'Tres', 'descripcion': '', 'fecha_entrega': '2025-04-02', 'tema': str(tema.id)},
+        ])
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.json()['errores'], 1)
+        tema.refresh_from_db()
+        self.assertEqual(tema.total_tareas, 3)
+
+    def test_mover_de_tema_y_elemento_sin_id(self):
+        _, _, origen, tarea = crear_curso_completo('lote')
+        _, _, destino, _ = crear_curso_completo('destino')
+        respuesta = self.enviar('put', 'actualizar_lote', [
+            {'id': str(tarea.id), 'tema': str(destino.id)},
+            {'tema': str(destino.id)},
+        ])
+        data = respuesta.json()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((data['correctos'], data['errores']), (1, 1))
+        self.assertEqual(data['resultados'][1]['error'], 'Falta el campo id')
+        self.assertEqual(
+            list(Tema.objects.filter(id__in=[origen.id, destino.id]).order_by('nombre').values_list('nombre', 'total_tareas')),
+            [('Tema destino', 2), ('Tema lote', 0)],
+        )
+
+    def test_eliminar(self):
+        _, _, tema, tarea = crear_curso_completo('lote')
+        respuesta = self.enviar('delete', 'eliminar_lote', [str(tarea.id)])
+        self.assertEqual(respuesta.json()['correctos'], 1)
+        tema.refresh_from_db()
+        self.assertEqual(tema.total_tareas, 0)
@@ -3,6 +3,10 @@ from .views import *
 
 urlpatterns = [
     path('', listar_tareas, name='listar_tareas'),
+    path('proximas/', proximas_tareas, name='proximas_tareas'),
+    path('registrar_lote/', registrar_tareas_lote, name='registrar_tareas_lote'),
+    path('actualizar_lote/', actualizar_tareas_lote, name='actualizar_tareas_lote'),
+    path('eliminar_lote/', eliminar_tareas_lote, name='eliminar_tareas_lote'),
     path('registrar/', registrar_tarea, name='registrar_tarea'),
     path('actualizar/<str:id>/', actualizar_tarea, name='actualizar_tarea'),
     path('eliminar/<str:id>/', eliminar_tarea, name='eliminar_tarea'),
@@ -1,32 +1,96 @@
+import datetime
 import json
 from django.shortcuts import render
-from django.http import JsonResponse
 from .models import Tarea
+from temas.models import Tema
 from .forms import TareaForm
 from django.shortcuts import redirect
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from errorPages.campos import Campo, ParametroInvalido, campos_solicitados, proyectar, serializar
+from errorPages.cache_listados import cachear_listado
+from errorPages.listados import responder_listado
+from errorPages.lotes import Lote
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import condicional
+from django.utils import timezone
+from .consultas import consulta_proximas_tareas, consulta_tareas
+
+#Clave de orden estable para la paginacion por cursor
+ORDEN_TAREAS = ('fecha_entrega', 'id')
+
+#Campos que aceptan las vistas en lote
+LOTE_TAREAS = Lote(
+    Tarea, 'tareas',
+    campos={'titulo': 'titulo', 'descripcion': 'descripcion', 'fecha_entrega': 'fecha_entrega'},
+    padres={'tema': ('tema_id', Tema)},
+)
+
+#Campos de cada tarea (listado y detalle): columnas que necesita y como se obtiene
+CAMPOS_TAREA = {
+    'id': Campo('id', lambda tarea: tarea.id),
+    'titulo': Campo('titulo', lambda tarea: tarea.titulo),
+    'descripcion': Campo('descripcion', lambda tarea: tarea.descripcion),
+    'fecha_entrega': Campo('fecha_entrega', lambda tarea: tarea.fecha_entrega),
+    'tema': Campo('tema__nombre', lambda tarea: tarea.tema.nombre),
+}
+
+#Las proximas entregas incluyen ademas el curso de cada tarea
+CAMPOS_PROXIMA_TAREA = {
+    **CAMPOS_TAREA,
+    'curso': Campo(('tema__unidad__curso__id', 'tema__unidad__curso__nombre'), lambda tarea: {
+        'id': tarea.tema.unidad.curso.id,
+        'nombre': tarea.tema.unidad.curso.nombre,
+    }),
+}
+
+#Ventana por defecto y maxima de las proximas entregas, en dias
+DIAS_PROXIMAS_TAREAS = 30
+MAXIMO_DIAS_PROXIMAS_TAREAS = 366
+
+#Crear un diccionario por tarea por que le JSONResponse necesita un diccionario
+def serializar_tarea(tarea):
+    return serializar(tarea, CAMPOS_TAREA)
 
 #Metodo que devuelve el JSON
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('tareas', 'temas')
+@cachear_listado('tareas', 'temas')
 def listar_tareas(request):
     #Obtener todas la instancias del objeto de la BD
-    tareas = Tarea.objects.all()
-    #Crear una variable en formato de diccionario por que le JSONResponse necesita un diccionario
-    data = [
-        {
-            'id': tarea.id,
-            'titulo': tarea.titulo,
-            'descripcion': tarea.descripcion,
-            'fecha_entrega': tarea.fecha_entrega,
-            'tema': tarea.tema.nombre,
-        } for tarea in tareas
-    ]
+    tareas = consulta_tareas()
     #Retornar el JSON
-    return JsonResponse(data, safe=False)
+    return responder_listado(request, tareas, ORDEN_TAREAS, CAMPOS_TAREA)
+
+def obtener_fecha(request, parametro, defecto):
+    valor = request.GET.get(parametro)
+    if not valor:
+        return defecto
+    try:
+        return datetime.date.fromisoformat(valor)
+    except ValueError:
+        raise ParametroInvalido(f'El parametro {parametro} debe tener el formato AAAA-MM-DD')
+
+#Tareas de los cursos del usuario actual con entrega entre desde y hasta, por fecha
+#Uso: /tareas/proximas/?desde=AAAA-MM-DD&hasta=AAAA-MM-DD (por defecto los proximos 30 dias)
+#Sin ETag: la ventana por defecto depende del dia actual
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def proximas_tareas(request):
+    try:
+        desde = obtener_fecha(request, 'desde', timezone.localdate())
+        hasta = obtener_fecha(request, 'hasta', desde + datetime.timedelta(days=DIAS_PROXIMAS_TAREAS))
+        if hasta < desde:
+            raise ParametroInvalido('hasta debe ser posterior a desde')
+        if (hasta - desde).days > MAXIMO_DIAS_PROXIMAS_TAREAS:
+            raise ParametroInvalido(f'La ventana no puede superar {MAXIMO_DIAS_PROXIMAS_TAREAS} dias')
+    except ParametroInvalido as e:
+        return RespuestaJson({'error': str(e)}, status=400)
+    tareas = consulta_proximas_tareas(request.user, desde, hasta)
+    return responder_listado(request, tareas, ORDEN_TAREAS, CAMPOS_PROXIMA_TAREA)
 
 #Funcion que registre sin recaragar la pagina osea sin hacer render
 @csrf_exempt
@@ -47,11 +111,11 @@ def registrar_tarea(request):
                 tema_id=data['tema']
             )#la funcion create directamente guarda el objeto en la BD
             #Retornar un JSON
-            return JsonResponse({'message': 'Tarea registrada correctamente', 'id':tarea.id}, status=201)
+            return RespuestaJson({'message': 'Tarea registrada correctamente', 'id':tarea.id}, status=201)
         except Exception as e:
             #Si hay un error retornar un JSON con el mensaje de error
-            return JsonResponse({'message': str(e)}, status=400)
-    return JsonResponse({'message': 'No se ha podido registrar la tarea'}, status=400)
+            return RespuestaJson({'message': str(e)}, status=400)
+    return RespuestaJson({'message': 'No se ha podido registrar la tarea'}, status=400)
 
 
 #Funcion que actualiza sin recargar la pagina
@@ -76,11 +140,11 @@ def actualizar_tarea(request, id):
             #4) Guardar los cambios
             tarea.save()
             #Retornar un JSON con el mensaje de exito
-            return JsonResponse({'message': 'Tarea actualizada correctamente'}, status=200)
+            return RespuestaJson({'message': 'Tarea actualizada correctamente'}, status=200)
         except Exception as e:
             #Retornar un JSON con un mensaje de error
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Metodo no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Metodo no permitido'}, status=405)
 
 
 #Funcion que elimina sin recargar la pagina
@@ -98,38 +162,54 @@ def eliminar_tarea(request, id):
             #2) Eliminar el objeto
             tarea.delete()
             #Retornar un JSON con el mensaje de exito
-            return JsonResponse({'message': 'Tarea eliminada correctamente'}, status=200)
+            return RespuestaJson({'message': 'Tarea eliminada correctamente'}, status=200)
         except Exception as e:
             #Retornar un JSON con un mensaje de error
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Metodo no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Metodo no permitido'}, status=405)
 
 
 #Funcion que obtiene un objeto sin recargar la pagina
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('tareas', 'temas')
 def obtener_tarea(request, id):
     if request.method == 'GET':
         #Intentar obtener el objeto
         #1) Obtener la entidad a obtener
         #Parametros: modelo y id o identificador del objeto
-        tarea = get_object_or_404(Tarea, id=id)
+        try:
+            claves = campos_solicitados(request, CAMPOS_TAREA)
+        except ParametroInvalido as e:
+            return RespuestaJson({'error': str(e)}, status=400)
+        tarea = get_object_or_404(proyectar(consulta_tareas(), CAMPOS_TAREA, claves), id=id)
 
         try:
             #2) Crear un diccionario con los datos del objeto
-            data = {
-                'id': tarea.id,
-                'titulo': tarea.titulo,
-                'descripcion': tarea.descripcion,
-                'fecha_entrega': tarea.fecha_entrega,
-                'tema': tarea.tema.nombre,
-            }
+            data = serializar(tarea, CAMPOS_TAREA, claves)
             #Retornar un JSON con los datos del objeto
-            return JsonResponse(data, status=200)
+            return RespuestaJson(data, status=200)
         except Exception as e:
             #Retornar un JSON con un mensaje de error
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Metodo no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Metodo no permitido'}, status=405)
 
 
-        
+#Registro, actualizacion y eliminacion de varias tareas en una sola peticion
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def registrar_tareas_lote(request):
+    return LOTE_TAREAS.registrar(request)
+
+@csrf_exempt
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def actualizar_tareas_lote(request):
+    return LOTE_TAREAS.actualizar(request)
+
+@csrf_exempt
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def eliminar_tareas_lote(request):
+    return LOTE_TAREAS.eliminar(request)
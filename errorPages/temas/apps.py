@@ -1,6 +1,11 @@
 from django.apps import AppConfig
 
+from errorPages.versiones import registrar_modelo
+
 
 class TemasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'temas'
+
+    def ready(self):
+        registrar_modelo(self.get_model('Tema'), 'temas')
@@ -0,0 +1,8 @@
+from .models import Tema
+
+#Columnas que leen las vistas de temas (listado y detalle)
+COLUMNAS_TEMA = ('id', 'nombre', 'descripcion', 'orden', 'total_tareas', 'unidad', 'unidad__id', 'unidad__nombre')
+
+#Queryset compartido por las vistas de lectura: trae la unidad en el mismo JOIN
+def consulta_temas():
+    return Tema.objects.select_related('unidad').only(*COLUMNAS_TEMA)
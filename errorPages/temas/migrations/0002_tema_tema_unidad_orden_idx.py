@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('temas', '0001_initial'),
+        ('unidades', '0002_unidad_unidad_curso_orden_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tema',
+            index=models.Index(fields=['unidad', 'orden'], name='tema_unidad_orden_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:34
+
+import errorPages.identificadores
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('temas', '0002_tema_tema_unidad_orden_idx'),
+    ]
+
+    #Solo cambia el default, que se calcula en Python: no hay cambio de
+    #esquema y las filas existentes conservan sus ids
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='tema',
+                    name='id',
+                    field=models.UUIDField(default=errorPages.identificadores.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
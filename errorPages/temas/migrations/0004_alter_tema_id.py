@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:37
+
+import errorPages.identificadores
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('temas', '0003_alter_tema_id'),
+    ]
+
+    #En SQLite y PostgreSQL la columna no cambia. En MySQL las columnas
+    #pasan de char(32) a binary(16) en inscripciones.0006_uuid_binario_mysql,
+    #que convierte todas las tablas a la vez por las claves foraneas entre apps
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='tema',
+                    name='id',
+                    field=errorPages.identificadores.UUIDBinarioField(default=errorPages.identificadores.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_contadores(apps, schema_editor):
+    Tarea = apps.get_model('tareas', 'Tarea')
+    filas = (
+        Tarea.objects.filter(tema_id=OuterRef('pk'))
+        .order_by().values('tema_id').annotate(total=Count('pk')).values('total')
+    )
+    apps.get_model('temas', 'Tema').objects.update(total_tareas=Coalesce(Subquery(filas), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0004_alter_tarea_id'),
+        ('temas', '0004_alter_tema_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tema',
+            name='total_tareas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,19 @@
-import uuid
 from django.db import models
+from errorPages.identificadores import UUIDBinarioField, uuid7
 from unidades.models import Unidad
 
 class Tema(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = UUIDBinarioField(primary_key=True, default=uuid7, editable=False)
     nombre = models.CharField(max_length=100)
     unidad = models.ForeignKey(Unidad, on_delete=models.CASCADE, related_name='temas')
     descripcion = models.TextField(null=True, blank=True)
     orden = models.IntegerField()
+    #Contador desnormalizado (ver errorPages.contadores)
+    total_tareas = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        #Los temas siempre se leen ordenados dentro de su unidad
+        indexes = [models.Index(fields=['unidad', 'orden'], name='tema_unidad_orden_idx')]
 
     def __str__(self):
         return self.nombre
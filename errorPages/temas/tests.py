@@ -1,3 +1,63 @@
+import json
+import uuid
+
 from django.test import TestCase
 
-# Create your tests here.
+from errorPages.pruebas import ConsultasConstantesMixin, crear_curso_completo
+from .models import Tema
+
+
+class ConsultasTemasTests(ConsultasConstantesMixin, TestCase):
+    def test_listar_temas_sin_consultas_por_fila(self):
+        self.assertConsultasConstantes('/temas/')
+        self.assertConsultasConstantes('/temas/', {'todos': 'true'})
+
+    def test_obtener_tema_una_consulta(self):
+        _, _, tema, _ = crear_curso_completo('detalle')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/temas/obtener/{tema.id}/')
+        self.assertEqual(respuesta.json()['unidad'], str(tema.unidad_id))
+
+
+class LoteTemasTests(ConsultasConstantesMixin, TestCase):
+    def enviar(self, metodo, ruta, elementos):
+        return getattr(self.client, metodo)(f'/temas/{ruta}/', json.dumps(elementos), content_type='application/json')
+
+    def test_registrar_con_errores_por_elemento(self):
+        _, unidad, _, _ = crear_curso_completo('lote')
+        respuesta = self.enviar('post', 'registrar_lote', [
+            {'nombre': 'Nuevo', 'descripcion': '', 'orden': 2, 'unidad': str(unidad.id)},
+            {'nombre': 'Sin unidad', 'descripcion': '', 'orden': 3, 'unidad': 'no-es-uuid'},
+            'no es un objeto',
+        ])
+        data = respuesta.json()
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual((data['correctos'], data['errores']), (1, 2))
+        self.assertTrue(Tema.objects.filter(id=data['resultados'][0]['id'], unidad=unidad).exists())
+
+    def test_actualizar_sin_id_solo_falla_ese_elemento(self):
+        _, _, tema, _ = crear_curso_completo('lote')
+        respuesta = self.enviar('put', 'actualizar_lote', [
+            {'nombre': 'Sin id'},
+            {'id': 'no-es-uuid', 'nombre': 'Id invalido'},
+            {'id': str(tema.id), 'nombre': 'Renombrado'},
+        ])
+        data = respuesta.json()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(data['resultados'][0], {'indice': 0, 'error': 'Falta el campo id'})
+        self.assertIn('invalido', data['resultados'][1]['error'])
+        self.assertEqual(data['resultados'][2], {'indice': 2, 'id': str(tema.id)})
+        tema.refresh_from_db()
+        self.assertEqual(tema.nombre, 'Renombrado')
+
+    def test_todos_con_error_es_400(self):
+        respuesta = self.enviar('put', 'actualizar_lote', [{'nombre': 'Sin id'}])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['errores'], 1)
+
+    def test_eliminar_id_invalido_por_elemento(self):
+        _, _, tema, _ = crear_curso_completo('lote')
+        respuesta = self.enviar('delete', 'eliminar_lote', [str(tema.id), 'no-es-uuid', str(uuid.uuid4())])
+        data = respuesta.json()
+        self.assertEqual((data['correctos'], data['errores']), (1, 2))
+        self.assertFalse(Tema.objects.filter(id=tema.id).exists())
@@ -3,6 +3,9 @@ from .views import *
 
 urlpatterns = [
     path('', listar_temas, name='listar_temas'),
+    path('registrar_lote/', registrar_temas_lote, name='registrar_temas_lote'),
+    path('actualizar_lote/', actualizar_temas_lote, name='actualizar_temas_lote'),
+    path('eliminar_lote/', eliminar_temas_lote, name='eliminar_temas_lote'),
     path('registrar/', registrar_tema, name='registrar_tema'),
     path('actualizar/<str:id>/', actualizar_tema, name='actualizar_tema'),
     path('eliminar/<str:id>/', eliminar_tema, name='eliminar_tema'),
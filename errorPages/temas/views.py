@@ -1,34 +1,62 @@
 import json
 from django.shortcuts import render
-from django.http import JsonResponse
 from .models import Tema
+from unidades.models import Unidad
 from .forms import TemaForm
 from django.shortcuts import redirect
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from errorPages.campos import Campo, ParametroInvalido, campos_solicitados, proyectar, serializar
+from errorPages.cache_listados import cachear_listado
+from errorPages.listados import responder_listado
+from errorPages.lotes import Lote
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import condicional
+from .consultas import consulta_temas
+
+#Clave de orden estable para la paginacion por cursor
+ORDEN_TEMAS = ('unidad_id', 'orden', 'id')
+
+#Campos que aceptan las vistas en lote
+LOTE_TEMAS = Lote(
+    Tema, 'temas',
+    campos={'nombre': 'nombre', 'descripcion': 'descripcion', 'orden': 'orden'},
+    padres={'unidad': ('unidad_id', Unidad)},
+)
+
+#Campos de cada tema en el listado: columnas que necesita y como se obtiene
+CAMPOS_TEMA = {
+    'id': Campo('id', lambda tema: tema.id),
+    'nombre': Campo('nombre', lambda tema: tema.nombre),
+    'unidad': Campo('unidad__nombre', lambda tema: tema.unidad.nombre),
+    'descripcion': Campo('descripcion', lambda tema: tema.descripcion),
+    'orden': Campo('orden', lambda tema: tema.orden),
+    'total_tareas': Campo('total_tareas', lambda tema: tema.total_tareas),
+}
+
+#En el detalle la unidad se devuelve como id
+CAMPOS_DETALLE_TEMA = {
+    **CAMPOS_TEMA,
+    'unidad': Campo('unidad_id', lambda tema: tema.unidad_id),
+}
+
+#Crear un diccionario por tema por que le JSONResponse necesita un diccionario
+def serializar_tema(tema):
+    return serializar(tema, CAMPOS_TEMA)
 
 
 #Metodo que devuelve el JSON
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('temas', 'unidades')
+@cachear_listado('temas', 'unidades')
 def listar_temas(request):
     #Obtener todas la instancias del objeto de la BD
-    temas = Tema.objects.all()
-    #Crear una variable en formato de diccionario por que le JSONResponse necesita un diccionario
-
-    data = [
-        {
-            'id': tema.id,
-            'nombre': tema.nombre,
-            'unidad': tema.unidad.nombre,
-            'descripcion': tema.descripcion,
-            'orden': tema.orden,
-        } for tema in temas
-    ]
+    temas = consulta_temas()
     #Retornar la respuesta en formato JSON
-    return JsonResponse(data, safe=False)
+    return responder_listado(request, temas, ORDEN_TEMAS, CAMPOS_TEMA)
 
 
 
@@ -49,12 +77,12 @@ def registrar_tema(request):
                 orden=data['orden'],
             )#la funcion create directamente guarda el objeto en la BD
             #Retornar un JSON
-            return JsonResponse({'mensaje': 'Tema registrado correctamente', 'id':tema.id}, status=201)
+            return RespuestaJson({'mensaje': 'Tema registrado correctamente', 'id':tema.id}, status=201)
         except:
             #Si hay un error retornar un JSON
-            return JsonResponse({'mensaje': 'Error al registrar el tema'}, status=400)
+            return RespuestaJson({'mensaje': 'Error al registrar el tema'}, status=400)
         #Si el metodo no es POST retornar un JSON
-    return JsonResponse({'mensaje': 'Método no permitido'}, status=405)
+    return RespuestaJson({'mensaje': 'Método no permitido'}, status=405)
 
 
 #Funcion que actualiza sin recargar la pagina
@@ -71,10 +99,10 @@ def actualizar_tema(request, id):
             tema.descripcion = data['descripcion']
             tema.orden = data['orden']
             tema.save()
-            return JsonResponse({'mensaje': 'Tema actualizado correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Tema actualizado correctamente'}, status=200)
         except Exception as e:
-            return JsonResponse({'mensaje': 'Error al actualizar el tema'}, status=400)
-    return JsonResponse({'mensaje': 'Método no permitido'}, status=405)
+            return RespuestaJson({'mensaje': 'Error al actualizar el tema'}, status=400)
+    return RespuestaJson({'mensaje': 'Método no permitido'}, status=405)
 
 
 #Funcion que elimina sin recargar la pagina
@@ -86,37 +114,53 @@ def eliminar_tema(request, id):
         tema = get_object_or_404(Tema, id=id)
         try:
             tema.delete()
-            return JsonResponse({'mensaje': 'Tema eliminado correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Tema eliminado correctamente'}, status=200)
         except Exception as e:
-            return JsonResponse({'mensaje': 'Error al eliminar el tema'}, status=400)
-    return JsonResponse({'mensaje': 'Método no permitido'}, status=405)
+            return RespuestaJson({'mensaje': 'Error al eliminar el tema'}, status=400)
+    return RespuestaJson({'mensaje': 'Método no permitido'}, status=405)
          
 
 #Funcion que obtiene un objeto por su id
 @csrf_exempt
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('temas', 'unidades')
 def obtener_tema(request, id):
    if request.method == 'GET':
         #Intentar obtener el objeto
         #1) Obtener la entidad a obtener
         #Parametros: modelo y id o identificador del objeto
-        tema = get_object_or_404(Tema, id=id)
+        try:
+            claves = campos_solicitados(request, CAMPOS_DETALLE_TEMA)
+        except ParametroInvalido as e:
+            return RespuestaJson({'mensaje': str(e)}, status=400)
+        tema = get_object_or_404(proyectar(consulta_temas(), CAMPOS_DETALLE_TEMA, claves), id=id)
         try:
             #Crear un diccionario con los datos del objeto
-            data = {
-                'id': tema.id,
-                'nombre': tema.nombre,
-                'unidad': tema.unidad.id,
-                'descripcion': tema.descripcion,
-                'orden': tema.orden,
-            }
+            data = serializar(tema, CAMPOS_DETALLE_TEMA, claves)
             #Retornar un JSON
-            return JsonResponse(data, status=200)
+            return RespuestaJson(data, status=200)
         except Exception as e:
             #Si hay un error retornar un JSON
-            return JsonResponse({'mensaje': 'Error al obtener el tema'}, status=400)
-   return JsonResponse({'mensaje': 'Método no permitido'}, status=405)
-   
+            return RespuestaJson({'mensaje': 'Error al obtener el tema'}, status=400)
+   return RespuestaJson({'mensaje': 'Método no permitido'}, status=405)
+
 
-            
\ No newline at end of file
+#Registro, actualizacion y eliminacion de varios temas en una sola peticion
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def registrar_temas_lote(request):
+    return LOTE_TEMAS.registrar(request)
+
+@csrf_exempt
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def actualizar_temas_lote(request):
+    return LOTE_TEMAS.actualizar(request)
+
+@csrf_exempt
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def eliminar_temas_lote(request):
+    return LOTE_TEMAS.eliminar(request)
@@ -1,6 +1,16 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+
+from errorPages.contadores import registrar_contador
+from errorPages.versiones import registrar_modelo
 
 
 class UnidadesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'unidades'
+
+    def ready(self):
+        registrar_modelo(self.get_model('Unidad'), 'unidades')
+        registrar_contador(
+            self.get_model('Unidad'), 'curso_id',
+            apps.get_model('cursos', 'Curso'), 'total_unidades', 'cursos',
+        )
@@ -0,0 +1,8 @@
+from .models import Unidad
+
+#Columnas que leen las vistas de unidades (listado y detalle)
+COLUMNAS_UNIDAD = ('id', 'nombre', 'orden', 'curso', 'curso__id', 'curso__nombre')
+
+#Queryset compartido por las vistas de lectura: trae el curso en el mismo JOIN
+def consulta_unidades():
+    return Unidad.objects.select_related('curso').only(*COLUMNAS_UNIDAD)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0003_curso_curso_estado_inicio_idx'),
+        ('unidades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='unidad',
+            index=models.Index(fields=['curso', 'orden'], name='unidad_curso_orden_idx'),
+        ),
+    ]
@@ -1,12 +1,17 @@
-import uuid
 from django.db import models
+from errorPages.contadores import ContadoresMixin
+from errorPages.identificadores import UUIDBinarioField, uuid7
 from cursos.models import Curso
 
-class Unidad(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+class Unidad(ContadoresMixin, models.Model):
+    id = UUIDBinarioField(primary_key=True, default=uuid7, editable=False)
     nombre = models.CharField(max_length=100)
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='unidades')
     orden = models.IntegerField()
 
+    class Meta:
+        #Las unidades siempre se leen ordenadas dentro de su curso
+        indexes = [models.Index(fields=['curso', 'orden'], name='unidad_curso_orden_idx')]
+
     def __str__(self):
         return self.nombre
@@ -1,3 +1,62 @@
+import json
+import uuid
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from errorPages.pruebas import ConsultasConstantesMixin, crear_curso_completo
+from .models import Unidad
+
+
+class ConsultasUnidadesTests(ConsultasConstantesMixin, TestCase):
+    def test_listar_unidades_sin_consultas_por_fila(self):
+        self.assertConsultasConstantes('/unidades/')
+        self.assertConsultasConstantes('/unidades/', {'todos': 'true'})
+
+    def test_obtener_unidad_una_consulta(self):
+        _, unidad, _, _ = crear_curso_completo('detalle')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/unidades/obtener/{unidad.id}/')
+        self.assertEqual(respuesta.json()['curso'], str(unidad.curso_id))
+
+
+class LoteUnidadesTests(ConsultasConstantesMixin, TestCase):
+    def registrar(self, elementos):
+        return self.client.post('/unidades/registrar_lote/', json.dumps(elementos), content_type='application/json')
+
+    def test_registrar_con_errores_por_elemento(self):
+        curso, _, _, _ = crear_curso_completo('lote')
+        respuesta = self.registrar([
+            {'nombre': 'Nueva', 'curso': str(curso.id), 'orden': 2},
+            {'nombre': 'Sin curso', 'curso': str(uuid.uuid4()), 'orden': 3},
+            {'nombre': 'Sin orden', 'curso': str(curso.id)},
+        ])
+        data = respuesta.json()
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual((data['correctos'], data['errores']), (1, 2))
+        self.assertTrue(Unidad.objects.filter(id=data['resultados'][0]['id'], orden=2).exists())
+        self.assertIn('error', data['resultados'][1])
+
+    def test_consultas_no_dependen_del_tamano(self):
+        curso, _, _, _ = crear_curso_completo('lote')
+
+        def contar(cantidad):
+            elementos = [{'nombre': f'U{i}', 'curso': str(curso.id), 'orden': i} for i in range(cantidad)]
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.registrar(elementos).status_code, 201)
+            return len(consultas)
+
+        self.assertEqual(contar(2), contar(40))
 
-# Create your tests here.
+    def test_actualizar_y_eliminar(self):
+        _, unidad, _, _ = crear_curso_completo('lote')
+        respuesta = self.client.put('/unidades/actualizar_lote/', json.dumps([{'id': str(unidad.id), 'orden': 9}]),
+                                    content_type='application/json')
+        self.assertEqual(respuesta.json()['correctos'], 1)
+        unidad.refresh_from_db()
+        self.assertEqual(unidad.orden, 9)
+        respuesta = self.client.delete('/unidades/eliminar_lote/', json.dumps([str(unidad.id), str(uuid.uuid4())]),
+                                       content_type='application/json')
+        self.assertEqual((respuesta.json()['correctos'], respuesta.json()['errores']), (1, 1))
+        self.assertFalse(Unidad.objects.filter(id=unidad.id).exists())
@@ -3,6 +3,9 @@ from .views import *
 
 urlpatterns = [
     path('', listar_unidades, name='listar_unidades'),
+    path('registrar_lote/', registrar_unidades_lote, name='registrar_unidades_lote'),
+    path('actualizar_lote/', actualizar_unidades_lote, name='actualizar_unidades_lote'),
+    path('eliminar_lote/', eliminar_unidades_lote, name='eliminar_unidades_lote'),
     path('registrar/', registrar_unidad, name='registrar_unidad'),
     path('actualizar/<str:id>/', actualizar_unidad, name='actualizar_unidad'),
     path('eliminar/<str:id>/', eliminar_unidad, name='eliminar_unidad'),
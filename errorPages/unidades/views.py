@@ -1,6 +1,5 @@
 import json
 from django.shortcuts import render
-from django.http import JsonResponse
 from .models import Unidad
 from .forms import UnidadForm
 from django.shortcuts import redirect
@@ -9,27 +8,50 @@ from django.views.decorators.csrf import csrf_exempt
 from cursos.models import Curso  # Agrega esta importación
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from errorPages.campos import Campo, ParametroInvalido, campos_solicitados, proyectar, serializar
+from errorPages.cache_listados import cachear_listado
+from errorPages.listados import responder_listado
+from errorPages.lotes import Lote
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import condicional
+from .consultas import consulta_unidades
+
+#Clave de orden estable para la paginacion por cursor
+ORDEN_UNIDADES = ('curso_id', 'orden', 'id')
+
+#Campos que aceptan las vistas en lote
+LOTE_UNIDADES = Lote(Unidad, 'unidades', campos={'nombre': 'nombre', 'orden': 'orden'}, padres={'curso': ('curso_id', Curso)})
+
+#Campos de cada unidad en el listado: columnas que necesita y como se obtiene
+CAMPOS_UNIDAD = {
+    'id': Campo('id', lambda unidad: unidad.id),
+    'nombre': Campo('nombre', lambda unidad: unidad.nombre),
+    'curso': Campo(('curso__id', 'curso__nombre'), lambda unidad: {
+        'id': unidad.curso.id,
+        'nombre': unidad.curso.nombre
+    }),
+    'orden': Campo('orden', lambda unidad: unidad.orden),
+}
+
+#En el detalle el curso se devuelve solo como id
+CAMPOS_DETALLE_UNIDAD = {
+    **CAMPOS_UNIDAD,
+    'curso': Campo('curso_id', lambda unidad: unidad.curso_id),
+}
+
+#Crear un diccionario por unidad por que le JSONResponse necesita un diccionario
+def serializar_unidad(unidad):
+    return serializar(unidad, CAMPOS_UNIDAD)
 
 #Metodo que devuelve el JSON
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('unidades', 'cursos')
+@cachear_listado('unidades', 'cursos')
 def listar_unidades(request):
     #Obtener todas la instancias del objeto de la BD
-    unidades = Unidad.objects.all()
-    #Crear una variable en formato de diccionario por que le JSONResponse necesita un diccionario
-    data = [
-        {
-            'id': unidad.id,
-            'nombre': unidad.nombre,
-            'curso': {
-                'id': unidad.curso.id,
-                'nombre': unidad.curso.nombre
-            },
-            'orden': unidad.orden
-        }
-        for unidad in unidades
-    ]
-    return JsonResponse(data, safe=False)
+    unidades = consulta_unidades()
+    return responder_listado(request, unidades, ORDEN_UNIDADES, CAMPOS_UNIDAD)
 
 #Funcion que registre sin recargar la pagina osea sin hacer render
 @csrf_exempt
@@ -50,12 +72,12 @@ def registrar_unidad(request):
                 curso=curso_instance,  # Usar la instancia de Curso aquí
                 orden=data['orden']
             )
-            return JsonResponse({'mensaje': 'Unidad creada correctamente', 'id': unidad.id}, status=201)
+            return RespuestaJson({'mensaje': 'Unidad creada correctamente', 'id': unidad.id}, status=201)
         except Curso.DoesNotExist:
-            return JsonResponse({'error': 'Curso no encontrado'}, status=404)
+            return RespuestaJson({'error': 'Curso no encontrado'}, status=404)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 #Funcion que actualiza sin recargar la pagina osea sin hacer render
 @csrf_exempt  # Add this decorator
@@ -79,12 +101,12 @@ def actualizar_unidad(request, id):
             unidad.orden = data['orden']
             unidad.save()  # Se agregó para asegurar que los cambios se guarden en la BD
 
-            return JsonResponse({'mensaje': 'Unidad actualizada correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Unidad actualizada correctamente'}, status=200)
         except Curso.DoesNotExist:
-            return JsonResponse({'error': 'Curso no encontrado'}, status=404)
+            return RespuestaJson({'error': 'Curso no encontrado'}, status=404)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 #Funcion que elimina sin recargar la pagina osea sin hacer render
 @csrf_exempt  # Add this decorator
@@ -101,32 +123,48 @@ def eliminar_unidad(request, id):
             #2) Eliminar la entidad
             unidad.delete()
             #3) Retornar un JSON
-            return JsonResponse({'mensaje': 'Unidad eliminada correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Unidad eliminada correctamente'}, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 #Funcion que obtiene un objeto sin recargar la pagina osea sin hacer render
 @csrf_exempt  # Add this decorator
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('unidades', 'cursos')
 def obtener_unidad(request, id):
     #checar que estemos manejando un metodo GET
     if request.method == 'GET':
         try:
+            claves = campos_solicitados(request, CAMPOS_DETALLE_UNIDAD)
             #1) Obtener la entidad a eliminar
             #Parametros: modelo y id o identificador del objeto
-            unidad = get_object_or_404(Unidad, id=id)
+            unidad = get_object_or_404(proyectar(consulta_unidades(), CAMPOS_DETALLE_UNIDAD, claves), id=id)
             #2) Crear un diccionario con los datos de la entidad
-            data = {
-                'id': unidad.id,
-                'nombre': unidad.nombre,
-                'curso': unidad.curso.id,  # Use curso.id instead of curso object
-                'orden': unidad.orden
-            }
+            data = serializar(unidad, CAMPOS_DETALLE_UNIDAD, claves)
             #3) Retornar un JSON
-            return JsonResponse(data, safe=False)
+            return RespuestaJson(data)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
+
+
+#Registro, actualizacion y eliminacion de varias unidades en una sola peticion
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def registrar_unidades_lote(request):
+    return LOTE_UNIDADES.registrar(request)
 
+@csrf_exempt
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def actualizar_unidades_lote(request):
+    return LOTE_UNIDADES.actualizar(request)
+
+@csrf_exempt
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def eliminar_unidades_lote(request):
+    return LOTE_UNIDADES.eliminar(request)
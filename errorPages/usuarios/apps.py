@@ -1,6 +1,7 @@
 from django.apps import AppConfig
 from django.db.models.signals import post_migrate
 from django.contrib.auth import get_user_model
+from errorPages.versiones import registrar_modelo
 
 def crear_usuarios_default(sender, **kwargs):
     Usuario = get_user_model()
@@ -41,3 +42,7 @@ class UsuariosConfig(AppConfig):
 
     def ready(self):
         post_migrate.connect(crear_usuarios_default, sender=self)
+        registrar_modelo(self.get_model('Usuario'), 'usuarios')
+        # request.user se arma desde el token; ver usuarios.autenticacion
+        from .autenticacion import registrar_invalidacion
+        registrar_invalidacion()
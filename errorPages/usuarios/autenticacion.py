@@ -0,0 +1,119 @@
+"""
+Autenticacion JWT sin leer la fila del usuario en cada peticion.
+
+JWTAuthentication hace un SELECT de Usuario por cada peticion autenticada.
+Aqui request.user se arma con el user_id del token mas el estado que puede
+cambiar despues de emitido el token: username, email, is_active, is_staff,
+is_superuser y rol. Los claims username y email del token no se usan: con
+actualizar_usuario quedarian viejos hasta que el token venciera. Ese estado
+se guarda en una cache LRU con TTL por proceso:
+
+    - acierto: ninguna consulta a la base de datos, solo la lectura de la
+      version del usuario en la cache compartida (errorPages.versiones)
+    - fallo (primera peticion, TTL vencido o version cambiada): un SELECT de
+      esas seis columnas
+
+Cada vez que se guarda o elimina un Usuario (desactivar_usuario,
+actualizar_usuario, eliminar_usuario, el admin...) se borra su entrada local
+y se cambia su version en la cache compartida, asi que los demas procesos
+tambien la descartan en la siguiente peticion: un usuario desactivado queda
+fuera de inmediato. El TTL acota lo que duraria un cambio hecho sin pasar
+por save() (por ejemplo un update() en bloque).
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from errorPages.versiones import cambiar_version, obtener_versiones
+from .models import Usuario
+
+#Usuarios distintos que se recuerdan por proceso y segundos que dura cada uno
+MAXIMO_USUARIOS = 10000
+TTL_SEGUNDOS = 300
+
+CAMPOS_ESTADO = ('username', 'email', 'is_active', 'is_staff', 'is_superuser', 'rol')
+CAMPOS_MODELO = [campo.attname for campo in Usuario._meta.concrete_fields]
+
+
+def recurso_usuario(id):
+    return f'usuario:{id}'
+
+
+class EstadoUsuarios:
+    """Cache LRU con TTL: id -> (version, vence, estado)."""
+
+    def __init__(self, maximo=MAXIMO_USUARIOS, ttl=TTL_SEGUNDOS):
+        self.maximo = maximo
+        self.ttl = ttl
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+
+    def obtener(self, id):
+        """Estado del usuario (dict) o None si no existe."""
+        version, = obtener_versiones([recurso_usuario(id)])
+        ahora = time.monotonic()
+        with self.lock:
+            entrada = self.entradas.get(id)
+            if entrada is not None and entrada[0] == version and entrada[1] > ahora:
+                self.entradas.move_to_end(id)
+                return entrada[2]
+        estado = Usuario.objects.filter(pk=id).values(*CAMPOS_ESTADO).first()
+        if estado is not None:
+            with self.lock:
+                self.entradas[id] = (version, ahora + self.ttl, estado)
+                self.entradas.move_to_end(id)
+                while len(self.entradas) > self.maximo:
+                    self.entradas.popitem(last=False)
+        return estado
+
+    def invalidar(self, id):
+        with self.lock:
+            self.entradas.pop(id, None)
+        #Los demas procesos ven la version nueva en la cache compartida
+        cambiar_version(recurso_usuario(id))
+
+    def limpiar(self):
+        with self.lock:
+            self.entradas.clear()
+
+
+ESTADOS = EstadoUsuarios()
+
+
+def al_cambiar_usuario(sender, instance, **kwargs):
+    ESTADOS.invalidar(instance.pk)
+
+
+def registrar_invalidacion():
+    """Se llama en UsuariosConfig.ready(), tambien en procesos que no autentican (comandos, shell)."""
+    post_save.connect(al_cambiar_usuario, sender=Usuario, dispatch_uid='estado-usuario:save')
+    post_delete.connect(al_cambiar_usuario, sender=Usuario, dispatch_uid='estado-usuario:delete')
+
+
+class JWTAutenticacionPorClaims(JWTAuthentication):
+    """Reemplaza a JWTAuthentication en REST_FRAMEWORK."""
+
+    def get_user(self, validated_token):
+        try:
+            id = uuid.UUID(str(validated_token[api_settings.USER_ID_CLAIM]))
+        except (KeyError, ValueError):
+            raise InvalidToken('El token no identifica a ningun usuario')
+
+        estado = ESTADOS.obtener(id)
+        if estado is None:
+            raise AuthenticationFailed('Usuario no encontrado', code='user_not_found')
+        if not estado['is_active']:
+            raise AuthenticationFailed('El usuario esta desactivado', code='user_inactive')
+
+        #from_db marca el resto de los campos como diferidos: si una vista los
+        #usa se leen de la base, y save() solo escribe los campos cargados.
+        #Los valores van en el orden de los campos del modelo
+        conocidos = {'id': id, **estado}
+        campos = [campo for campo in CAMPOS_MODELO if campo in conocidos]
+        return Usuario.from_db('default', campos, [conocidos[campo] for campo in campos])
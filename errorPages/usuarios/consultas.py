@@ -0,0 +1,10 @@
+from .models import Usuario
+
+# Columnas que leen las vistas de usuarios (listado y detalle)
+COLUMNAS_USUARIO = (
+    'id', 'username', 'password', 'nombre_completo', 'email', 'rol', 'token', 'fecha_creacion',
+)
+
+# Queryset compartido por las vistas de lectura
+def consulta_usuarios():
+    return Usuario.objects.only(*COLUMNAS_USUARIO)
@@ -0,0 +1,283 @@
+"""
+Importacion masiva de usuarios desde CSV o NDJSON.
+
+La usan el comando `python manage.py importar_usuarios` y la vista
+importar_usuarios (solo administradores). El archivo se lee fila por fila y
+se procesa en lotes:
+
+    1. se valida cada fila con full_clean() (sin consultas)
+    2. se comprueba la unicidad de username/email del lote con una consulta
+    3. se calculan los hashes de las contrasenas en un pool de procesos
+    4. se insertan las filas validas con bulk_create
+
+Las filas con error se informan (numero de fila y motivo) sin detener la
+importacion. Columnas: username, email, password, nombre_completo, rol.
+"""
+import codecs
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from errorPages.lotes import describir_error
+from errorPages.senales import filas_creadas_en_lote
+from errorPages.versiones import cambiar_version
+from .models import Usuario
+
+COLUMNAS = ('username', 'email', 'password', 'nombre_completo', 'rol')
+TAMANO_LOTE = 500
+FORMATOS = ('csv', 'ndjson')
+
+
+class ErrorFila(Exception):
+    """Error de una fila del archivo; no detiene la importacion."""
+
+
+def detectar_formato(nombre):
+    return 'ndjson' if nombre.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+class Lineas:
+    """
+    Lineas de `archivo` (binario) decodificadas de a una. Una linea que no es
+    UTF-8 lanza UnicodeDecodeError y la iteracion sigue con la siguiente.
+    """
+
+    def __init__(self, archivo):
+        self.archivo = iter(archivo)
+        self.primera = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        linea = next(self.archivo)
+        if self.primera:
+            self.primera = False
+            linea = linea.removeprefix(codecs.BOM_UTF8)
+        return linea.decode('utf-8', errors='strict')
+
+
+def leer_filas(archivo, formato):
+    """
+    Genera (numero de fila, dict o ErrorFila) leyendo `archivo` (binario) de
+    forma incremental. Las filas se numeran desde 1 sin contar la cabecera;
+    una fila que no se puede decodificar o leer es un ErrorFila mas.
+    """
+    lineas = Lineas(archivo)
+    if formato == 'csv':
+        yield from leer_csv(lineas)
+        return
+    numero = 0
+    while True:
+        try:
+            linea = next(lineas)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            numero += 1
+            yield numero, ErrorFila(f'La fila no esta en UTF-8: {e}')
+            continue
+        if not linea.strip():
+            continue
+        numero += 1
+        try:
+            fila = json.loads(linea)
+        except ValueError as e:
+            yield numero, ErrorFila(f'JSON invalido: {e}')
+            continue
+        if not isinstance(fila, dict):
+            yield numero, ErrorFila('Cada linea debe ser un objeto JSON')
+        else:
+            yield numero, fila
+
+
+def leer_csv(lineas):
+    #Como csv.DictReader, pero un error de una fila no corta la lectura: el
+    #lector de csv vuelve a empezar en la linea siguiente
+    lector = csv.reader(lineas)
+    try:
+        cabecera = next(lector)
+    except StopIteration:
+        return
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield 0, ErrorFila(f'No se pudo leer la cabecera: {e}')
+        return
+    numero = 0
+    while True:
+        try:
+            valores = next(lector)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            numero += 1
+            yield numero, ErrorFila(f'La fila no esta en UTF-8: {e}')
+            continue
+        except csv.Error as e:
+            numero += 1
+            yield numero, ErrorFila(f'CSV invalido: {e}')
+            continue
+        if not valores:
+            continue
+        numero += 1
+        if len(valores) > len(cabecera):
+            yield numero, ErrorFila('La fila tiene mas columnas que la cabecera')
+        else:
+            yield numero, dict(zip(cabecera, valores))
+
+
+def construir_usuario(fila):
+    faltantes = [columna for columna in COLUMNAS if not str(fila.get(columna) or '').strip()]
+    if faltantes:
+        raise ErrorFila(f'Faltan columnas: {", ".join(faltantes)}')
+    usuario = Usuario(
+        username=str(fila['username']).strip(),
+        email=Usuario.objects.normalize_email(str(fila['email']).strip()),
+        nombre_completo=str(fila['nombre_completo']).strip(),
+        rol=str(fila['rol']).strip(),
+    )
+    #La unicidad se comprueba despues para todo el lote con una sola consulta
+    usuario.full_clean(exclude=['password'], validate_unique=False, validate_constraints=False)
+    return usuario
+
+
+def iniciar_proceso():
+    #Con 'spawn' (macOS/Windows) el proceso hijo no hereda la configuracion
+    django.setup()
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.procesadas = 0
+        self.creados = 0
+        self.errores = []
+
+    def agregar_error(self, numero, error):
+        self.errores.append({'fila': numero, 'error': describir_error(error)})
+
+    def resumen(self):
+        return {
+            'procesadas': self.procesadas,
+            'creados': self.creados,
+            'errores': len(self.errores),
+        }
+
+
+class Importador:
+    """
+    procesos -- tamano del pool para los hashes; con 1 se calculan en el
+                proceso actual
+    progreso -- funcion que se llama con el ResultadoImportacion tras cada lote
+    """
+
+    def __init__(self, tamano_lote=TAMANO_LOTE, procesos=None, progreso=None):
+        self.tamano_lote = tamano_lote
+        self.procesos = procesos or os.cpu_count() or 1
+        self.progreso = progreso
+        self.resultado = ResultadoImportacion()
+        #Claves ya vistas en el archivo, para detectar duplicados entre lotes
+        self.usernames = set()
+        self.emails = set()
+
+    def importar(self, filas):
+        if self.procesos == 1:
+            self.procesar(filas, map)
+        else:
+            with ProcessPoolExecutor(self.procesos, initializer=iniciar_proceso) as pool:
+                self.procesar(filas, pool.map)
+        return self.resultado
+
+    def procesar(self, filas, mapear):
+        lote = []
+        for numero, fila in filas:
+            lote.append((numero, fila))
+            if len(lote) >= self.tamano_lote:
+                self.procesar_lote(lote, mapear)
+                lote = []
+        if lote:
+            self.procesar_lote(lote, mapear)
+
+    def procesar_lote(self, lote, mapear):
+        resultado = self.resultado
+        resultado.procesadas += len(lote)
+        validos = []
+        for numero, fila in lote:
+            try:
+                if isinstance(fila, ErrorFila):
+                    raise fila
+                usuario = construir_usuario(fila)
+                if usuario.username in self.usernames:
+                    raise ErrorFila(f'username repetido en el archivo: {usuario.username}')
+                if usuario.email in self.emails:
+                    raise ErrorFila(f'email repetido en el archivo: {usuario.email}')
+            except (ErrorFila, ValidationError) as e:
+                resultado.agregar_error(numero, e)
+                continue
+            self.usernames.add(usuario.username)
+            self.emails.add(usuario.email)
+            validos.append((numero, usuario, str(fila['password'])))
+
+        validos = self.quitar_existentes(validos)
+        if validos:
+            hashes = mapear(make_password, [password for _, _, password in validos],
+                            **self.opciones_map(len(validos)))
+            for (_, usuario, _), hash in zip(validos, hashes):
+                usuario.password = hash
+            self.insertar(validos)
+
+        if self.progreso:
+            self.progreso(resultado)
+
+    def opciones_map(self, cantidad):
+        if self.procesos == 1:
+            return {}
+        return {'chunksize': max(1, cantidad // (self.procesos * 4))}
+
+    def quitar_existentes(self, validos):
+        """Una consulta por lote para username/email ya registrados."""
+        if not validos:
+            return validos
+        usernames = [usuario.username for _, usuario, _ in validos]
+        emails = [usuario.email for _, usuario, _ in validos]
+        existentes = Usuario.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+        usernames_existentes, emails_existentes = set(), set()
+        for username, email in existentes.values_list('username', 'email'):
+            usernames_existentes.add(username)
+            emails_existentes.add(email)
+
+        restantes = []
+        for numero, usuario, password in validos:
+            if usuario.username in usernames_existentes:
+                self.resultado.agregar_error(numero, ErrorFila(f'username ya registrado: {usuario.username}'))
+            elif usuario.email in emails_existentes:
+                self.resultado.agregar_error(numero, ErrorFila(f'email ya registrado: {usuario.email}'))
+            else:
+                restantes.append((numero, usuario, password))
+        return restantes
+
+    def insertar(self, validos):
+        usuarios = [usuario for _, usuario, _ in validos]
+        try:
+            with transaction.atomic():
+                Usuario.objects.bulk_create(usuarios)
+        except IntegrityError:
+            #Otro proceso registro alguno de estos usuarios entre la consulta
+            #de unicidad y el INSERT: se insertan de a uno para saber cual fallo
+            usuarios = []
+            for numero, usuario, _ in validos:
+                try:
+                    with transaction.atomic():
+                        Usuario.objects.bulk_create([usuario])
+                    usuarios.append(usuario)
+                except IntegrityError as e:
+                    self.resultado.agregar_error(numero, e)
+        self.resultado.creados += len(usuarios)
+        #bulk_create no envia post_save
+        cambiar_version('usuarios')
+        filas_creadas_en_lote.send(sender=Usuario, objetos=usuarios)
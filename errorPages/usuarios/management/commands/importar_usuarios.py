@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.importacion import FORMATOS, TAMANO_LOTE, Importador, detectar_formato, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa usuarios desde un archivo CSV o NDJSON (username, email, password, nombre_completo, rol)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--formato', choices=FORMATOS, help='Por defecto se deduce de la extension')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por lote')
+        parser.add_argument('--procesos', type=int, help='Procesos para calcular los hashes (por defecto, uno por CPU)')
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or detectar_formato(options['archivo'])
+        try:
+            archivo = open(options['archivo'], 'rb')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        def progreso(resultado):
+            self.stdout.write(
+                f'{resultado.procesadas} filas procesadas, '
+                f'{resultado.creados} usuarios creados, {len(resultado.errores)} errores'
+            )
+
+        importador = Importador(tamano_lote=options['lote'], procesos=options['procesos'], progreso=progreso)
+        with archivo:
+            resultado = importador.importar(leer_filas(archivo, formato))
+
+        for error in resultado.errores:
+            self.stderr.write(f"Fila {error['fila']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Importacion terminada: {resultado.creados} de {resultado.procesadas} filas'
+        ))
@@ -1,6 +1,6 @@
-import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from errorPages.identificadores import UUIDBinarioField, uuid7
 
 class UsuarioManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -26,7 +26,7 @@ class UsuarioManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 class Usuario(AbstractBaseUser, PermissionsMixin):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = UUIDBinarioField(primary_key=True, default=uuid7, editable=False)
     username = models.CharField(max_length=50, unique=True)
     email = models.EmailField(max_length=100, unique=True)
     nombre_completo = models.CharField(max_length=100)
@@ -38,6 +38,10 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     is_admin = models.BooleanField(default=False)
     is_superuser = models.BooleanField(default=False)
 
+    class Meta:
+        # Listados y permisos filtran por rol
+        indexes = [models.Index(fields=['rol'], name='usuario_rol_idx')]
+
     objects = UsuarioManager()
 
     USERNAME_FIELD = 'username'
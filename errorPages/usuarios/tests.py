@@ -1,3 +1,215 @@
+import csv
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from errorPages.pruebas import ConsultasConstantesMixin, crear_usuario
+from .autenticacion import ESTADOS, EstadoUsuarios, JWTAutenticacionPorClaims
+from .importacion import Importador, leer_filas
+from .models import Usuario
+
+
+class ConsultasUsuariosTests(ConsultasConstantesMixin, TestCase):
+    def test_listar_usuarios_sin_consultas_por_fila(self):
+        self.assertConsultasConstantes('/usuarios/')
+        self.assertConsultasConstantes('/usuarios/', {'todos': 'true'})
+
+    def test_obtener_usuario_una_consulta(self):
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(f'/usuarios/uuid/{self.alumno.id.hex}/')
+        self.assertEqual(respuesta.json()['username'], self.alumno.username)
+
+
+class CamposUsuariosTests(ConsultasConstantesMixin, TestCase):
+    def test_fields_recorta_respuesta_y_consulta(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get('/usuarios/', {'fields': 'id,username', 'todos': 'true'})
+        self.assertEqual(set(respuesta.json()[0]), {'id', 'username'})
+        self.assertNotIn('password', consultas[0]['sql'])
+        self.assertNotIn('token', consultas[0]['sql'])
+
+    def test_fields_desconocido(self):
+        respuesta = self.client.get(f'/usuarios/uuid/{self.alumno.id.hex}/', {'fields': 'id,clave'})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+CSV_USUARIOS = (
+    'username,email,password,nombre_completo,rol\n'
+    'ana,ana@correo.com,clave123,Ana Perez,student\n'
+    'existente,nuevo@correo.com,clave123,Repetido BD,student\n'
+    'luis,correo-invalido,clave123,Luis Diaz,student\n'
+    'ana,otra@correo.com,clave123,Repetida archivo,student\n'
+    'sin_rol,sin_rol@correo.com,clave123,Sin Rol,\n'
+    'marta,marta@correo.com,clave456,Marta Ruiz,teacher\n'
+)
+
+
+class ImportacionUsuariosTests(TestCase):
+    def setUp(self):
+        crear_usuario('existente', 'student')
+
+    def test_errores_por_fila_sin_detener_la_importacion(self):
+        progreso = []
+        importador = Importador(tamano_lote=2, procesos=1, progreso=lambda r: progreso.append(r.procesadas))
+        resultado = importador.importar(leer_filas(io.BytesIO(CSV_USUARIOS.encode()), 'csv'))
+        self.assertEqual(resultado.resumen(), {'procesadas': 6, 'creados': 2, 'errores': 4})
+        self.assertEqual([error['fila'] for error in resultado.errores], [2, 3, 4, 5])
+        self.assertEqual(progreso, [2, 4, 6])
+        marta = Usuario.objects.get(username='marta')
+        self.assertTrue(marta.check_password('clave456'))
+        self.assertEqual(marta.rol, 'teacher')
+
+    def test_filas_ilegibles(self):
+        lineas = CSV_USUARIOS.encode().splitlines(keepends=True)
+        contenido = b''.join([*lineas[:2], b'\xff\xfe,roto@correo.com,x,Roto,student\n', lineas[6]])
+        administrador = crear_usuario('admin_importa', 'admin')
+        administrador.is_staff = True
+        administrador.save()
+        cliente = APIClient()
+        cliente.force_authenticate(administrador)
+        respuesta = cliente.post('/usuarios/importar/', {'archivo': SimpleUploadedFile('u.csv', contenido)})
+        self.assertEqual(respuesta.status_code, 201)
+        datos = respuesta.json()
+        self.assertEqual((datos['procesadas'], datos['creados']), (3, 2))
+        self.assertEqual([error['fila'] for error in datos['detalle_errores']], [2])
+        self.assertIn('UTF-8', datos['detalle_errores'][0]['error'])
+        self.assertEqual(set(Usuario.objects.filter(username__in=['ana', 'marta']).values_list('username', flat=True)),
+                         {'ana', 'marta'})
+
+        ndjson = b'{"username": "\xff"}\n{"username": "lia", "email": "lia@correo.com", "password": "x", ' \
+                 b'"nombre_completo": "Lia", "rol": "student"}\n'
+        resultado = Importador(procesos=1).importar(leer_filas(io.BytesIO(ndjson), 'ndjson'))
+        self.assertEqual(resultado.resumen(), {'procesadas': 2, 'creados': 1, 'errores': 1})
+        self.assertEqual(resultado.errores[0]['fila'], 1)
+
+        #Un campo mas largo que csv.field_size_limit() lanza csv.Error
+        limite = csv.field_size_limit(100)
+        self.addCleanup(csv.field_size_limit, limite)
+        filas = list(leer_filas(io.BytesIO(b'username,email\n' + b'x' * 200 + b',y\nz,w\n'), 'csv'))
+        self.assertEqual(filas[0][0], 1)
+        self.assertIn('CSV invalido', str(filas[0][1]))
+        self.assertEqual(filas[1], (2, {'username': 'z', 'email': 'w'}))
+
+    def test_consultas_por_lote(self):
+        filas = ''.join(f'{{"username": "u{i}", "email": "u{i}@correo.com", "password": "x", '
+                        f'"nombre_completo": "U {i}", "rol": "student"}}\n' for i in range(20))
+        importador = Importador(tamano_lote=10, procesos=1)
+        #Por lote: unicidad + SAVEPOINT/INSERT/RELEASE + UPDATE de estadisticas
+        with self.assertNumQueries(10):
+            resultado = importador.importar(leer_filas(io.BytesIO(filas.encode()), 'ndjson'))
+        self.assertEqual(resultado.creados, 20)
+
+    def test_comando_con_pool_de_procesos(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as archivo:
+            archivo.write(CSV_USUARIOS)
+        self.addCleanup(os.remove, archivo.name)
+        salida, errores = io.StringIO(), io.StringIO()
+        call_command('importar_usuarios', archivo.name, procesos=2, stdout=salida, stderr=errores)
+        self.assertIn('2 de 6 filas', salida.getvalue())
+        self.assertIn('Fila 3:', errores.getvalue())
+        self.assertTrue(Usuario.objects.get(username='ana').check_password('clave123'))
+
+    def test_endpoint_solo_administradores(self):
+        cliente = APIClient()
+        cliente.force_authenticate(crear_usuario('alumno_importa', 'student'))
+        archivo = SimpleUploadedFile('usuarios.csv', CSV_USUARIOS.encode())
+        self.assertEqual(cliente.post('/usuarios/importar/', {'archivo': archivo}).status_code, 403)
+
+        administrador = crear_usuario('admin_importa', 'admin')
+        administrador.is_staff = True
+        administrador.save()
+        cliente.force_authenticate(administrador)
+        archivo = SimpleUploadedFile('usuarios.csv', CSV_USUARIOS.encode())
+        respuesta = cliente.post('/usuarios/importar/', {'archivo': archivo})
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.json()['creados'], 2)
+        self.assertEqual(len(respuesta.json()['detalle_errores']), 4)
+
+    def test_endpoint_acota_procesos_e_importaciones(self):
+        administrador = crear_usuario('admin_importa', 'admin')
+        administrador.is_staff = True
+        administrador.save()
+        cliente = APIClient()
+        cliente.force_authenticate(administrador)
+        with self.settings(IMPORTACION_PROCESOS=3), patch('usuarios.views.os.cpu_count', return_value=64), \
+                patch('usuarios.views.Importador', wraps=Importador) as importador:
+            cliente.post('/usuarios/importar/', {'archivo': SimpleUploadedFile('u.csv', CSV_USUARIOS.encode())})
+        self.assertEqual(importador.call_args.kwargs, {'procesos': 3})
+
+        with patch('usuarios.views.IMPORTACIONES.acquire', return_value=False):
+            respuesta = cliente.post('/usuarios/importar/', {'archivo': SimpleUploadedFile('u.csv', CSV_USUARIOS.encode())})
+        self.assertEqual(respuesta.status_code, 429)
+
+
+class AutenticacionPorClaimsTests(TestCase):
+    def setUp(self):
+        ESTADOS.limpiar()
+        self.usuario = crear_usuario('alumno_token')
+        self.administrador = crear_usuario('admin_token', 'admin')
+        self.administrador.is_staff = True
+        self.administrador.save()
+        self.cliente = self.cliente_con_token(self.usuario)
+
+    def cliente_con_token(self, usuario):
+        cliente = APIClient()
+        respuesta = cliente.post('/api/token/', {'username': usuario.username, 'password': 'clave-de-prueba'})
+        cliente.credentials(HTTP_AUTHORIZATION=f'Bearer {respuesta.json()["access"]}')
+        return cliente
+
+    def test_sin_consultas_tras_la_primera_peticion(self):
+        with self.assertNumQueries(1):
+            respuesta = self.cliente.get('/usuarios/usuario-actual/')
+        self.assertEqual(respuesta.json()['username'], self.usuario.username)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').status_code, 200)
+
+    def test_desactivar_bloquea_de_inmediato(self):
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').status_code, 200)
+        administrador = self.cliente_con_token(self.administrador)
+        respuesta = administrador.put(f'/usuarios/desactivar/{self.usuario.id}/')
+        self.assertEqual(respuesta.json()['is_active'], False)
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').status_code, 401)
+
+    def test_actualizar_y_eliminar_invalidan(self):
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').json()['rol'], 'estudiante')
+        administrador = self.cliente_con_token(self.administrador)
+        administrador.put(f'/usuarios/actualizar/{self.usuario.id}/', {'rol': 'profesor'}, format='json')
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').json()['rol'], 'profesor')
+        administrador.delete(f'/usuarios/eliminar/{self.usuario.id}/')
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').status_code, 401)
+
+    def test_username_y_email_al_dia_tras_actualizar(self):
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').json()['username'], 'alumno_token')
+        administrador = self.cliente_con_token(self.administrador)
+        administrador.put(f'/usuarios/actualizar/{self.usuario.id}/',
+                          {'username': 'renombrado', 'email': 'nuevo@example.com'}, format='json')
+        #El mismo token, emitido con los valores anteriores
+        token = AccessToken(self.cliente._credentials['HTTP_AUTHORIZATION'].split()[1])
+        usuario = JWTAutenticacionPorClaims().get_user(token)
+        self.assertEqual((usuario.username, usuario.email), ('renombrado', 'nuevo@example.com'))
+        self.assertEqual(self.cliente.get('/usuarios/usuario-actual/').json()['username'], 'renombrado')
+
+    def test_campos_no_cargados_se_conservan_al_guardar(self):
+        token = AccessToken(self.cliente._credentials['HTTP_AUTHORIZATION'].split()[1])
+        usuario = JWTAutenticacionPorClaims().get_user(token)
+        usuario.is_staff = True
+        usuario.save()
+        guardado = Usuario.objects.get(pk=self.usuario.pk)
+        self.assertTrue(guardado.is_staff)
+        self.assertEqual(guardado.nombre_completo, self.usuario.nombre_completo)
+        self.assertTrue(guardado.check_password('clave-de-prueba'))
 
-# Create your tests here.
+    def test_lru_descarta_el_menos_usado(self):
+        estados = EstadoUsuarios(maximo=1)
+        estados.obtener(self.usuario.pk)
+        estados.obtener(self.administrador.pk)
+        self.assertEqual(list(estados.entradas), [self.administrador.pk])
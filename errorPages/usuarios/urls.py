@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.listar_usuarios, name='listar_usuarios'),
     path('todos/', views.listar_usuarios, name='listar_todos_usuarios'),
+    path('importar/', views.importar_usuarios, name='importar_usuarios'),
     path('registrar/', views.registrar_usuario, name='registrar_usuario'),
     # Cambiar esta ruta para manejar UUIDs sin guiones
     path('uuid/<str:id>/', views.obtener_usuario, name='obtener_usuario_uuid'),
@@ -1,32 +1,51 @@
 import json
+import os
+import threading
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
 from .models import Usuario
 from .forms import UsuarioForm
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django.contrib.auth.hashers import make_password
 from django.views.decorators.csrf import csrf_exempt
 from uuid import UUID
+from errorPages.campos import Campo, campos_solicitados, proyectar, serializar
+from errorPages.cache_listados import cachear_listado
+from errorPages.listados import responder_listado
+from errorPages.renderizado import RespuestaJson
+from errorPages.versiones import condicional
+from .consultas import consulta_usuarios
+from .importacion import FORMATOS, Importador, detectar_formato, leer_filas
+
+# Importaciones en curso en este worker (ver IMPORTACIONES_SIMULTANEAS)
+IMPORTACIONES = threading.BoundedSemaphore(settings.IMPORTACIONES_SIMULTANEAS)
+
+# Clave de orden estable para la paginacion por cursor
+ORDEN_USUARIOS = ('fecha_creacion', 'id')
+
+# Campos de cada usuario (listado y detalle): columnas que necesita y como se obtiene
+CAMPOS_USUARIO = {
+    'id': Campo('id', lambda usuario: usuario.id),
+    'username': Campo('username', lambda usuario: usuario.username),
+    'password': Campo('password', lambda usuario: usuario.password),
+    'nombre_completo': Campo('nombre_completo', lambda usuario: usuario.nombre_completo),
+    'email': Campo('email', lambda usuario: usuario.email),
+    'rol': Campo('rol', lambda usuario: usuario.rol),
+    'token': Campo('token', lambda usuario: usuario.token),
+    'fecha_creacion': Campo('fecha_creacion', lambda usuario: usuario.fecha_creacion),
+}
+
+def serializar_usuario(usuario):
+    return serializar(usuario, CAMPOS_USUARIO)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('usuarios')
+@cachear_listado('usuarios')
 def listar_usuarios(request):
-    usuarios = Usuario.objects.all()
-    data = [
-        {
-            'id': usuario.id,
-            'username': usuario.username,
-            'password': usuario.password,
-            'nombre_completo': usuario.nombre_completo,
-            'email': usuario.email,
-            'rol': usuario.rol,
-            'token': usuario.token,
-            'fecha_creacion': usuario.fecha_creacion
-        } 
-        for usuario in usuarios
-    ]
-    return JsonResponse(data, safe=False)
+    usuarios = consulta_usuarios()
+    return responder_listado(request, usuarios, ORDEN_USUARIOS, CAMPOS_USUARIO)
 
 @csrf_exempt
 @permission_classes([IsAuthenticated])
@@ -41,10 +60,35 @@ def registrar_usuario(request):
                 email=data['email'],
                 rol=data['rol']
             )
-            return JsonResponse({'mensaje': 'Usuario creado correctamente', 'id': usuario.id}, status=201)
+            return RespuestaJson({'mensaje': 'Usuario creado correctamente', 'id': usuario.id}, status=201)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def importar_usuarios(request):
+    #Archivo CSV o NDJSON en el campo 'archivo' (multipart/form-data); Django
+    #guarda en disco los archivos grandes y aqui se leen fila por fila
+    archivo = request.FILES.get('archivo')
+    if archivo is None:
+        return RespuestaJson({'error': "Falta el archivo en el campo 'archivo'"}, status=400)
+    formato = request.GET.get('formato') or detectar_formato(archivo.name)
+    if formato not in FORMATOS:
+        return RespuestaJson({'error': f'Formato no soportado: {formato}'}, status=400)
+
+    #Cada importacion abre su pool de procesos: se acotan ambos para no
+    #llenar el servidor de procesos con varias subidas a la vez
+    if not IMPORTACIONES.acquire(blocking=False):
+        return RespuestaJson({'error': 'Hay otra importacion en curso, intente mas tarde'}, status=429)
+    try:
+        procesos = min(settings.IMPORTACION_PROCESOS, os.cpu_count() or 1)
+        resultado = Importador(procesos=procesos).importar(leer_filas(archivo, formato))
+    finally:
+        IMPORTACIONES.release()
+    return RespuestaJson({**resultado.resumen(), 'detalle_errores': resultado.errores},
+                         status=201 if resultado.creados else 400)
 
 @csrf_exempt
 @api_view(['PUT'])
@@ -71,7 +115,7 @@ def actualizar_usuario(request, id):
             
             usuario.save()
 
-            return JsonResponse({
+            return RespuestaJson({
                 'mensaje': 'Usuario actualizado correctamente',
                 'usuario': {
                     'id': usuario.id,
@@ -84,8 +128,8 @@ def actualizar_usuario(request, id):
                 }
             }, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -97,13 +141,14 @@ def eliminar_usuario(request, id):
         usuario = get_object_or_404(Usuario, id=id)
         try:
             usuario.delete()
-            return JsonResponse({'mensaje': 'Usuario eliminado correctamente'}, status=200)
+            return RespuestaJson({'mensaje': 'Usuario eliminado correctamente'}, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('usuarios')
 def obtener_usuario(request, id):
     try:
         # Convertir el ID a UUID válido
@@ -112,26 +157,18 @@ def obtener_usuario(request, id):
         else:
             formatted_id = id
             
-        usuario = get_object_or_404(Usuario, id=formatted_id)
-        data = {
-            'id': usuario.id,
-            'username': usuario.username,
-            'password': usuario.password,
-            'nombre_completo': usuario.nombre_completo,
-            'email': usuario.email,
-            'rol': usuario.rol,
-            'token': usuario.token,
-            'fecha_creacion': usuario.fecha_creacion
-        }
-        return JsonResponse(data, safe=False, status=200)
+        claves = campos_solicitados(request, CAMPOS_USUARIO)
+        usuario = get_object_or_404(proyectar(consulta_usuarios(), CAMPOS_USUARIO, claves), id=formatted_id)
+        data = serializar(usuario, CAMPOS_USUARIO, claves)
+        return RespuestaJson(data, status=200)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+        return RespuestaJson({'error': str(e)}, status=400)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def protected_view(request):
-    return JsonResponse({
+    return RespuestaJson({
         'message': 'This is a protected view',
         'user': request.user.username,
         'rol': request.user.rol
@@ -148,13 +185,13 @@ def desactivar_usuario(request, id):
             usuario.is_active = not usuario.is_active
             usuario.save()
             status_message = 'activado' if usuario.is_active else 'desactivado'
-            return JsonResponse({
+            return RespuestaJson({
                 'mensaje': f'Usuario {status_message} correctamente',
                 'is_active': usuario.is_active
             }, status=200)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
+            return RespuestaJson({'error': str(e)}, status=400)
+    return RespuestaJson({'error': 'Método no permitido'}, status=405)
 
 def format_uuid(uuid_string):
     """Helper function to handle UUIDs with or without hyphens"""
@@ -166,6 +203,7 @@ def format_uuid(uuid_string):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condicional('usuarios', por_usuario=True)
 def obtener_usuario_actual(request):
     usuario = request.user
     data = {
@@ -175,4 +213,4 @@ def obtener_usuario_actual(request):
         'rol': usuario.rol,
         # otros campos que necesites
     }
-    return JsonResponse(data)
\ No newline at end of file
+    return RespuestaJson(data)
\ No newline at end of file
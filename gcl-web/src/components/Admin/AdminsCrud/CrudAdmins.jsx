@@ -72,7 +72,7 @@ const CrudAdmins = () => {
   const fetchAdmins = async () => {
     try {
       const token = Cookies.get('accessToken');
-      const response = await axios.get('http://localhost:8000/usuarios/', {
+      const response = await axios.get('http://localhost:8000/usuarios/?todos=true', {
         headers: {
           Authorization: `Bearer ${token}`
         }
@@ -112,7 +112,7 @@ const CrudAdmins = () => {
       });
   
       if (response.status === 201) {
-        const refreshResponse = await axios.get('http://localhost:8000/usuarios/', {
+        const refreshResponse = await axios.get('http://localhost:8000/usuarios/?todos=true', {
           headers: {
             Authorization: `Bearer ${token}`
           }
@@ -234,7 +234,7 @@ const CrudAdmins = () => {
       );
   
       if (response.status === 200) {
-        const refreshResponse = await axios.get('http://localhost:8000/usuarios/', {
+        const refreshResponse = await axios.get('http://localhost:8000/usuarios/?todos=true', {
           headers: {
             Authorization: `Bearer ${token}`
           }
@@ -65,7 +65,7 @@ const CrudCourses = () => {
         return;
       }
   
-      const response = await axios.get('http://localhost:8000/cursos/listar_cursos/', {
+      const response = await axios.get('http://localhost:8000/cursos/listar_cursos/?todos=true', {
         headers: {
           Authorization: `Bearer ${token}`
         }
@@ -36,7 +36,7 @@ const ModalCreateCourse = ({ open, onClose, onCreate }) => {
     const fetchTeachers = async () => {
       try {
         const token = Cookies.get('accessToken');
-        const response = await axios.get('http://localhost:8000/usuarios/', {
+        const response = await axios.get('http://localhost:8000/usuarios/?todos=true', {
           headers: {
             Authorization: `Bearer ${token}`
           }
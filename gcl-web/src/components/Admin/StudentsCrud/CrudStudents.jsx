@@ -66,7 +66,7 @@ const CrudStudents = () => {
   const fetchStudents = async () => {
     try {
       const token = Cookies.get("accessToken");
-      const response = await axios.get("http://localhost:8000/usuarios/", {
+      const response = await axios.get("http://localhost:8000/usuarios/?todos=true", {
         headers: {
           Authorization: `Bearer ${token}`,
         },
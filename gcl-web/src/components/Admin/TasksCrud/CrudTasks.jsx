@@ -56,7 +56,7 @@ const CrudTasks = ({ topicId }) => {
         throw new Error('No authentication token found');
       }
 
-      const response = await axios.get(`http://localhost:8000/tareas/`, {
+      const response = await axios.get(`http://localhost:8000/tareas/?todos=true`, {
         headers: { Authorization: `Bearer ${token}` },
         params: { tema: topicId }
       });
@@ -27,7 +27,7 @@ const ModalCreateTask = ({ open, onClose, onSave, topicId }) => {
     const fetchTopics = async () => {
       try {
         const token = Cookies.get('accessToken');
-        const response = await axios.get('http://localhost:8000/temas/', {
+        const response = await axios.get('http://localhost:8000/temas/?todos=true', {
           headers: { Authorization: `Bearer ${token}` }
         });
         setTopics(response.data);
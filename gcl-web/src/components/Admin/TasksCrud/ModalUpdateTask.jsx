@@ -24,7 +24,7 @@ const ModalUpdateTask = ({ open, onClose, task, onSave }) => {
     const fetchTopics = async () => {
       try {
         const token = Cookies.get('accessToken');
-        const response = await axios.get('http://localhost:8000/temas/', {
+        const response = await axios.get('http://localhost:8000/temas/?todos=true', {
           headers: { Authorization: `Bearer ${token}` }
         });
         setTopics(response.data);
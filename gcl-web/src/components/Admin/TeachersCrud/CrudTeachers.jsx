@@ -67,7 +67,7 @@ const CrudTeachers = () => {
   const fetchTeachers = async () => {
     try {
       const token = Cookies.get("accessToken");
-      const response = await axios.get("http://localhost:8000/usuarios/", {
+      const response = await axios.get("http://localhost:8000/usuarios/?todos=true", {
         headers: {
           Authorization: `Bearer ${token}`,
         },
@@ -110,7 +110,7 @@ const CrudTeachers = () => {
 
       if (response.status === 201) {
         const refreshResponse = await axios.get(
-          "http://localhost:8000/usuarios/",
+          "http://localhost:8000/usuarios/?todos=true",
           {
             headers: {
               Authorization: `Bearer ${token}`,
@@ -265,7 +265,7 @@ const CrudTeachers = () => {
       if (response.status === 200) {
         // Refresh the teacher list
         const refreshResponse = await axios.get(
-          "http://localhost:8000/usuarios/",
+          "http://localhost:8000/usuarios/?todos=true",
           {
             headers: {
               Authorization: `Bearer ${token}`,
@@ -58,7 +58,7 @@ const CrudTopics = ({ unitId }) => {
         throw new Error('No authentication token found');
       }
 
-      const response = await axios.get(`http://localhost:8000/temas/`, {
+      const response = await axios.get(`http://localhost:8000/temas/?todos=true`, {
         headers: { Authorization: `Bearer ${token}` },
         params: { unidad: unitId }
       });
@@ -80,7 +80,7 @@ const CrudTopics = ({ unitId }) => {
   const fetchUnits = async () => {
     try {
       const token = Cookies.get('accessToken');
-      const response = await axios.get('http://localhost:8000/unidades/', {
+      const response = await axios.get('http://localhost:8000/unidades/?todos=true', {
         headers: { Authorization: `Bearer ${token}` }
       });
       setUnits(response.data);
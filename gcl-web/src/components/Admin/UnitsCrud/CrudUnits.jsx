@@ -62,7 +62,7 @@ const CrudUnits = () => {
   const fetchUnits = async () => {
     try {
       const token = Cookies.get('accessToken');
-      const response = await axios.get(`http://localhost:8000/unidades/`, {
+      const response = await axios.get(`http://localhost:8000/unidades/?todos=true`, {
         headers: { Authorization: `Bearer ${token}` },
         params: { curso: courseId }
       });
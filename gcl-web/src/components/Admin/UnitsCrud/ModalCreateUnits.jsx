@@ -29,7 +29,7 @@ const ModalCreateUnits = ({ open, onClose, onSave, courseId }) => {
     const fetchCourses = async () => {
       try {
         const token = Cookies.get('accessToken');
-        const response = await axios.get('http://localhost:8000/cursos/listar_cursos/', {
+        const response = await axios.get('http://localhost:8000/cursos/listar_cursos/?todos=true', {
           headers: { Authorization: `Bearer ${token}` }
         });
         setCourses(response.data);
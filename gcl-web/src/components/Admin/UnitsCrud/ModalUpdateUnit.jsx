@@ -26,7 +26,7 @@ const ModalUpdateUnit = ({ open, onClose, unit, onSave }) => {
     const fetchCourses = async () => {
       try {
         const token = Cookies.get('accessToken');
-        const response = await axios.get('http://localhost:8000/cursos/listar_cursos/', {
+        const response = await axios.get('http://localhost:8000/cursos/listar_cursos/?todos=true', {
           headers: { Authorization: `Bearer ${token}` }
         });
         setCourses(response.data);
@@ -6,6 +6,9 @@ import EmailIcon from "@mui/icons-material/Email";
 import PersonIcon from "@mui/icons-material/Person";
 import CalendarTodayIcon from "@mui/icons-material/CalendarToday";
 import LockIcon from '@mui/icons-material/Lock';
+import GroupIcon from "@mui/icons-material/Group";
+import SchoolIcon from "@mui/icons-material/School";
+import AssignmentIcon from "@mui/icons-material/Assignment";
 import Cookies from "js-cookie";
 
 import { useTheme } from '@mui/material/styles';
@@ -15,6 +18,7 @@ const AdminDashboard = () => {
   const theme = useTheme();
   const { user } = useContext(AuthContext);
   const [userDetails, setUserDetails] = useState(null);
+  const [estadisticas, setEstadisticas] = useState(null);
   const [passwordForm, setPasswordForm] = useState({
     currentPassword: '',
     newPassword: '',
@@ -96,6 +100,31 @@ const AdminDashboard = () => {
     }
   }, [user]);
 
+  useEffect(() => {
+    const fetchEstadisticas = async () => {
+      try {
+        const token = Cookies.get("accessToken");
+        const response = await fetch(
+          `${process.env.NEXT_PUBLIC_API_URL}/estadisticas/`,
+          {
+            headers: {
+              Authorization: `Bearer ${token}`,
+            },
+          }
+        );
+        if (response.ok) {
+          setEstadisticas(await response.json());
+        }
+      } catch (error) {
+        console.error("Error fetching statistics:", error);
+      }
+    };
+
+    if (user?.user_id) {
+      fetchEstadisticas();
+    }
+  }, [user]);
+
   const InfoItem = ({ icon, label, value }) => (
     <Box sx={{ display: "flex", alignItems: "center", mb: 2 }}>
       {icon}
@@ -191,6 +220,41 @@ const AdminDashboard = () => {
               }
             />
           </Grid>
+          {estadisticas && (
+            <Grid item xs={12} md={6}>
+              <InfoItem
+                icon={<GroupIcon color="primary" />}
+                label="Usuarios (activos)"
+                value={`${estadisticas.usuarios.total} (${estadisticas.usuarios.activos})`}
+              />
+              <InfoItem
+                icon={<AdminPanelSettingsIcon color="primary" />}
+                label="Usuarios por Rol"
+                value={
+                  Object.entries(estadisticas.usuarios.por_rol)
+                    .map(([rol, total]) => `${rol}: ${total}`)
+                    .join(", ") || "Sin usuarios"
+                }
+              />
+              <InfoItem
+                icon={<SchoolIcon color="primary" />}
+                label="Cursos (activos)"
+                value={`${estadisticas.cursos.total} (${estadisticas.cursos.activos})`}
+              />
+              <InfoItem
+                icon={<AssignmentIcon color="primary" />}
+                label="Unidades / Temas / Tareas"
+                value={`${estadisticas.unidades} / ${estadisticas.temas} / ${estadisticas.tareas}`}
+              />
+              <InfoItem
+                icon={<CalendarTodayIcon color="primary" />}
+                label="Inscripciones (mes más reciente)"
+                value={`${estadisticas.inscripciones.total} (${
+                  Object.values(estadisticas.inscripciones.por_mes).slice(-1)[0] || 0
+                })`}
+              />
+            </Grid>
+          )}
         </Grid>
 
         <Box
@@ -28,11 +28,10 @@ import {
 
 const Assignments = () => {
   const [unidades, setUnidades] = useState([]);
-  const [temas, setTemas] = useState([]);
-  const [tareas, setTareas] = useState([]);
   const [loading, setLoading] = useState(true);
   const [currentUser, setCurrentUser] = useState(null);
   const [inscripciones, setInscripciones] = useState([]);
+  const [proximas, setProximas] = useState([]);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -47,27 +46,25 @@ const Assignments = () => {
         setCurrentUser(userResponse.data);
 
         // Obtener inscripciones del usuario
-        const inscripcionesResponse = await axios.get('http://localhost:8000/inscripciones/', { headers });
-        const misInscripciones = inscripcionesResponse.data.filter(
-          inscripcion => inscripcion.id_usuario === userResponse.data.id
-        );
+        const inscripcionesResponse = await axios.get('http://localhost:8000/inscripciones/mis_inscripciones/', { headers });
+        const misInscripciones = inscripcionesResponse.data;
         setInscripciones(misInscripciones);
 
-        // Obtener datos filtrados por cursos inscritos
-        const [unidadesRes, temasRes, tareasRes] = await Promise.all([
-          axios.get('http://localhost:8000/unidades/', { headers }),
-          axios.get('http://localhost:8000/temas/', { headers }),
-          axios.get('http://localhost:8000/tareas/', { headers })
-        ]);
-
-        // Filtrar unidades por cursos inscritos
-        const unidadesFiltradas = unidadesRes.data.filter(unidad => 
-          misInscripciones.some(inscripcion => inscripcion.id_curso === unidad.curso.id)
-        );
-
-        setUnidades(unidadesFiltradas);
-        setTemas(temasRes.data);
-        setTareas(tareasRes.data);
+        // Tareas con entrega en los proximos 30 dias, ya filtradas y ordenadas por el servidor
+        const proximasResponse = await axios.get('http://localhost:8000/tareas/proximas/', { headers });
+        setProximas(proximasResponse.data.resultados);
+
+        // Obtener el temario (unidades, temas y tareas) de los cursos inscritos
+        if (misInscripciones.length > 0) {
+          const ids = misInscripciones.map(inscripcion => inscripcion.id_curso).join(',');
+          const arbolResponse = await axios.get('http://localhost:8000/cursos/arbol/', {
+            headers,
+            params: { ids }
+          });
+          setUnidades(arbolResponse.data.flatMap(curso =>
+            curso.unidades.map(unidad => ({ ...unidad, curso: { id: curso.id, nombre: curso.nombre } }))
+          ));
+        }
         setLoading(false);
       } catch (error) {
         setLoading(false);
@@ -114,6 +111,30 @@ const Assignments = () => {
         <Typography variant="h4" component="h1" gutterBottom>
           Tareas Pendientes
         </Typography>
+        {proximas.length > 0 && (
+          <Paper elevation={3} sx={{ mb: 3 }}>
+            <Typography variant="h6" sx={{ px: 2, pt: 2 }}>
+              Próximas entregas
+            </Typography>
+            <List>
+              {proximas.map(tarea => (
+                <ListItem
+                  key={tarea.id}
+                  button
+                  onClick={() => handleTaskClick(tarea)}
+                >
+                  <ListItemIcon>
+                    <AssignmentIcon color="warning" />
+                  </ListItemIcon>
+                  <ListItemText
+                    primary={`${tarea.titulo} - ${tarea.curso.nombre}`}
+                    secondary={`Fecha de entrega: ${new Date(tarea.fecha_entrega).toLocaleDateString()}`}
+                  />
+                </ListItem>
+              ))}
+            </List>
+          </Paper>
+        )}
         <Paper elevation={3}>
           <List>
             {unidades.map((unidad) => (
@@ -129,8 +150,7 @@ const Assignments = () => {
                 </ListItem>
                 <Collapse in={openUnits[unidad.id]} timeout="auto" unmountOnExit>
                   <List component="div" disablePadding>
-                    {temas
-                      .filter(tema => tema.unidad === unidad.nombre)
+                    {unidad.temas
                       .map(tema => (
                         <React.Fragment key={tema.id}>
                           <ListItem 
@@ -146,14 +166,13 @@ const Assignments = () => {
                           </ListItem>
                           <Collapse in={openTopics[tema.id]} timeout="auto" unmountOnExit>
                             <List component="div" disablePadding>
-                              {tareas
-                                .filter(tarea => tarea.tema === tema.nombre)
+                              {tema.tareas
                                 .map(tarea => (
                                   <ListItem 
                                     key={tarea.id} 
                                     sx={{ pl: 8 }}
                                     button
-                                    onClick={() => handleTaskClick(tarea)}
+                                    onClick={() => handleTaskClick({ ...tarea, tema: tema.nombre })}
                                   >
                                     <ListItemIcon>
                                       <AssignmentIcon color="info" />
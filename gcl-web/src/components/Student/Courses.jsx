@@ -31,29 +31,15 @@ const Courses = () => {
         });
         setCurrentUser(userResponse.data);
 
-        const inscripcionesResponse = await axios.get('http://localhost:8000/inscripciones/', {
+        const cursosResponse = await axios.get('http://localhost:8000/cursos/mis_cursos/', {
           headers
         });
 
-        const misInscripciones = inscripcionesResponse.data.filter(
-          inscripcion => inscripcion.id_usuario === userResponse.data.id
-        );
-
-        const cursosResponse = await axios.get('http://localhost:8000/cursos/listar_cursos/', {
-          headers
-        });
-
-        const misCursos = misInscripciones.map(inscripcion => {
-          const cursoInfo = cursosResponse.data.find(curso => curso.id === inscripcion.id_curso);
-          if (cursoInfo) {
-            return {
-              ...cursoInfo,
-              fechaInscripcion: inscripcion.fecha_inscripcion,
-              inscripcionId: inscripcion.id
-            };
-          }
-          return null;
-        }).filter(curso => curso !== null);
+        const misCursos = cursosResponse.data.map(curso => ({
+          ...curso,
+          fechaInscripcion: curso.inscripcion.fecha_inscripcion,
+          inscripcionId: curso.inscripcion.id
+        }));
 
         setEnrolledCourses(misCursos);
         setLoading(false);
@@ -132,14 +132,12 @@ const MoreCourses = () => {
       setCurrentUser(userResponse.data);
 
       // Obtener inscripciones
-      const inscripcionesResponse = await axios.get('http://localhost:8000/inscripciones/', { headers });
-      const misInscripciones = inscripcionesResponse.data.filter(
-        inscripcion => inscripcion.id_usuario === userResponse.data.id
-      );
+      const inscripcionesResponse = await axios.get('http://localhost:8000/inscripciones/mis_inscripciones/', { headers });
+      const misInscripciones = inscripcionesResponse.data;
       setEnrolledCourses(misInscripciones.map(insc => insc.id_curso));  
 
       // Obtener cursos
-      const cursosResponse = await axios.get('http://localhost:8000/cursos/listar_cursos', { headers });
+      const cursosResponse = await axios.get('http://localhost:8000/cursos/listar_cursos/?todos=true', { headers });
       setCourses(cursosResponse.data);
       setLoading(false);
     } catch (error) {